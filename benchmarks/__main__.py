@@ -0,0 +1,224 @@
+from schema_generator.json_backend import get_json_backend
+from schema_generator.json_manager import JSONObjectsManager
+from schema_generator.schema_memo import SchemaMemo
+from schema_generator.schema_reader import SchemaReader
+
+from .memory import get_peak_rss
+from .payload import PayloadGenerator
+from .schema_reader import count_nodes
+
+from typing import Dict, List, Optional
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+
+PHASES: tuple = ("load", "infer", "dump")
+
+
+def get_commit() -> Optional[str]:
+    """
+    Hash of the git commit checked out, if any.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_once(
+        folder_path: str, file_names: List[str],
+        json_backend: Optional[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Load, infer and dump schemas of 'file_names' in 'folder_path' as
+    main.py does, one file at a time.
+
+    Return wall and CPU seconds spent in each phase.
+    """
+    json_manager = JSONObjectsManager(folder_path, json_backend=json_backend)
+    memo = SchemaMemo()
+    timings = {phase: {"wall": 0.0, "cpu": 0.0} for phase in PHASES}
+
+    def add(phase: str, wall: float, cpu: float) -> None:
+        timings[phase]["wall"] += time.perf_counter() - wall
+        timings[phase]["cpu"] += time.process_time() - cpu
+
+    with tempfile.TemporaryDirectory() as dump_path:
+        for file_name in file_names:
+            wall, cpu = time.perf_counter(), time.process_time()
+            obj = json_manager.load_json_file(
+                json_manager.get_file_path(file_name))
+            add("load", wall, cpu)
+
+            wall, cpu = time.perf_counter(), time.process_time()
+            schema = SchemaReader(obj, memo=memo).schema
+            add("infer", wall, cpu)
+
+            wall, cpu = time.perf_counter(), time.process_time()
+            json_manager.dump_json_to_file(
+                schema, json_manager._get_dump_path(file_name, dump_path))
+            add("dump", wall, cpu)
+
+    return timings
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """
+    Generate the payload 'args' describe and time best of 'args.repeat'
+    runs over it.
+    """
+    generator = PayloadGenerator(
+        args.width, args.depth, args.array_length, args.heterogeneity,
+        args.seed
+    )
+    peak_rss = get_peak_rss()
+
+    with tempfile.TemporaryDirectory() as folder_path:
+        file_names = generator.write_files(folder_path, args.files)
+        nodes = 0
+        for file_name in file_names:
+            with open(os.path.join(folder_path, file_name)) as file:
+                nodes += count_nodes(json.load(file))
+        size = sum(
+            os.path.getsize(os.path.join(folder_path, file_name))
+            for file_name in file_names
+        )
+
+        backend = get_json_backend(args.json_backend)
+        best = None
+        for _ in range(args.repeat):
+            timings = run_once(folder_path, file_names, backend.name)
+            total = sum(timing["wall"] for timing in timings.values())
+            if best is None or total < best[0]:
+                best = (total, timings)
+
+    total, timings = best
+    return {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "json_backend": backend.name,
+        "payload": {
+            "width": args.width,
+            "depth": args.depth,
+            "array_length": args.array_length,
+            "heterogeneity": args.heterogeneity,
+            "seed": args.seed,
+            "files": args.files,
+            "nodes": nodes,
+            "bytes": size,
+        },
+        "repeat": args.repeat,
+        "seconds": total,
+        "nodes_per_second": nodes / total,
+        "files_per_second": args.files / total,
+        "peak_rss_growth": get_peak_rss() - peak_rss,
+        "phases": timings,
+    }
+
+
+def print_results(results: dict, baseline: Optional[dict] = None) -> None:
+    """
+    Print 'results', with the change from 'baseline' if given.
+    """
+    def change(value: float, key: str, phase: Optional[str] = None) -> str:
+        if baseline is None:
+            return ""
+        old = baseline["phases"][phase]["wall"] if phase else baseline[key]
+        if not old:
+            return ""
+        return f" ({(value / old - 1) * 100:+.1f}%)"
+
+    payload = results["payload"]
+    print(f"{payload['files']} files, {payload['nodes']} nodes, "
+          f"{payload['bytes'] / 1e6:.1f} MB "
+          f"(width {payload['width']}, depth {payload['depth']}, "
+          f"array length {payload['array_length']}, "
+          f"heterogeneity {payload['heterogeneity']}), "
+          f"json backend {results['json_backend']}")
+    if baseline is not None:
+        print(f"compared with commit {baseline.get('commit')}")
+        if baseline["payload"]!=payload:
+            print("  warning: the payloads differ")
+
+    nodes_per_second = results["nodes_per_second"]
+    files_per_second = results["files_per_second"]
+    print(f"  {nodes_per_second:,.0f} nodes/s"
+          f"{change(nodes_per_second, 'nodes_per_second')}")
+    print(f"  {files_per_second:,.1f} files/s"
+          f"{change(files_per_second, 'files_per_second')}")
+    print(f"  peak RSS +{results['peak_rss_growth'] / 1e6:.0f} MB")
+    for phase, timing in results["phases"].items():
+        share = timing["wall"] / results["seconds"] * 100
+        print(f"  {phase}: {timing['wall']:.3f} s wall, "
+              f"{timing['cpu']:.3f} s CPU, {share:.0f}%"
+              f"{change(timing['wall'], 'seconds', phase)}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m benchmarks",
+        description="Time loading, inferring and dumping schemas of "
+                    "generated event files end to end.")
+    parser.add_argument(
+        "--files", type=int, default=20, help="number of files to generate")
+    parser.add_argument(
+        "--width", type=int, default=8, help="number of keys of every object")
+    parser.add_argument(
+        "--depth", type=int, default=3,
+        help="levels of objects nested in the message")
+    parser.add_argument(
+        "--array-length", type=int, default=5,
+        help="number of items of every array")
+    parser.add_argument(
+        "--heterogeneity", type=float, default=0.0,
+        help="chance, from 0 to 1, that a value takes a random type")
+    parser.add_argument(
+        "--seed", type=int, default=0, help="seed of the generated payload")
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="number of runs to take best of")
+    parser.add_argument(
+        "--json-backend", default=None,
+        help="json backend to use; the fastest installed by default")
+    parser.add_argument(
+        "--output", metavar="PATH",
+        help="write results to PATH as json; defaults to "
+             "benchmarks/results/<commit>.json")
+    parser.add_argument(
+        "--compare", metavar="PATH",
+        help="print the change from results saved at PATH")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+
+    results = run_benchmark(args)
+    print_results(results, baseline)
+
+    output_path = args.output
+    if output_path is None:
+        output_path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "results",
+            f"{results['commit'] or 'latest'}.json"
+        )
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Saved results to {output_path}")
+
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,48 @@
+from schema_generator.json_backend import JSON_BACKENDS
+from schema_generator.schema_reader import SchemaReader
+
+from .schema_reader import build_payload
+
+import json
+import timeit
+
+
+# Approximate node counts of the payloads, from a single event up to 
+# a large dump.
+PAYLOAD_NODES = (100, 10_000, 1_000_000)
+
+
+def time_best(function, repeat: int = 5) -> float:
+    """
+    Best-of-'repeat' seconds spent on one call of 'function'.
+    """
+    return min(timeit.Timer(function).repeat(repeat=repeat, number=1))
+
+
+def main() -> None:
+    backends = [
+        backend() for backend in JSON_BACKENDS if backend.is_available()
+    ]
+    print(f"installed backends: {', '.join(b.name for b in backends)}")
+
+    for nodes in PAYLOAD_NODES:
+        data = json.dumps(build_payload(nodes), indent=2).encode()
+        print(f"payload of {len(data) / 1e6:.2f} MB")
+
+        expected_schema = None
+        for backend in backends:
+            obj = backend.loads(data)
+            schema = backend.dumps(SchemaReader(obj).schema)
+            if expected_schema is None:
+                expected_schema = schema
+            assert schema==expected_schema, "Schema output changed."
+
+            load_time = time_best(lambda: backend.loads(data))
+            dump_time = time_best(lambda: backend.dumps(obj))
+            print(f"  {backend.name}: "
+                  f"loads {len(data) / load_time / 1e6:.0f} MB/s, "
+                  f"dumps {len(data) / dump_time / 1e6:.0f} MB/s")
+
+
+if __name__=="__main__":
+    main()
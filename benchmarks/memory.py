@@ -0,0 +1,129 @@
+from schema_generator.json_backend import JSON_BACKENDS
+from schema_generator.json_manager import JSONObjectsManager
+
+from .schema_reader import build_payload, count_nodes
+
+from typing import List, Optional
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+
+def get_peak_rss() -> int:
+    """
+    Peak resident set size of this process so far, in bytes.
+    """
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak_rss if sys.platform=="darwin" else peak_rss * 1024
+
+
+def write_payload(file_path: str, size: int) -> None:
+    """
+    Write a json file of about 'size' bytes made of data_1.json scaled up.
+    """
+    sample = json.dumps(build_payload(1000), indent=2)
+    nodes = int(count_nodes(json.loads(sample)) * size / len(sample))
+    with open(file_path, "w") as file:
+        json.dump(build_payload(nodes), file, indent=2)
+
+
+def measure(
+        file_path: str, json_backend: str, use_mmap: bool, 
+        trace: bool) -> None:
+    """
+    Load 'file_path' and print by how much it raised peak RSS, or peak 
+    python heap if 'trace' is set.
+
+    Runs in its own process, so every measurement starts from a clean peak.
+    """
+    json_manager = JSONObjectsManager(
+        os.path.dirname(file_path), json_backend=json_backend)
+    json_manager._mmap_threshold = 0 if use_mmap else float("inf")
+
+    if trace:
+        tracemalloc.start()
+        json_manager.load_json_file(file_path)
+        print(tracemalloc.get_traced_memory()[1])
+        return
+
+    peak_rss = get_peak_rss()
+    json_manager.load_json_file(file_path)
+    print(get_peak_rss() - peak_rss)
+
+
+def run_measure(
+        file_path: str, json_backend: str, use_mmap: bool, 
+        trace: bool = False) -> int:
+    """
+    Peak memory growth in bytes of loading 'file_path' in a fresh process.
+    """
+    argv = [
+        sys.executable, "-m", "benchmarks.memory", file_path, 
+        "--measure", "--json-backend", json_backend
+    ]
+    if use_mmap:
+        argv.append("--mmap")
+    if trace:
+        argv.append("--trace")
+    result = subprocess.run(argv, capture_output=True, text=True, check=True)
+    return int(result.stdout)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare peak RSS of loading a json file with and "
+                    "without memory mapping.")
+    parser.add_argument(
+        "file", nargs="?",
+        help="json file to load; a payload is generated if not given")
+    parser.add_argument(
+        "--size-mb", type=int, default=100,
+        help="size of the generated payload in MB")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--json-backend", help=argparse.SUPPRESS)
+    parser.add_argument("--mmap", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.measure:
+        measure(args.file, args.json_backend, args.mmap, args.trace)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = args.file
+        if file_path is None:
+            file_path = os.path.join(tmp_dir, "payload.json")
+            write_payload(file_path, args.size_mb * 1000 * 1000)
+
+        size = os.path.getsize(file_path)
+        print(f"{file_path}: {size / 1e6:.0f} MB")
+        # Pages of a memory-mapped file count towards RSS once read, 
+        # but they are clean page cache the kernel can drop at will. 
+        # The python heap excludes them.
+        for backend in JSON_BACKENDS:
+            if not backend.is_available():
+                continue
+            modes = (False, True) if backend.parses_buffers else (False,)
+            for use_mmap in modes:
+                peak_rss = run_measure(file_path, backend.name, use_mmap)
+                peak_heap = run_measure(
+                    file_path, backend.name, use_mmap, trace=True)
+                mode = "mmap" if use_mmap else "read"
+                print(f"  {backend.name}, {mode}: "
+                      f"peak RSS +{peak_rss / 1e6:.0f} MB "
+                      f"({peak_rss / size:.1f}x file size), "
+                      f"peak python heap {peak_heap / 1e6:.0f} MB "
+                      f"({peak_heap / size:.1f}x file size)")
+
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,103 @@
+from schema_generator.json_manager import JSONObject
+
+from typing import List
+import json
+import os
+import random
+import string
+
+
+# Types leaves cycle through by key position, and draw from when
+# heterogeneity strikes.
+LEAF_TYPES: tuple = (str, int, float, bool, type(None))
+
+
+class PayloadGenerator:
+    """
+    Generates synthetic events shaped like the files in ./data: an
+    "attributes" header and a "message" of nested objects, arrays of
+    objects, arrays of strings and leaves.
+
+    :param: width: int: optional: number of keys of every object.
+    :param: depth: int: optional: levels of objects nested in "message".
+    :param: array_length: int: optional: number of items of every array.
+    :param: heterogeneity: float: optional: chance, from 0 to 1, that a
+        leaf or array item takes a random type instead of its usual one.
+    :param: seed: optional: seed for the random generator, so payloads
+        are the same from run to run.
+
+    Of the keys of an object, every fourth holds a nested object and
+    every fourth an array of objects, down to 'depth'. Every fourth
+    holds an array of strings, read as an enum, and the rest leaves.
+    """
+
+    def __init__(
+            self, width: int = 8, depth: int = 3, array_length: int = 5,
+            heterogeneity: float = 0.0, seed=0) -> None:
+        self.width = width
+        self.depth = depth
+        self.array_length = array_length
+        self.heterogeneity = heterogeneity
+        self._random = random.Random(seed)
+
+    def generate_event(self) -> JSONObject:
+        return {
+            "attributes": {
+                "appName": self._get_string(),
+                "eventType": self._get_string(),
+                "subEventType": self._get_string(),
+                "sensitive": self._random.random() < 0.5,
+            },
+            "message": self._get_object(0),
+        }
+
+    def write_files(self, folder_path: str, file_count: int) -> List[str]:
+        """
+        Write 'file_count' events to json files in 'folder_path' and
+        return their names.
+        """
+        file_names = []
+        for index in range(file_count):
+            file_name = f"event_{index}.json"
+            with open(os.path.join(folder_path, file_name), "w") as file:
+                json.dump(self.generate_event(), file, indent=2)
+            file_names.append(file_name)
+        return file_names
+
+    def _get_object(self, level: int) -> dict:
+        obj = {}
+        for index in range(self.width):
+            key = f"field_{index}"
+            slot = index % 4
+            if slot==0 and level < self.depth:
+                obj[key] = self._get_object(level + 1)
+            elif slot==1 and level < self.depth:
+                obj[key] = [
+                    self._get_object(level + 1)
+                    for _ in range(self.array_length)
+                ]
+            elif slot==2:
+                obj[key] = [
+                    self._get_leaf(str) for _ in range(self.array_length)
+                ]
+            else:
+                obj[key] = self._get_leaf(LEAF_TYPES[index % len(LEAF_TYPES)])
+        return obj
+
+    def _get_leaf(self, leaf_type: type) -> JSONObject:
+        if self._random.random() < self.heterogeneity:
+            leaf_type = self._random.choice(LEAF_TYPES)
+
+        if leaf_type is str:
+            return self._get_string()
+        if leaf_type is int:
+            return self._random.randrange(1000)
+        if leaf_type is float:
+            return self._random.random() * 1000
+        if leaf_type is bool:
+            return self._random.random() < 0.5
+        return None
+
+    def _get_string(self) -> str:
+        length = self._random.randrange(5, 30)
+        return "".join(self._random.choices(string.ascii_uppercase, k=length))
@@ -0,0 +1,154 @@
+from schema_generator.json_manager import JSONObject
+from schema_generator.schema_reader import SchemaReader
+
+from typing import Callable
+import copy
+import json
+import timeit
+
+
+DATA_FILE = "./data/data_1.json"
+TARGET_NODES = 100_000
+
+
+class RecursiveSchemaReader(SchemaReader):
+    """
+    SchemaReader as it was before the walk became iterative, kept as a
+    baseline to measure against.
+    """
+
+    _copy_schema = staticmethod(dict.copy)
+
+    def _get_object_schema(self, obj: JSONObject) -> JSONObject:
+        schema = self._copy_schema(self._default_object_schema)
+
+        if isinstance(obj, int) and not isinstance(obj, bool):
+            schema["type"] = "integer"
+        elif isinstance(obj, float):
+            schema["type"] = "number"
+        elif isinstance(obj, bool):
+            schema["type"] = "boolean"
+        elif isinstance(obj, str):
+            schema["type"] = "string"
+        elif obj is None:
+            schema["type"] = "null"
+        elif isinstance(obj, dict):
+            schema = {key: self._get_object_schema(value)
+                      for key, value in obj.items()}
+        elif isinstance(obj, list):
+            list_item_types = self._get_list_item_types(obj)
+            if len(list_item_types)==1 and \
+                issubclass(list_item_types[0], str):
+                schema["type"] = "enum"
+            else:
+                schema["type"] = "array"
+                if len(list_item_types)==1:
+                    schema["items"] = self._get_object_schema(obj[0])
+                elif list_item_types:
+                    schema["items"] = {"anyOf": [
+                        self._get_object_schema(item) for item in obj]}
+                else:
+                    schema["items"] = {}
+        else:
+            raise ValueError("Invalid object schema.")
+
+        return schema
+
+
+class LegacySchemaReader(RecursiveSchemaReader):
+    """
+    RecursiveSchemaReader that also deep-copies every leaf schema, 
+    as SchemaReader originally did.
+    """
+
+    _copy_schema = staticmethod(copy.deepcopy)
+
+
+def count_nodes(obj: JSONObject) -> int:
+    """
+    Count json values in obj, containers included.
+    """
+    stack = [obj]
+    count = 0
+    while stack:
+        item = stack.pop()
+        count += 1
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return count
+
+
+def build_payload(target_nodes: int = TARGET_NODES) -> JSONObject:
+    """
+    Scale data_1.json up to about 'target_nodes' nodes by widening the 
+    message with copies of its battle.
+    """
+    with open(DATA_FILE) as file:
+        obj = json.load(file)
+
+    message = obj["message"]
+    battle = message["battle"]
+    battle_nodes = count_nodes(battle)
+
+    for index in range(target_nodes // battle_nodes):
+        message[f"battle_{index}"] = battle
+    return obj
+
+
+def build_deep_payload(
+        target_nodes: int = TARGET_NODES, depth: int = 200) -> JSONObject:
+    """
+    Build a payload of about 'target_nodes' nodes made of chains 
+    'depth' levels deep, shallow enough for the recursive baselines.
+    """
+    chain = {"leaf": 1}
+    for _ in range(depth):
+        chain = {"next": chain, "value": "x"}
+    chain_nodes = count_nodes(chain)
+
+    message = {f"chain_{index}": chain
+               for index in range(target_nodes // chain_nodes)}
+    return {"message": message}
+
+
+def time_per_node(
+        reader_class: Callable, obj: JSONObject, nodes: int,
+        repeat: int = 5) -> float:
+    """
+    Best-of-'repeat' seconds spent per node building schema of obj.
+    """
+    timer = timeit.Timer(lambda: reader_class(obj)._build_schema())
+    return min(timer.repeat(repeat=repeat, number=1)) / nodes
+
+
+def main() -> None:
+    readers = (
+        ("recursive, deepcopy per node", LegacySchemaReader),
+        ("recursive", RecursiveSchemaReader),
+        ("current", SchemaReader),
+    )
+
+    for payload_name, obj in (
+        ("wide (data_1.json scaled)", build_payload()),
+        ("deep", build_deep_payload()),
+    ):
+        nodes = count_nodes(obj["message"])
+        print(f"{payload_name}: {nodes} nodes")
+
+        expected_schema = json.dumps(SchemaReader(obj).schema, indent=2)
+        for name, reader_class in readers:
+            schema = json.dumps(reader_class(obj).schema, indent=2)
+            assert schema==expected_schema, "Schema output changed."
+
+            per_node = time_per_node(reader_class, obj, nodes)
+            print(f"  {name}: {per_node * 1e9:.0f} ns/node")
+
+        memo = SchemaReader(obj).memo
+        SchemaReader(obj, memo=memo).schema
+        print(f"  flat object memo: {memo.hits} hits, {memo.misses} misses")
+
+
+if __name__=="__main__":
+    main()
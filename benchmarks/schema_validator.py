@@ -0,0 +1,100 @@
+from schema_generator.json_manager import JSONObject
+from schema_generator.schema_reader import SchemaReader
+from schema_generator.schema_validator import SchemaValidator
+
+from .json_backend import time_best
+from .schema_reader import build_payload, count_nodes
+
+from typing import Optional
+
+
+# Node counts of the payloads, from a single event up to a large dump.
+PAYLOAD_NODES = (100, 10_000, 1_000_000)
+
+_TYPE_CHECKS: dict = {
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) \
+        and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) \
+        and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+
+class InterpretingValidator:
+    """
+    Validator that walks the schema dict anew for every value, as a 
+    generic validator does, kept as a baseline to measure against. 
+    Accepts the same documents as SchemaValidator.
+    """
+
+    def __init__(self, schema: JSONObject) -> None:
+        self.schema = schema
+
+    def validate(self, document: JSONObject) -> Optional[str]:
+        subset = {key: document.get(key) 
+                  for key in SchemaReader._keys_of_interest}
+        return self._check(self.schema, subset, "")
+
+    def _check(
+            self, schema: dict, value: JSONObject, path: str) -> Optional[str]:
+        schema_type = schema.get("type")
+        if isinstance(schema_type, str):
+            if schema_type=="array":
+                if not isinstance(value, list):
+                    return path
+                items = schema.get("items", {})
+                if not items:
+                    return None
+                for index, item in enumerate(value):
+                    failure = self._check(items, item, f"{path}[{index}]")
+                    if failure is not None:
+                        return failure
+                return None
+            if schema_type=="enum":
+                if not isinstance(value, list) or not all(
+                        isinstance(item, str) for item in value):
+                    return path
+                values = schema.get("enum")
+                if values and not set(value) <= set(values):
+                    return path
+                return None
+            return None if _TYPE_CHECKS[schema_type](value) else path
+
+        if isinstance(schema.get("anyOf"), list):
+            for alternative in schema["anyOf"]:
+                if self._check(alternative, value, path) is None:
+                    return None
+            return path
+
+        if not isinstance(value, dict):
+            return path
+        for key, item in value.items():
+            if key not in schema:
+                return f"{path}.{key}"
+            failure = self._check(schema[key], item, f"{path}.{key}")
+            if failure is not None:
+                return failure
+        return None
+
+
+def main() -> None:
+    for nodes in PAYLOAD_NODES:
+        obj = build_payload(nodes)
+        schema = SchemaReader(obj).schema
+        nodes = count_nodes(obj["message"])
+        print(f"payload of {nodes} nodes")
+
+        for name, validator in (
+            ("interpreting", InterpretingValidator(schema)),
+            ("compiled", SchemaValidator(schema)),
+        ):
+            assert validator.validate(obj) is None, "Payload is invalid."
+            seconds = time_best(lambda: validator.validate(obj))
+            print(f"  {name}: {seconds / nodes * 1e9:.0f} ns/node, "
+                  f"{nodes / seconds / 1e6:.1f} M nodes/s")
+
+
+if __name__=="__main__":
+    main()
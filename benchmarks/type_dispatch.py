@@ -0,0 +1,210 @@
+from schema_generator.json_manager import JSONObject
+from schema_generator.schema_memo import SchemaMemo
+from schema_generator.schema_node import ITEMS_PATH, UNKNOWN_ITEMS
+from schema_generator.schema_reader import SchemaReader, _ArrayItems
+
+from .json_backend import time_best
+from .payload import PayloadGenerator
+from .schema_reader import count_nodes
+
+from typing import Optional
+import json
+
+
+# Leaves of every payload, about.
+TARGET_LEAVES = 1_000_000
+
+
+class IsinstanceSchemaReader(SchemaReader):
+    """
+    SchemaReader as it was before nodes were dispatched on their exact
+    class, resolving each node with a chain of isinstance checks and
+    collecting the set of types of every list, kept as a baseline to
+    measure against.
+    """
+
+    def _get_object_schema(self, obj: JSONObject) -> JSONObject:
+        root = [None]
+        pending = [(obj, root, 0, None)]
+
+        while pending:
+            obj, parent_schema, key, path = pending.pop()
+
+            if isinstance(obj, dict):
+                schema = self._build_object_schema_properties(
+                    obj, pending, path)
+
+            elif isinstance(obj, list):
+                obj = self._sample_array(obj, path)
+                list_item_types = self._get_list_item_types(obj)
+                schema = self._default_object_schema.copy()
+
+                if len(list_item_types)==1 and \
+                    issubclass(list_item_types[0], str):
+                    schema["type"] = "enum"
+                    if self.max_enum_values is not None:
+                        self._add_enum_values(schema, obj, path)
+
+                else:
+                    schema["type"] = "array"
+                    self._build_array_schema_items(
+                        schema, obj, list_item_types, pending, path)
+
+            elif obj.__class__ is _ArrayItems:
+                schema = self._merge_array_items(obj.schemas)
+
+            else:
+                schema = self._get_leaf_schema(obj)
+
+            parent_schema[key] = schema
+
+        return root[0]
+
+    def _get_leaf_schema(self, obj: JSONObject) -> dict:
+        schema = self._default_object_schema.copy()
+
+        if isinstance(obj, str):
+            schema["type"] = "string"
+        elif isinstance(obj, int) and not isinstance(obj, bool):
+            schema["type"] = "integer"
+        elif isinstance(obj, float):
+            schema["type"] = "number"
+        elif isinstance(obj, bool):
+            schema["type"] = "boolean"
+        elif obj is None:
+            schema["type"] = "null"
+        else:
+            raise ValueError("Invalid object schema.")
+
+        return schema
+
+    def _build_object_schema_properties(
+            self, obj: dict, pending: list, path: Optional[tuple] = None) \
+                -> dict:
+        keys = tuple(obj)
+        props = self.memo.get(obj, keys)
+        if props is not None:
+            return props
+
+        no_of_pending = len(pending)
+        default_object_schema = self._default_object_schema
+        get_leaf_schema = self._get_leaf_schema
+        props = {}
+        for key, value in obj.items():
+            if isinstance(value, str):
+                schema = props[key] = default_object_schema.copy()
+                schema["type"] = "string"
+            elif isinstance(value, (dict, list)):
+                props[key] = None
+                pending.append((value, props, key, (path, key)))
+            else:
+                props[key] = get_leaf_schema(value)
+
+        if len(pending)==no_of_pending:
+            self.memo.put(obj, keys, props)
+        return props
+
+    def _build_array_schema_items(
+            self, schema: dict, obj: list, list_item_types: list,
+            pending: list, path: Optional[tuple] = None) -> None:
+        no_of_types = len(list_item_types)
+        if no_of_types==0:
+            schema["items"] = UNKNOWN_ITEMS
+            return
+        if no_of_types==1 and not issubclass(list_item_types[0], (dict, list)):
+            schema["items"] = self._get_leaf_schema(obj[0])
+            return
+
+        item_schemas = []
+        item_path = (path, ITEMS_PATH)
+        queued = []
+        seen_leaf_types = set()
+        for item in obj:
+            if isinstance(item, (dict, list)):
+                queued.append((item, item_schemas, len(item_schemas), item_path))
+                item_schemas.append(None)
+            elif type(item) not in seen_leaf_types:
+                seen_leaf_types.add(type(item))
+                item_schemas.append(self._get_leaf_schema(item))
+
+        if not queued:
+            schema["items"] = self._merge_array_items(item_schemas)
+            return
+
+        pending.append((_ArrayItems(item_schemas), schema, "items", path))
+        pending.extend(queued)
+
+    def _get_list_item_types(self, obj: list) -> list:
+        return list({type(item) for item in obj})
+
+
+def build_flat_payload(target_leaves: int = TARGET_LEAVES) -> JSONObject:
+    """
+    Build a payload of wide objects of leaves of every type.
+    """
+    leaves = ("text", 1, 1.5, True, None)
+    obj = {
+        f"key_{index}": leaves[index % len(leaves)] for index in range(1000)
+    }
+    return {"message": {
+        f"object_{index}": obj for index in range(target_leaves // 1000)
+    }}
+
+
+def build_array_payload(target_leaves: int = TARGET_LEAVES) -> JSONObject:
+    """
+    Build a payload of long arrays: of strings, of numbers, and of mixed
+    leaves starting with a string.
+    """
+    arrays = (
+        ["text"] * 1000,
+        [1, 1.5] * 500,
+        ["text"] + [1, 1.5, None] * 333,
+    )
+    return {"message": {
+        f"array_{index}": arrays[index % len(arrays)]
+        for index in range(target_leaves // 1000)
+    }}
+
+
+def build_event_payload(target_leaves: int = TARGET_LEAVES) -> JSONObject:
+    """
+    Build a payload of generated events with some heterogeneity, shaped
+    like the files in ./data.
+    """
+    generator = PayloadGenerator(
+        width=16, depth=2, array_length=10, heterogeneity=0.1)
+    message = {}
+    leaves = 0
+    while leaves < target_leaves:
+        event = generator.generate_event()["message"]
+        message[f"event_{len(message)}"] = event
+        leaves += count_nodes(event)
+    return {"message": message}
+
+
+def main() -> None:
+    for payload_name, obj in (
+        ("wide objects of leaves", build_flat_payload()),
+        ("long arrays of leaves", build_array_payload()),
+        ("generated events", build_event_payload()),
+    ):
+        nodes = count_nodes(obj["message"])
+        print(f"{payload_name}: {nodes} nodes")
+
+        expected_schema = json.dumps(SchemaReader(obj).schema)
+        for name, reader_class in (
+            ("isinstance chain", IsinstanceSchemaReader),
+            ("dispatch table", SchemaReader),
+        ):
+            schema = json.dumps(reader_class(obj).schema)
+            assert schema==expected_schema, "Schema output changed."
+
+            # Without a memo, so every object is read in full.
+            seconds = time_best(lambda: reader_class(
+                obj, memo=SchemaMemo(max_size=0))._build_schema())
+            print(f"  {name}: {seconds / nodes * 1e9:.0f} ns/node")
+
+
+if __name__=="__main__":
+    main()
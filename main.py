@@ -1,62 +1,972 @@
+from schema_generator.async_pipeline import generate_schemas
+from schema_generator.enum_values import EnumValues
+from schema_generator.folder_watcher import SchemaWatcher
+from schema_generator.json_backend import JSON_BACKEND_NAMES, get_json_backend
 from schema_generator.json_manager import JSONObjectsManager, JSONObject
+from schema_generator.run_stats import RunStats, profile_call, trace_call
+from schema_generator.schema_accumulator import SchemaAccumulator
+from schema_generator.schema_cache import SchemaCache
+from schema_generator.schema_groups import (
+    SchemaGroups, get_group_file_names, group_json_files, 
+    group_json_files_parallel
+)
+from schema_generator.schema_memo import SchemaMemo
 from schema_generator.schema_reader import SchemaReader
+from schema_generator.schema_validator import SchemaValidator
+from schema_generator.schema_writer import SchemaWriter
+from schema_generator.stream_reader import StreamSchemaReader
 
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import asyncio
+import os
+import sys
+import threading
 
 
 folder_path = "./data"
 dummp_path = "./schema"
+cache_path = os.path.join(dummp_path, ".schema_cache.json")
+# Group schemas live apart from the schemas of single files, which 
+# could otherwise share their names.
+group_dump_path = os.path.join(dummp_path, "groups")
 json_objects_manager = JSONObjectsManager(folder_path)
 
 
 def load_all_json(
-        json_manager: JSONObjectsManager = json_objects_manager
-    ) -> List[Tuple[JSONObject, str]]:
+        json_manager: JSONObjectsManager = json_objects_manager,
+        file_names: Optional[Iterable[str]] = None
+    ) -> Iterator[Tuple[JSONObject, str]]:
     """
-    Read all json files in folder into list of two-tuples of JSONObject 
-    and the origin file's name.
+    Lazily read all json files in folder, or only 'file_names' if given, 
+    into two-tuples of JSONObject and the origin file's name.
     """
-    all_json_plus_filename = json_manager.all_json_plus_filename
+    all_json_plus_filename = json_manager.iter_json_plus_filename(file_names)
     return all_json_plus_filename
 
 
-def read_json_schema(obj: JSONObject) -> JSONObject:
+def get_cache_config(
+        args: argparse.Namespace, reader_options: dict, mode: str) -> dict:
+    """
+    Settings cache entries are recorded under. 'mode' is "per-file" 
+    when each file gets its own schema, or "refresh" when files are 
+    merged into one, so the two never read each other's entries.
+    """
+    return dict(reader_options, compact=args.compact, mode=mode)
+
+
+def get_stale_file_names(
+        file_names: Iterable[str],
+        cache: SchemaCache,
+        json_manager: JSONObjectsManager = json_objects_manager,
+        dump_path: str = dummp_path
+    ) -> List[str]:
+    """
+    Return names of files in 'file_names' whose schema is not up to date 
+    in cache.
+    """
+    return [
+        file_name for file_name in file_names
+        if not cache.is_fresh(
+            json_manager.get_file_path(file_name),
+            json_manager.get_output_path(file_name, dump_path)
+        )
+    ]
+
+
+def get_file_signatures(
+        file_names: Iterable[str],
+        cache: SchemaCache,
+        json_manager: JSONObjectsManager = json_objects_manager
+    ) -> Dict[str, dict]:
+    """
+    Return dict of names of files in 'file_names' to their signatures in 
+    cache. Taken before the files are read, see SchemaCache.update.
+    """
+    return {
+        file_name: cache.get_signature(json_manager.get_file_path(file_name))
+        for file_name in file_names
+    }
+
+
+def update_cache(
+        signatures: Dict[str, dict],
+        cache: SchemaCache,
+        json_manager: JSONObjectsManager = json_objects_manager,
+        dump_path: str = dummp_path
+    ) -> None:
+    """
+    Record in cache that schemas of the files in 'signatures', as they 
+    were when their signatures were taken, were written.
+    """
+    for file_name, signature in signatures.items():
+        cache.update(
+            json_manager.get_file_path(file_name),
+            json_manager.get_output_path(file_name, dump_path),
+            signature
+        )
+
+
+def report_sampled_arrays(
+        file_name: str, sampled_arrays: List[Tuple[str, int, int]]) -> None:
+    """
+    Print arrays whose schema was inferred from a sample of their items.
+    """
+    for path, length, sample_size in sampled_arrays:
+        print(f"Sampled {sample_size} of {length} items of {path} "
+              f"in {file_name}")
+
+
+def report_truncated_paths(
+        file_name: str, truncated: List[Tuple[str, str]]) -> None:
+    """
+    Print objects and arrays whose schema was not read as they were over 
+    a budget.
+    """
+    for path, budget in truncated:
+        print(f"Truncated {path} in {file_name}: {budget}")
+
+
+def report_schema_reader(file_name: str, schema_reader: SchemaReader) \
+        -> None:
+    """
+    Print arrays sampled and paths truncated while reading the schema 
+    of file 'file_name'.
+    """
+    report_sampled_arrays(file_name, schema_reader.sampled_arrays)
+    report_truncated_paths(file_name, schema_reader.truncated)
+
+
+def skip_large_files(
+        file_names: Iterable[str],
+        max_bytes: int,
+        json_manager: JSONObjectsManager = json_objects_manager
+    ) -> List[str]:
+    """
+    Return names of files in 'file_names' of at most 'max_bytes' bytes, 
+    printing the others as skipped.
+    """
+    kept = []
+    for file_name in file_names:
+        size = os.path.getsize(json_manager.get_file_path(file_name))
+        if size > max_bytes:
+            print(f"Skipping {file_name} of {size} bytes, "
+                  f"over {max_bytes} bytes")
+        else:
+            kept.append(file_name)
+    return kept
+
+
+def read_json_schema(
+        obj: JSONObject,
+        reader_options: Optional[dict] = None,
+        file_name: str = "",
+        memo: Optional[SchemaMemo] = None
+    ) -> JSONObject:
     """
     Return schema of obj.
+
+    reader_options and memo are passed on to SchemaReader.
     """
-    schema_reader = SchemaReader(obj)
-    schema = schema_reader.schema
-    return schema
+    return read_json_object(obj, reader_options, file_name, memo).schema
+
+
+def read_json_object(
+        obj: JSONObject,
+        reader_options: Optional[dict] = None,
+        file_name: str = "",
+        memo: Optional[SchemaMemo] = None
+    ) -> SchemaReader:
+    """
+    Return SchemaReader of obj, with its schema read and its sampled 
+    arrays and truncated paths reported.
+    """
+    schema_reader = SchemaReader(obj, memo=memo, **(reader_options or {}))
+    schema_reader.schema
+    report_schema_reader(file_name, schema_reader)
+    return schema_reader
+
+
+def get_enum_values_path(schema_path: str) -> str:
+    """
+    Path of the file the counts of the enum values of the schema at 
+    'schema_path' are written to, next to it.
+    """
+    root, extension = os.path.splitext(schema_path)
+    return f"{root}.enum_values{extension or '.json'}"
+
+
+def dump_enum_values(
+        enum_values: Dict[str, EnumValues],
+        schema_path: str,
+        json_manager: JSONObjectsManager = json_objects_manager
+    ) -> None:
+    """
+    Write the counts of the enum values of the schema at 'schema_path', 
+    by dotted path, to a file next to it.
+    """
+    json_manager.dump_json_to_file(
+        {path: enum_values[path].to_dict() for path in sorted(enum_values)},
+        get_enum_values_path(schema_path)
+    )
 
 
 def read_all_json_schemas(
-        all_json: List[Tuple[JSONObject, str]]) -> \
-            List[Tuple[JSONObject, str]]:
+        all_json: Iterable[Tuple[JSONObject, str]],
+        reader_options: Optional[dict] = None,
+        memo: Optional[SchemaMemo] = None) -> \
+            Iterator[Tuple[JSONObject, str]]:
     """
-    Return a list of two-tuples of schemas of json files 
+    Lazily read two-tuples of schemas of json files 
     and the origin file's name.
+
+    Files share 'memo' if given, so object shapes repeated across 
+    files are reused.
     """
-    all_json_schemas = [(read_json_schema(json_object[0]), json_object[1])
-                        for json_object in all_json]
+    all_json_schemas = (
+        (read_json_schema(
+            json_object[0], reader_options, json_object[1], memo), 
+         json_object[1])
+        for json_object in all_json
+    )
     return all_json_schemas
 
 
-def dump_all_json(json_objs: List[Tuple[JSONObject, str]]) -> None:
+def dump_all_json(
+        json_objs: Iterable[Tuple[JSONObject, str]],
+        cache: Optional[SchemaCache] = None,
+        signatures: Optional[Dict[str, dict]] = None
+    ) -> None:
+    """
+    Write JSONObject objects to files, recording each written file 
+    in cache if given, under its signature in 'signatures'.
+    """
+    for json_obj in json_objs:
+        json_objects_manager.dump_all_json([json_obj], dummp_path)
+        if cache is not None:
+            file_name = json_obj[1]
+            update_cache({file_name: signatures[file_name]}, cache)
+
+
+def process_json_files_with_stats(
+        file_names: Iterable[str],
+        stats: RunStats,
+        json_manager: JSONObjectsManager = json_objects_manager,
+        dump_path: str = dummp_path,
+        reader_options: Optional[dict] = None,
+        memo: Optional[SchemaMemo] = None,
+        cache: Optional[SchemaCache] = None,
+        signatures: Optional[Dict[str, dict]] = None
+    ) -> None:
+    """
+    Load, read schemas of and write 'file_names' one at a time, as 
+    load_all_json, read_all_json_schemas and dump_all_json do, timing 
+    each phase of each file and counting its nodes into stats.
+
+    Written files are recorded in cache if given, under their 
+    signatures in 'signatures', or ones taken just before each file 
+    is read if not given.
     """
-    Write list of JSONObject objects to files.
+    for file_name in file_names:
+        if cache is not None:
+            file_signatures = {file_name: signatures[file_name]} \
+                if signatures is not None else \
+                get_file_signatures([file_name], cache, json_manager)
+        with stats.timer("load", file_name):
+            obj = json_manager.load_json_file(
+                json_manager.get_file_path(file_name))
+        stats.count_nodes(obj, file_name)
+        with stats.timer("infer", file_name):
+            schema = read_json_schema(obj, reader_options, file_name, memo)
+        with stats.timer("dump", file_name):
+            json_manager.dump_json_to_file(
+                schema, json_manager._get_dump_path(file_name, dump_path))
+        if cache is not None:
+            update_cache(file_signatures, cache, json_manager, dump_path)
+
+
+def profile_json_file(
+        file_name: str,
+        mode: str = "cprofile",
+        reader_options: Optional[dict] = None
+    ) -> str:
+    """
+    Load, read schema of and write file named 'file_name' under cProfile, 
+    or under tracemalloc if 'mode' is "tracemalloc". Return the report.
+    """
+    def process() -> None:
+        obj = json_objects_manager.load_json_file(
+            json_objects_manager.get_file_path(file_name))
+        json_objects_manager.dump_json_to_file(
+            read_json_schema(obj, reader_options, file_name),
+            json_objects_manager._get_dump_path(file_name, dummp_path)
+        )
+
+    capture = trace_call if mode=="tracemalloc" else profile_call
+    _, report = capture(process)
+    return report
+
+
+def refresh_schema(
+        schema_path: str,
+        file_names: Iterable[str],
+        json_manager: JSONObjectsManager = json_objects_manager,
+        reader_options: Optional[dict] = None,
+        cache: Optional[SchemaCache] = None
+    ) -> List[Tuple[str, str]]:
+    """
+    Widen schema stored at 'schema_path' with schemas of 'file_names' 
+    and write it back, recording merged files in cache if given.
+
+    Only 'file_names' are read, so callers pass the files that arrived 
+    since the last refresh. The stored schema is started from scratch 
+    if missing. Keys are added, types widened and enum values unioned 
+    as SchemaAccumulator does. With max_enum_values, the counts of the 
+    enum values of 'file_names' are written next to it, see 
+    dump_enum_values.
+
+    Return what changed, as two-tuples of dotted path and change.
+    """
+    accumulator = SchemaAccumulator(
+        (reader_options or {}).get("max_enum_values"))
+    if os.path.exists(schema_path):
+        accumulator.add_schema(
+            json_manager.load_json_file(schema_path), stored=True)
+    stored = SchemaAccumulator(accumulator.max_enum_values).merge(accumulator)
+
+    memo = SchemaMemo()
+    file_names = list(file_names)
+    if cache is not None:
+        signatures = get_file_signatures(file_names, cache, json_manager)
+    for obj, file_name in load_all_json(json_manager, file_names):
+        schema_reader = read_json_object(obj, reader_options, file_name, memo)
+        accumulator.add_schema(
+            schema_reader.schema, enum_values=schema_reader.enum_values)
+
+    json_manager.dump_json_to_file(accumulator.schema, schema_path)
+    if accumulator.max_enum_values is not None:
+        dump_enum_values(accumulator.enum_values, schema_path, json_manager)
+    if cache is not None:
+        for file_name in file_names:
+            cache.update(
+                json_manager.get_file_path(file_name), schema_path, 
+                signatures[file_name])
+    return accumulator.diff(stored)
+
+
+def validate_json_files(
+        schema_path: str,
+        file_names: Iterable[str],
+        json_manager: JSONObjectsManager = json_objects_manager
+    ) -> List[Tuple[str, int, str, str]]:
+    """
+    Check the documents of json and newline-delimited json files 
+    'file_names' against schema stored at 'schema_path'.
+
+    Return list of four-tuples of file name, index of the document in 
+    the file, path of its first failing value and what is wrong with 
+    it, for every invalid document. See SchemaValidator.validate_file.
     """
-    json_objects_manager.dump_all_json(json_objs, dummp_path)
+    validator = SchemaValidator(json_manager.load_json_file(schema_path))
+    return [
+        (file_name,) + failure
+        for file_name in file_names
+        for failure in validator.validate_file(
+            json_manager.get_file_path(file_name), json_manager.json_backend)
+    ]
+
+
+def dump_group_schemas(
+        groups: SchemaGroups,
+        json_manager: JSONObjectsManager = json_objects_manager,
+        dump_path: str = group_dump_path
+    ) -> None:
+    """
+    Write the schema of each group to its own file in 'dump_path', 
+    created if missing, and with 
+    max_enum_values the counts of its enum values next to it, see 
+    dump_enum_values.
+
+    Raises ValueError, before writing any, if two groups would be 
+    written to the same file.
+    """
+    file_names = get_group_file_names(list(groups.groups))
+    os.makedirs(dump_path, exist_ok=True)
+    for key, schema in groups.iter_schemas():
+        schema_path = os.path.join(dump_path, file_names[key])
+        json_manager.dump_json_to_file(schema, schema_path)
+        accumulator = groups.groups[key]
+        if accumulator.max_enum_values is not None:
+            dump_enum_values(
+                accumulator.enum_values, schema_path, json_manager)
+
+
+def stream_json_schema(
+        file_name: str,
+        json_manager: JSONObjectsManager = json_objects_manager,
+        dump_path: str = dummp_path,
+        reader_options: Optional[dict] = None
+    ) -> None:
+    """
+    Read schema of json or newline-delimited json file without loading 
+    it into memory, and write it to file.
+
+    Newline-delimited json files get one schema line per record.
+    """
+    with open(json_manager.get_file_path(file_name), "r") as file:
+        schema_reader = StreamSchemaReader(file, **(reader_options or {}))
+
+        if json_manager.is_ndjson_file(file_name):
+            json_manager.dump_ndjson_to_file(
+                schema_reader.iter_schemas(),
+                json_manager._get_dump_path(file_name, dump_path, "ndjson")
+            )
+        else:
+            json_manager.dump_json_to_file(
+                schema_reader.schema,
+                json_manager._get_dump_path(file_name, dump_path)
+            )
+    report_sampled_arrays(file_name, schema_reader.sampled_arrays)
+
+
+def stream_all_json_schemas(
+        json_manager: JSONObjectsManager = json_objects_manager,
+        dump_path: str = dummp_path,
+        reader_options: Optional[dict] = None,
+        file_names: Optional[Iterable[str]] = None,
+        cache: Optional[SchemaCache] = None,
+        signatures: Optional[Dict[str, dict]] = None
+    ) -> None:
+    """
+    Read schemas of all json and newline-delimited json files in folder, 
+    or only 'file_names' if given, without loading them into memory, 
+    and write them to files. Written files are recorded in cache if given, 
+    as process_json_files_with_stats does.
+    """
+    if file_names is None:
+        file_names = json_manager.stream_file_names
+    for file_name in file_names:
+        if cache is not None:
+            file_signatures = {file_name: signatures[file_name]} \
+                if signatures is not None else \
+                get_file_signatures([file_name], cache, json_manager)
+        stream_json_schema(file_name, json_manager, dump_path, reader_options)
+        if cache is not None:
+            update_cache(file_signatures, cache, json_manager, dump_path)
+
+
+def process_json_file(
+        file_name: str,
+        folder_path: str = folder_path,
+        dump_path: str = dummp_path,
+        stream: bool = False,
+        reader_options: Optional[dict] = None,
+        json_backend: Optional[str] = None,
+        writer_options: Optional[dict] = None
+    ) -> Tuple[str, Optional[str]]:
+    """
+    Load json file, read its schema and write it to file.
+
+    Return two-tuple of file_name and error message, which is None if 
+    the file was processed successfully. Runs in worker processes, so 
+    only file names and error messages cross process boundaries.
+
+    writer_options are passed on to SchemaWriter.
+    """
+    json_manager = JSONObjectsManager(folder_path, json_backend=json_backend)
+    json_manager.writer = SchemaWriter(
+        json_manager.json_backend, **(writer_options or {}))
+    try:
+        if stream:
+            stream_json_schema(
+                file_name, json_manager, dump_path, reader_options)
+        else:
+            obj = json_manager.load_json_file(
+                json_manager.get_file_path(file_name))
+            json_manager.dump_json_to_file(
+                read_json_schema(obj, reader_options, file_name),
+                json_manager._get_dump_path(file_name, dump_path)
+            )
+    except Exception as error:
+        return file_name, f"{type(error).__name__}: {error}"
+    return file_name, None
+
+
+def get_chunksize(no_of_files: int, workers: int) -> int:
+    """
+    Number of files to hand a worker at once.
+
+    Aims at about four chunks per worker, which batches small files 
+    to save IPC round trips while still balancing uneven file sizes.
+    """
+    return max(1, no_of_files // (workers * 4))
+
+
+def process_all_json_parallel(
+        workers: int,
+        json_manager: JSONObjectsManager = json_objects_manager,
+        dump_path: str = dummp_path,
+        stream: bool = False,
+        reader_options: Optional[dict] = None,
+        file_names: Optional[List[str]] = None,
+        writer_options: Optional[dict] = None
+    ) -> List[Tuple[str, str]]:
+    """
+    Read schemas of all json files in folder, or only 'file_names' if 
+    given, and write them to files, fanning the files out to 'workers' 
+    processes.
+
+    Return list of two-tuples of the names of files that failed and 
+    their error messages. A failing file does not abort the others.
+    """
+    if file_names is None:
+        file_names = json_manager.stream_file_names if stream \
+            else json_manager.json_file_names
+    process_file = partial(
+        process_json_file,
+        folder_path=json_manager._folder_path,
+        dump_path=dump_path,
+        stream=stream,
+        reader_options=reader_options,
+        json_backend=json_manager.json_backend.name,
+        writer_options=writer_options
+    )
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            process_file, file_names,
+            chunksize=get_chunksize(len(file_names), workers)
+        )
+        failures = [(file_name, error) for file_name, error in results
+                    if error is not None]
+    return failures
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Sniff schemas of json files in ./data into ./schema.")
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="parse files incrementally instead of loading them whole; "
+             "also reads newline-delimited json (.ndjson, .jsonl)")
+    parser.add_argument(
+        "--workers", type=int, default=0, metavar="N",
+        help="process files in N worker processes")
+    parser.add_argument(
+        "--async", action="store_true", dest="use_async",
+        help="overlap reading and writing files with schema inference "
+             "in an asyncio pipeline")
+    parser.add_argument(
+        "--array-sample-size", type=int, default=None, metavar="N",
+        help="infer schemas of arrays longer than N from N sampled items")
+    parser.add_argument(
+        "--array-sampling", choices=SchemaReader._array_samplings,
+        default="first",
+        help="sample the first items of arrays or a uniform random sample")
+    parser.add_argument(
+        "--max-enum-values", type=int, default=None, metavar="N",
+        help="record the values of enums in schemas, unless there are "
+             "more than N distinct ones")
+    parser.add_argument(
+        "--max-file-bytes", type=int, default=None, metavar="N",
+        help="skip files larger than N bytes, and report them")
+    parser.add_argument(
+        "--max-nodes", type=int, default=None, metavar="N",
+        help="read no more than N values of a document; objects and "
+             "arrays over it are truncated in the schema")
+    parser.add_argument(
+        "--max-depth", type=int, default=None, metavar="N",
+        help="truncate objects and arrays nested deeper than N in the "
+             "schema, message being at depth 1")
+    parser.add_argument(
+        "--max-seconds", type=float, default=None, metavar="SECONDS",
+        help="truncate the objects and arrays of a document left once "
+             "reading its schema took SECONDS")
+    parser.add_argument(
+        "--json-backend", choices=("auto",) + JSON_BACKEND_NAMES,
+        default="auto",
+        help="json library to read and write files with; "
+             "defaults to the fastest one installed")
+    parser.add_argument(
+        "--compact", action="store_true",
+        help="write schemas without whitespace instead of indented")
+    parser.add_argument(
+        "--bundle", metavar="PATH",
+        help="write all schemas as lines of one newline-delimited json "
+             "file at PATH instead of one file each")
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="process all files, even those unchanged since the last run")
+    parser.add_argument(
+        "--cache-hash", action="store_true",
+        help="compare file contents when size or mtime changed, "
+             "so touched but unchanged files are still skipped")
+    parser.add_argument(
+        "--refresh", metavar="SCHEMA",
+        help="widen the schema stored at SCHEMA with schemas of the files "
+             "not merged into it yet, and print what changed")
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="keep running, and read schemas of json files as they land "
+             "or change until interrupted")
+    parser.add_argument(
+        "--poll-interval", type=float, default=0.2, metavar="SECONDS",
+        help="seconds between scans of ./data in --watch mode")
+    parser.add_argument(
+        "--debounce", type=float, default=0.3, metavar="SECONDS",
+        help="seconds a file must go unmodified before it is read in "
+             "--watch mode, so partly written files are left alone")
+    parser.add_argument(
+        "--group-by-event-type", action="store_true",
+        help="write one schema per attributes.eventType and subEventType "
+             "across all files instead of one per file; records are "
+             "grouped in --workers processes if given")
+    parser.add_argument(
+        "--validate", metavar="SCHEMA",
+        help="check json and newline-delimited json files against the "
+             "schema stored at SCHEMA instead of reading their schemas, "
+             "and exit with status 1 if any is invalid")
+    parser.add_argument(
+        "--stats", action="store_true",
+        help="print time spent per phase and file, node counts, "
+             "largest arrays and deepest paths")
+    parser.add_argument(
+        "--stats-file", metavar="PATH",
+        help="write the stats --stats prints to PATH as json; "
+             "implies --stats")
+    parser.add_argument(
+        "--profile", metavar="FILE",
+        help="process only FILE from ./data under a profiler and print "
+             "its report")
+    parser.add_argument(
+        "--profile-mode", choices=("cprofile", "tracemalloc"),
+        default="cprofile",
+        help="profile time spent per function, or python heap held "
+             "per line")
+    args = parser.parse_args(argv)
+    if args.bundle is not None and args.workers > 0 \
+        and not args.group_by_event_type:
+        parser.error("--bundle cannot be combined with --workers")
+    if args.use_async and (args.stream or args.workers > 0):
+        parser.error("--async cannot be combined with --stream or --workers")
+    if args.max_enum_values is not None and args.stream:
+        parser.error("--max-enum-values cannot be combined with --stream")
+    if args.stream and (args.max_nodes is not None 
+        or args.max_depth is not None or args.max_seconds is not None):
+        parser.error("--max-nodes, --max-depth and --max-seconds cannot be "
+                     "combined with --stream")
+    if args.refresh is not None and (args.stream or args.workers > 0 
+        or args.use_async or args.bundle is not None):
+        parser.error("--refresh cannot be combined with --stream, "
+                     "--workers, --async or --bundle")
+    if args.validate is not None and (args.stream or args.workers > 0 
+        or args.use_async or args.refresh is not None):
+        parser.error("--validate cannot be combined with --stream, "
+                     "--workers, --async or --refresh")
+    if args.group_by_event_type and (args.stream or args.use_async 
+        or args.refresh is not None or args.validate is not None):
+        parser.error("--group-by-event-type cannot be combined with "
+                     "--stream, --async, --refresh or --validate")
+    if args.watch and (args.stream or args.workers > 0 or args.use_async 
+        or args.bundle is not None or args.refresh is not None 
+            or args.validate is not None or args.group_by_event_type):
+        parser.error("--watch cannot be combined with --stream, --workers, "
+                     "--async, --bundle, --refresh, --validate or "
+                     "--group-by-event-type")
+    if args.stats_file is not None:
+        args.stats = True
+    if (args.stats or args.profile is not None) \
+        and (args.stream or args.workers > 0 or args.use_async 
+             or args.group_by_event_type or args.watch):
+        parser.error("--stats and --profile cannot be combined with "
+                     "--stream, --workers, --async, --group-by-event-type "
+                     "or --watch")
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    reader_options = {
+        "array_sample_size": args.array_sample_size,
+        "array_sampling": args.array_sampling,
+    }
+    # Left out unless given, so readers and cached entries that do not 
+    # know the option are unaffected.
+    if args.max_enum_values is not None:
+        reader_options["max_enum_values"] = args.max_enum_values
+    for budget in ("max_nodes", "max_depth", "max_seconds"):
+        if getattr(args, budget) is not None:
+            reader_options[budget] = getattr(args, budget)
+    json_objects_manager.json_backend = get_json_backend(args.json_backend)
+    json_objects_manager.writer = SchemaWriter(
+        json_objects_manager.json_backend, compact=args.compact, 
+        bundle_path=args.bundle)
+
+    # Files are listed, and skipped if too large, as they land.
+    if args.watch:
+        watch(args, reader_options)
+        return
+
+    if args.profile is not None:
+        file_names = [args.profile]
+    elif args.stream or args.validate is not None \
+        or args.group_by_event_type:
+        file_names = json_objects_manager.stream_file_names
+    else:
+        file_names = json_objects_manager.json_file_names
+    # Filtered once here, so every mode below skips the same files.
+    if args.max_file_bytes is not None:
+        file_names = skip_large_files(file_names, args.max_file_bytes)
+
+    if args.validate is not None:
+        validate(args.validate, file_names)
+        return
+    if args.profile is not None:
+        if file_names:
+            with json_objects_manager.writer:
+                print(profile_json_file(
+                    args.profile, args.profile_mode, reader_options))
+        return
+    if args.refresh is not None:
+        refresh(args, file_names, reader_options)
+        return
+    if args.group_by_event_type:
+        group(args, file_names, reader_options)
+        return
+
+    cache = None
+    # A bundle holds every schema, so no file can be skipped.
+    if not args.no_cache and args.bundle is None:
+        cache = SchemaCache(
+            cache_path, 
+            config=get_cache_config(args, reader_options, "per-file"), 
+            use_hash=args.cache_hash)
+        no_of_files = len(file_names)
+        file_names = get_stale_file_names(file_names, cache)
+        print(f"Skipping {no_of_files - len(file_names)} unchanged files...")
+
+    stats = RunStats() if args.stats else None
+    try:
+        with json_objects_manager.writer as writer:
+            run(args, file_names, reader_options, cache, stats)
+    finally:
+        if cache is not None:
+            cache.save()
+
+    if stats is not None:
+        print(stats.report())
+        if args.stats_file is not None:
+            stats.save(args.stats_file)
+
+    if args.workers==0:
+        print(f"Wrote {writer.written} files, "
+              f"left {writer.unchanged} unchanged files as they were.")
+
+
+def validate(schema_path: str, file_names: List[str]) -> None:
+    """
+    Check json and newline-delimited json files 'file_names' against 
+    schema stored at 'schema_path', print invalid documents and exit 
+    with status 1 if there are any.
+    """
+    print(f"Validating {len(file_names)} files against {schema_path}...")
+    failures = validate_json_files(schema_path, file_names)
+    for file_name, index, path, message in failures:
+        location = file_name if not index else f"{file_name}:{index}"
+        print(f"  {location}: {path or '(root)'}: {message}")
+    print(f"{len(failures)} invalid documents.")
+    if failures:
+        sys.exit(1)
+
+
+def watch(args: argparse.Namespace, reader_options: dict) -> None:
+    """
+    Read schemas of json files in folder as they land or change, until 
+    interrupted. Files already up to date in the cache are skipped.
+    """
+    cache = None
+    if not args.no_cache:
+        cache = SchemaCache(
+            cache_path, 
+            config=get_cache_config(args, reader_options, "per-file"),
+            use_hash=args.cache_hash)
+
+    def report(file_name: str, error: Optional[str]) -> None:
+        if error is None:
+            print(f"Read schema of {file_name}")
+        else:
+            print(f"Failed to process {file_name}: {error}")
+
+    def report_skipped(file_name: str, size: int) -> None:
+        print(f"Skipping {file_name} of {size} bytes, "
+              f"over {args.max_file_bytes} bytes")
+
+    watcher = SchemaWatcher(
+        json_objects_manager, dummp_path, reader_options, cache, 
+        poll_interval=args.poll_interval, debounce=args.debounce, 
+        on_processed=report, max_file_bytes=args.max_file_bytes, 
+        on_skipped=report_skipped, on_read=report_schema_reader)
+    print(f"Watching {folder_path} for json files, "
+          f"press Ctrl+C to stop...")
+    stop = threading.Event()
+    try:
+        watcher.run(stop)
+    except KeyboardInterrupt:
+        stop.set()
+    finally:
+        if cache is not None:
+            cache.save()
+    print(f"Read {watcher.processed} files.")
+
+
+def group(
+        args: argparse.Namespace,
+        file_names: List[str],
+        reader_options: dict
+    ) -> None:
+    """
+    Write one schema per event type of the records of json and 
+    newline-delimited json files 'file_names'.
+    """
+    print(f"Grouping records of {len(file_names)} files by event type...")
+    backend_name = json_objects_manager.json_backend.name
+    if args.workers > 0:
+        groups, failures = group_json_files_parallel(
+            args.workers, folder_path, file_names, reader_options, 
+            backend_name)
+    else:
+        groups, failures = group_json_files(
+            folder_path, file_names, reader_options, backend_name)
+    report_failures(failures, file_names, None)
+    for file_name, path, length, sample_size in groups.sampled_arrays:
+        report_sampled_arrays(file_name, [(path, length, sample_size)])
+    for file_name, path, budget in groups.truncated:
+        report_truncated_paths(file_name, [(path, budget)])
+
+    with json_objects_manager.writer as writer:
+        dump_group_schemas(groups)
+    print(f"Wrote {len(groups)} group schemas of {groups.count} records, "
+          f"{writer.written} changed.")
+
+
+def refresh(
+        args: argparse.Namespace,
+        file_names: List[str],
+        reader_options: dict
+    ) -> None:
+    """
+    Widen the schema at args.refresh with the files of 'file_names' not 
+    merged into it yet, or all of them if the cache is off.
+    """
+    cache = None
+    if not args.no_cache:
+        cache = SchemaCache(
+            cache_path, 
+            config=get_cache_config(args, reader_options, "refresh"),
+            use_hash=args.cache_hash)
+        file_names = [
+            file_name for file_name in file_names
+            if not cache.is_fresh(
+                json_objects_manager.get_file_path(file_name), args.refresh)
+        ]
+    print(f"Merging {len(file_names)} new files into {args.refresh}...")
+
+    try:
+        with json_objects_manager.writer:
+            changes = refresh_schema(
+                args.refresh, file_names, reader_options=reader_options, 
+                cache=cache)
+    finally:
+        if cache is not None:
+            cache.save()
+
+    for path, change in changes:
+        print(f"  {path or '(root)'}: {change}")
+    print(f"{len(changes)} changes.")
+
+
+def report_failures(
+        failures: List[Tuple[str, str]],
+        file_names: List[str],
+        cache: Optional[SchemaCache],
+        signatures: Optional[Dict[str, dict]] = None
+    ) -> None:
+    """
+    Print files that failed, and record the others in cache if given, 
+    under their signatures in 'signatures'.
+    """
+    for file_name, error in failures:
+        print(f"Failed to process {file_name}: {error}")
+    if cache is not None:
+        failed_file_names = {file_name for file_name, _ in failures}
+        update_cache(
+            {file_name: signatures[file_name] for file_name in file_names 
+             if file_name not in failed_file_names},
+            cache
+        )
+
+
+def run(
+        args: argparse.Namespace,
+        file_names: List[str],
+        reader_options: dict,
+        cache: Optional[SchemaCache],
+        stats: Optional[RunStats] = None
+    ) -> None:
+    """
+    Read schemas of 'file_names' and write them to files in the mode 
+    selected by 'args', collecting stats if given.
+    """
+    # Taken before any file is read, see SchemaCache.update.
+    signatures = get_file_signatures(file_names, cache) \
+        if cache is not None else None
+
+    if args.workers > 0:
+        print(f"Processing json files with {args.workers} workers...")
+        failures = process_all_json_parallel(
+            args.workers, stream=args.stream, reader_options=reader_options,
+            file_names=file_names, writer_options={"compact": args.compact})
+        report_failures(failures, file_names, cache, signatures)
+        return
 
+    if args.use_async:
+        print("Reading schemas of json files into ./schema/ "
+              "asynchronously...")
+        failures = asyncio.run(generate_schemas(
+            folder_path, dummp_path, file_names, reader_options,
+            json_objects_manager.json_backend.name,
+            json_objects_manager.writer, on_read=report_schema_reader
+        ))
+        report_failures(failures, file_names, cache, signatures)
+        return
 
-def main():
-    print("Loading json files...")
-    all_json_plus_filename = load_all_json()
+    if args.stream:
+        print("Streaming schemas to ./schema/...")
+        stream_all_json_schemas(
+            reader_options=reader_options, file_names=file_names, cache=cache,
+            signatures=signatures)
+        return
 
-    print("Reading schemas...")
-    all_json_schemas = read_all_json_schemas(all_json_plus_filename)
+    # Loading, reading and writing are chained generators, so only one 
+    # json document is in memory at a time.
+    print("Reading schemas of json files into ./schema/...")
+    memo = SchemaMemo()
+    if stats is not None:
+        process_json_files_with_stats(
+            file_names, stats, reader_options=reader_options, memo=memo, 
+            cache=cache, signatures=signatures)
+        print(f"Reused {memo.hits} of {memo.hits + memo.misses} "
+              f"flat object schemas.")
+        return
 
-    print("Writing schemas to ./schema/...")
-    dump_all_json(all_json_schemas)
+    all_json_plus_filename = load_all_json(file_names=file_names)
+    all_json_schemas = read_all_json_schemas(
+        all_json_plus_filename, reader_options, memo)
+    dump_all_json(all_json_schemas, cache, signatures)
+    print(f"Reused {memo.hits} of {memo.hits + memo.misses} "
+          f"flat object schemas.")
 
 
 if __name__=="__main__":
@@ -0,0 +1,152 @@
+from .json_manager import JSONObjectsManager
+from .schema_memo import SchemaMemo
+from .schema_reader import SchemaReader
+from .schema_writer import SchemaWriter
+
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+import asyncio
+
+
+async def generate_schemas(
+        folder_path: str, dump_path: str,
+        file_names: Optional[List[str]] = None,
+        reader_options: Optional[dict] = None,
+        json_backend: Optional[str] = None,
+        writer: Optional[SchemaWriter] = None,
+        io_workers: int = 4, queue_size: int = 8,
+        executor: Optional[Executor] = None,
+        on_read: Optional[Callable[[str, SchemaReader], None]] = None
+    ) -> List[Tuple[str, str]]:
+    """
+    Read schemas of all json files in 'folder_path', or only 'file_names'
+    if given, and write them to 'dump_path', without blocking the event
+    loop.
+
+    :param: reader_options: dict: optional: passed on to SchemaReader.
+    :param: json_backend: str: optional: name of json backend to read
+        files with.
+    :param: writer: SchemaWriter: optional: writer to write schemas with.
+    :param: io_workers: int: optional: number of files read, and of
+        schemas written, at once. Schemas are written one at a time if
+        the writer bundles them.
+    :param: queue_size: int: optional: number of loaded files, and of
+        schemas, waiting for the next stage at most. Together with
+        io_workers this bounds how many files are in memory at once.
+    :param: executor: Executor: optional: executor to run file I/O and
+        inference in. Defaults to a thread pool owned by this call.
+    :param: on_read: optional: called on the event loop with the name 
+        and SchemaReader of every file whose schema was read, e.g. to 
+        report its sampled arrays and truncated paths.
+
+    Loading, inference and writing run as stages connected by bounded
+    queues, so reads and writes of some files overlap inference of
+    others. Inference runs one file at a time, off the event loop.
+
+    Return list of two-tuples of the names of files that failed and
+    their error messages. A failing file does not abort the others.
+    """
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=2 * io_workers + 1)
+
+    json_manager = JSONObjectsManager(folder_path, json_backend=json_backend)
+    if writer is not None:
+        json_manager.writer = writer
+    memo = SchemaMemo()
+    failures = []
+
+    def read_schema(obj) -> SchemaReader:
+        reader = SchemaReader(obj, memo=memo, **(reader_options or {}))
+        reader.schema
+        return reader
+
+    async def load(file_names: asyncio.Queue, loaded: asyncio.Queue) -> None:
+        while not file_names.empty():
+            file_name = file_names.get_nowait()
+            try:
+                obj = await loop.run_in_executor(
+                    executor, json_manager.load_json_file,
+                    json_manager.get_file_path(file_name)
+                )
+            except Exception as error:
+                failures.append(_format_failure(file_name, error))
+                continue
+            await loaded.put((obj, file_name))
+
+    async def infer(loaded: asyncio.Queue, inferred: asyncio.Queue) -> None:
+        while True:
+            item = await loaded.get()
+            if item is None:
+                return
+            obj, file_name = item
+            try:
+                reader = await loop.run_in_executor(
+                    executor, read_schema, obj)
+            except Exception as error:
+                failures.append(_format_failure(file_name, error))
+                continue
+            if on_read is not None:
+                on_read(file_name, reader)
+            await inferred.put((reader.schema, file_name))
+
+    async def dump(inferred: asyncio.Queue) -> None:
+        while True:
+            item = await inferred.get()
+            if item is None:
+                return
+            schema, file_name = item
+            try:
+                await loop.run_in_executor(
+                    executor, json_manager.dump_json_to_file, schema,
+                    json_manager._get_dump_path(file_name, dump_path)
+                )
+            except Exception as error:
+                failures.append(_format_failure(file_name, error))
+
+    try:
+        if file_names is None:
+            file_names = await loop.run_in_executor(
+                executor, lambda: json_manager.json_file_names)
+
+        pending_file_names = asyncio.Queue()
+        for file_name in file_names:
+            pending_file_names.put_nowait(file_name)
+        loaded = asyncio.Queue(maxsize=queue_size)
+        inferred = asyncio.Queue(maxsize=queue_size)
+
+        loaders = [
+            asyncio.ensure_future(load(pending_file_names, loaded))
+            for _ in range(io_workers)
+        ]
+        inferrer = asyncio.ensure_future(infer(loaded, inferred))
+        no_of_dumpers = 1 if json_manager.writer.bundle_path is not None \
+            else io_workers
+        dumpers = [
+            asyncio.ensure_future(dump(inferred))
+            for _ in range(no_of_dumpers)
+        ]
+        tasks = loaders + [inferrer] + dumpers
+
+        try:
+            # Stages are shut down in order with None, so every file
+            # that made it into a queue is seen through.
+            await asyncio.gather(*loaders)
+            await loaded.put(None)
+            await inferrer
+            for _ in dumpers:
+                await inferred.put(None)
+            await asyncio.gather(*dumpers)
+        finally:
+            for task in tasks:
+                task.cancel()
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False)
+
+    return failures
+
+
+def _format_failure(file_name: str, error: Exception) -> Tuple[str, str]:
+    return file_name, f"{type(error).__name__}: {error}"
@@ -0,0 +1,265 @@
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import math
+
+
+def _hash_value(value: str) -> Tuple[int, int]:
+    """
+    Two independent 64 bit hashes of 'value'.
+
+    Unlike hash(), they are the same in every process, so sketches
+    built in different processes can be merged.
+    """
+    digest = hashlib.blake2b(
+        value.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    return (
+        int.from_bytes(digest[:8], "little"),
+        int.from_bytes(digest[8:], "little"),
+    )
+
+
+class CountMinSketch:
+    """
+    Approximate counts of values in fixed memory.
+
+    :param: width: int: optional: counters per row. Estimates exceed
+        true counts by at most about 2.7 / width of the total count.
+    :param: depth: int: optional: number of rows. Each row more halves
+        the chance of an estimate exceeding that bound, or about so.
+
+    Estimates never fall below true counts.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4) -> None:
+        self.width = width
+        self.depth = depth
+        self._rows = [array("Q", bytes(8 * width)) for _ in range(depth)]
+
+    def _columns(self, hash_value: int) -> Iterable[int]:
+        # Rows are indexed by double hashing of the two halves.
+        low, high = hash_value & 0xFFFFFFFF, hash_value >> 32
+        return ((low + row * high) % self.width for row in range(self.depth))
+
+    def add(self, hash_value: int, count: int = 1) -> int:
+        """
+        Add 'count' to the value hashed to 'hash_value' and return its
+        new estimate.
+        """
+        estimate = None
+        for row, column in zip(self._rows, self._columns(hash_value)):
+            row[column] += count
+            if estimate is None or row[column] < estimate:
+                estimate = row[column]
+        return estimate
+
+    def estimate(self, hash_value: int) -> int:
+        return min(
+            row[column]
+            for row, column in zip(self._rows, self._columns(hash_value))
+        )
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if (other.width, other.depth)!=(self.width, self.depth):
+            raise ValueError("Cannot merge sketches of different sizes.")
+        for row, other_row in zip(self._rows, other._rows):
+            for column, count in enumerate(other_row):
+                if count:
+                    row[column] += count
+
+
+class HyperLogLog:
+    """
+    Approximate number of distinct values in fixed memory.
+
+    :param: precision: int: optional: 2 ** precision one byte registers
+        are kept. The standard error is about 1.04 / 2 ** (precision / 2),
+        1.6% for the default.
+    """
+
+    def __init__(self, precision: int = 12) -> None:
+        if not 4 <= precision <= 16:
+            raise ValueError(f"Invalid precision {precision!r}.")
+        self.precision = precision
+        self._registers = bytearray(1 << precision)
+
+    def add(self, hash_value: int) -> None:
+        bits = 64 - self.precision
+        index = hash_value >> bits
+        rest = hash_value & ((1 << bits) - 1)
+        rank = bits - rest.bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def count(self) -> int:
+        registers = self._registers
+        size = len(registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(
+            2.0 ** -register for register in registers)
+
+        # Linear counting is more accurate while registers are sparse.
+        zeros = registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision!=self.precision:
+            raise ValueError("Cannot merge sketches of different sizes.")
+        self._registers = bytearray(
+            max(register, other_register)
+            for register, other_register
+            in zip(self._registers, other._registers)
+        )
+
+
+class EnumValues:
+    """
+    Values of one enum, kept in bounded memory whatever their number.
+
+    :param: max_values: int: optional: number of distinct values counted
+        exactly.
+    :param: top: int: optional: number of most frequent values tracked
+        once the distinct values exceed 'max_values'.
+
+    Values are counted exactly until there are more than 'max_values'
+    distinct ones. From then on counts live in a count-min sketch, the
+    number of distinct values is estimated with a HyperLogLog, and only
+    the 'top' values with the highest estimated counts are kept by name.
+
+    Counts all values added in .count. Instances with the same settings
+    can be merged, in any order.
+    """
+
+    def __init__(self, max_values: int = 100, top: int = 10) -> None:
+        self.max_values = max_values
+        self.top = top
+        self.count = 0
+        self._counts: Optional[Counter] = Counter()
+        self._sketch: Optional[CountMinSketch] = None
+        self._distinct: Optional[HyperLogLog] = None
+        self._heavy_hitters: Dict[str, int] = {}
+
+    @property
+    def exact(self) -> bool:
+        """
+        Check if values are still counted exactly.
+        """
+        return self._counts is not None
+
+    @property
+    def values(self) -> Optional[set]:
+        """
+        Set of the distinct values, or None once there are too many.
+        """
+        return set(self._counts) if self.exact else None
+
+    @property
+    def distinct(self) -> int:
+        """
+        Number of distinct values, estimated once there are too many.
+        """
+        return len(self._counts) if self.exact else self._distinct.count()
+
+    def add(self, value: str, count: int = 1) -> None:
+        self.count += count
+        if self.exact:
+            self._counts[value] += count
+            if len(self._counts) > self.max_values:
+                self._switch_to_sketches()
+        else:
+            self._add_to_sketches(value, count)
+
+    def update(self, values: Sequence[str]) -> None:
+        """
+        Add every value of 'values'.
+
+        While values are counted exactly, all of 'values' are counted
+        before checking the bound, so it may be exceeded by as many
+        values as 'values' holds, but only until this call returns.
+        """
+        if not self.exact:
+            for value in values:
+                self._add_to_sketches(value, 1)
+            self.count += len(values)
+            return
+
+        self._counts.update(values)
+        self.count += len(values)
+        if len(self._counts) > self.max_values:
+            self._switch_to_sketches()
+
+    def merge(self, other: "EnumValues") -> "EnumValues":
+        """
+        Fold 'other' into these values and return them.
+
+        'other' is left untouched.
+        """
+        if other.exact:
+            for value, count in other._counts.items():
+                self.add(value, count)
+            return self
+
+        if self.exact:
+            self._switch_to_sketches()
+        self.count += other.count
+        self._sketch.merge(other._sketch)
+        self._distinct.merge(other._distinct)
+        for value in list(self._heavy_hitters):
+            self._heavy_hitters[value] = \
+                self._sketch.estimate(_hash_value(value)[1])
+        for value in other._heavy_hitters:
+            self._track(value, self._sketch.estimate(_hash_value(value)[1]))
+        return self
+
+    def heavy_hitters(self) -> List[Tuple[str, int]]:
+        """
+        Two-tuples of the 'top' most frequent values and their counts,
+        most frequent first. Counts are estimates once values are no
+        longer counted exactly.
+        """
+        if self.exact:
+            return self._counts.most_common(self.top)
+        return sorted(
+            self._heavy_hitters.items(), key=lambda item: (-item[1], item[0])
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "distinct": self.distinct,
+            "exact": self.exact,
+            "heavy_hitters": [
+                {"value": value, "count": count}
+                for value, count in self.heavy_hitters()
+            ],
+        }
+
+    def _switch_to_sketches(self) -> None:
+        counts = self._counts
+        self._counts = None
+        self._sketch = CountMinSketch()
+        self._distinct = HyperLogLog()
+        for value, count in counts.items():
+            self._add_to_sketches(value, count)
+
+    def _add_to_sketches(self, value: str, count: int) -> None:
+        distinct_hash, count_hash = _hash_value(value)
+        self._distinct.add(distinct_hash)
+        self._track(value, self._sketch.add(count_hash, count))
+
+    def _track(self, value: str, estimate: int) -> None:
+        """
+        Keep 'value' among the heavy hitters if its estimated count is
+        among the 'top' highest.
+        """
+        heavy_hitters = self._heavy_hitters
+        if value in heavy_hitters or len(heavy_hitters) < self.top:
+            heavy_hitters[value] = estimate
+            return
+        least = min(heavy_hitters, key=heavy_hitters.get)
+        if estimate > heavy_hitters[least]:
+            del heavy_hitters[least]
+            heavy_hitters[value] = estimate
@@ -0,0 +1,237 @@
+from .json_manager import JSONObjectsManager
+from .schema_cache import SchemaCache
+from .schema_memo import SchemaMemo
+from .schema_reader import SchemaReader
+
+from typing import Callable, Dict, List, Optional, Tuple
+import os
+import queue
+import threading
+import time
+
+
+class FolderIndex:
+    """
+    Index of the files in a folder, by size and mtime, to find files
+    that are new or modified since they were last seen.
+
+    :param: folder_path: str: folder to index.
+    :param: extensions: tuple: optional: extensions of files to index.
+    :param: debounce: float: optional: seconds a file must go unmodified
+        before it is reported, so files still being written are left
+        alone until complete.
+
+    Deleted files are dropped from the index, so they are reported
+    again if they reappear.
+    """
+
+    def __init__(
+            self, folder_path: str, extensions: Tuple = ("json",),
+            debounce: float = 0.3) -> None:
+        self.folder_path = folder_path
+        self.extensions = extensions
+        self.debounce = debounce
+        self._seen: Dict[str, Tuple[int, int]] = {}
+
+    def scan(self) -> List[Tuple[str, Tuple[int, int]]]:
+        """
+        Return two-tuples of the names of files that changed since
+        last marked seen, and their size and mtime, oldest first.
+        """
+        now = time.time_ns()
+        debounce = self.debounce * 1e9
+        changed = []
+        names = set()
+        with os.scandir(self.folder_path) as entries:
+            for entry in entries:
+                if entry.name.split(".")[-1].lower() not in self.extensions:
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                names.add(entry.name)
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if self._seen.get(entry.name)==signature \
+                    or now - stat.st_mtime_ns < debounce:
+                    continue
+                changed.append((entry.name, signature))
+
+        for name in self._seen.keys() - names:
+            del self._seen[name]
+        changed.sort(key=lambda item: item[1][1])
+        return changed
+
+    def mark_seen(self, name: str, signature: Tuple[int, int]) -> None:
+        self._seen[name] = signature
+
+
+class SchemaWatcher:
+    """
+    Keeps schemas of the json files in a folder up to date as files
+    land or change, without rescanning and reprocessing the folder.
+
+    :param: json_manager: JSONObjectsManager: manager of the folder.
+    :param: dump_path: str: folder to write schemas to.
+    :param: reader_options: dict: optional: passed on to SchemaReader.
+    :param: cache: SchemaCache: optional: cache to skip files whose
+        schema is already up to date with, e.g. on start, and to record
+        written files in.
+    :param: poll_interval: float: optional: seconds between scans.
+    :param: debounce: float: optional: seconds a file must go unmodified
+        before it is processed. See FolderIndex.
+    :param: queue_size: int: optional: number of files waiting to be
+        processed at most. Scanning waits while the queue is full.
+    :param: on_processed: optional: called with the name of every file
+        processed and an error message, None if it succeeded.
+    :param: max_file_bytes: int: optional: skip files larger than this 
+        many bytes, until they change.
+    :param: on_skipped: optional: called with the name and size of 
+        every file skipped as too large.
+    :param: on_read: optional: called with the name and SchemaReader of 
+        every file whose schema was read, before it is written.
+
+    Scanning and processing run in threads of their own, connected by
+    a bounded queue. The manager, its writer and the memo of object
+    schemas stay warm between files. A file modified while queued is
+    processed once, with its latest content.
+    """
+
+    def __init__(
+            self, json_manager: JSONObjectsManager, dump_path: str,
+            reader_options: Optional[dict] = None,
+            cache: Optional[SchemaCache] = None,
+            poll_interval: float = 0.2, debounce: float = 0.3,
+            queue_size: int = 64,
+            on_processed: Optional[Callable[[str, Optional[str]], None]] \
+                = None,
+            max_file_bytes: Optional[int] = None,
+            on_skipped: Optional[Callable[[str, int], None]] = None,
+            on_read: Optional[Callable[[str, SchemaReader], None]] = None) \
+                -> None:
+        self.json_manager = json_manager
+        self.dump_path = dump_path
+        self.reader_options = reader_options or {}
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.on_processed = on_processed
+        self.max_file_bytes = max_file_bytes
+        self.on_skipped = on_skipped
+        self.on_read = on_read
+        self.index = FolderIndex(
+            json_manager._folder_path, json_manager._json_extensions,
+            debounce)
+        self.memo = SchemaMemo()
+        self.processed = 0
+        self.skipped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._queued = set()
+        self._lock = threading.Lock()
+
+    def poll(self, stop: Optional[threading.Event] = None) -> int:
+        """
+        Scan the folder once and queue the files that changed. Blocks
+        while the queue is full, unless 'stop' is set.
+
+        Return number of files queued.
+        """
+        no_of_queued = 0
+        for name, signature in self.index.scan():
+            with self._lock:
+                if name in self._queued:
+                    # Picked up again once processed, if still changed.
+                    continue
+            if self.cache is not None and self.cache.is_fresh(
+                    self.json_manager.get_file_path(name),
+                    self.json_manager._get_dump_path(name, self.dump_path)):
+                self.index.mark_seen(name, signature)
+                continue
+
+            while True:
+                if stop is not None and stop.is_set():
+                    return no_of_queued
+                try:
+                    self._queue.put(name, timeout=self.poll_interval)
+                    break
+                except queue.Full:
+                    continue
+            with self._lock:
+                self._queued.add(name)
+            self.index.mark_seen(name, signature)
+            no_of_queued += 1
+        return no_of_queued
+
+    def process_queued(self) -> int:
+        """
+        Process the files queued so far, without waiting for more.
+
+        Return number of files processed.
+        """
+        no_of_processed = 0
+        while True:
+            try:
+                name = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._process(name)
+            no_of_processed += 1
+        if no_of_processed and self.cache is not None:
+            self.cache.save()
+        return no_of_processed
+
+    def run(self, stop: threading.Event) -> None:
+        """
+        Watch the folder until 'stop' is set.
+        """
+        poller = threading.Thread(
+            target=self._poll_until, args=(stop,), daemon=True)
+        poller.start()
+        try:
+            while not stop.is_set():
+                try:
+                    name = self._queue.get(timeout=self.poll_interval)
+                except queue.Empty:
+                    continue
+                self._process(name)
+                if self._queue.empty() and self.cache is not None:
+                    self.cache.save()
+        finally:
+            stop.set()
+            poller.join()
+
+    def _poll_until(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            self.poll(stop)
+            stop.wait(self.poll_interval)
+
+    def _process(self, name: str) -> None:
+        with self._lock:
+            self._queued.discard(name)
+        error = None
+        try:
+            json_manager = self.json_manager
+            file_path = json_manager.get_file_path(name)
+            # Checked as processed, so the latest content counts.
+            if self.max_file_bytes is not None:
+                size = os.path.getsize(file_path)
+                if size > self.max_file_bytes:
+                    self.skipped += 1
+                    if self.on_skipped is not None:
+                        self.on_skipped(name, size)
+                    return
+            if self.cache is not None:
+                signature = self.cache.get_signature(file_path)
+            obj = json_manager.load_json_file(file_path)
+            reader = SchemaReader(obj, memo=self.memo, **self.reader_options)
+            schema = reader.schema
+            if self.on_read is not None:
+                self.on_read(name, reader)
+            dump_path = json_manager._get_dump_path(name, self.dump_path)
+            json_manager.dump_json_to_file(schema, dump_path)
+            if self.cache is not None:
+                self.cache.update(file_path, dump_path, signature)
+        except Exception as exception:
+            error = f"{type(exception).__name__}: {exception}"
+        self.processed += 1
+        if self.on_processed is not None:
+            self.on_processed(name, error)
@@ -0,0 +1,230 @@
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+JSONObject = Union[int, float, bool, str, List, Dict, None]
+
+JSONBytes = Union[bytes, bytearray, memoryview]
+
+# Integers of 19 digits or more may not fit in 64 bits. They are found 
+# by mapping every digit to "0" and everything else to " ", which is much 
+# faster than a regular expression. Strings and floats with long digit 
+# runs also match, which only costs a reparse.
+_LONG_INTEGER_DIGITS: int = 19
+
+_LONG_INTEGER: bytes = b"0" * _LONG_INTEGER_DIGITS
+
+_DIGITS_TABLE: bytes = bytes(
+    0x30 if 0x30 <= byte <= 0x39 else 0x20 for byte in range(256)
+)
+
+_SCAN_CHUNK_SIZE: int = 1 << 20
+
+
+class JSONBackend:
+    """
+    Parses and serializes json with the stdlib json module.
+
+    Subclasses swap in faster parsers that read bytes with no text 
+    decode pass. Every backend writes exactly what 
+    json.dumps(obj, indent=2) would, or with compact separators, so 
+    output does not depend on which one is installed.
+    """
+
+    name: str = "json"
+
+    # Whether loads parses bytes without decoding them to str first. 
+    # Files for backends that do not are decoded up front, so their 
+    # bytes are dropped rather than kept alongside the str while parsing.
+    parses_bytes: bool = False
+
+    # Whether loads parses a memoryview in place rather than copying it.
+    parses_buffers: bool = False
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return True
+
+    def load(self, file: BinaryIO) -> JSONObject:
+        """
+        Parse json document read from binary 'file'.
+        """
+        data = file.read()
+        if not self.parses_bytes:
+            data = data.decode(json.detect_encoding(data), "surrogatepass")
+        return self.loads(data)
+
+    def loads(self, data: Union[str, JSONBytes]) -> JSONObject:
+        """
+        Parse json document held in 'data'.
+        """
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    def dumps(self, obj: JSONObject, compact: bool = False) -> bytes:
+        """
+        Serialize 'obj' as indented json, or without any whitespace if 
+        'compact' is set.
+        """
+        if compact:
+            return json.dumps(obj, separators=(",", ":")).encode()
+        return json.dumps(obj, indent=2).encode()
+
+
+class OrjsonBackend(JSONBackend):
+    """
+    Parses and serializes json with orjson.
+
+    orjson formats floats and non-ascii strings differently from the
+    stdlib, reads integers beyond 64 bits as floats and rejects some 
+    documents the stdlib accepts (NaN, non-string keys). Such documents 
+    are handed to the stdlib instead.
+    """
+
+    name: str = "orjson"
+
+    parses_bytes: bool = True
+
+    parses_buffers: bool = True
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return orjson is not None
+
+    def loads(self, data: JSONBytes) -> JSONObject:
+        if not _has_long_integer(data):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+        return super().loads(data)
+
+    def dumps(self, obj: JSONObject, compact: bool = False) -> bytes:
+        if not _has_float(obj):
+            try:
+                data = orjson.dumps(
+                    obj, option=None if compact else orjson.OPT_INDENT_2)
+            except orjson.JSONEncodeError:
+                pass
+            else:
+                # The stdlib escapes everything outside printable ascii.
+                if data.isascii() and b"\x7f" not in data:
+                    return data
+        return super().dumps(obj, compact)
+
+
+class SimdjsonBackend(JSONBackend):
+    """
+    Parses json with pysimdjson and serializes it with the stdlib.
+    """
+
+    name: str = "simdjson"
+
+    parses_bytes: bool = True
+
+    parses_buffers: bool = True
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return simdjson is not None
+
+    def loads(self, data: JSONBytes) -> JSONObject:
+        try:
+            return simdjson.loads(data)
+        except ValueError:
+            return super().loads(data)
+
+
+class UjsonBackend(JSONBackend):
+    """
+    Parses json with ujson and serializes it with the stdlib, since
+    ujson formats output differently.
+    """
+
+    name: str = "ujson"
+
+    parses_bytes: bool = True
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return ujson is not None
+
+    def loads(self, data: JSONBytes) -> JSONObject:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        try:
+            return ujson.loads(data)
+        except (ValueError, OverflowError):
+            return super().loads(data)
+
+
+# Preferred order of backends when none is asked for.
+JSON_BACKENDS: Tuple = (
+    OrjsonBackend, SimdjsonBackend, UjsonBackend, JSONBackend
+)
+
+JSON_BACKEND_NAMES: Tuple = tuple(
+    backend.name for backend in JSON_BACKENDS
+)
+
+
+def get_json_backend(name: Optional[str] = None) -> JSONBackend:
+    """
+    Return json backend called 'name', or the fastest installed one
+    if 'name' is None or "auto".
+    """
+    for backend in JSON_BACKENDS:
+        if name in (None, "auto") and backend.is_available():
+            return backend()
+        if backend.name==name:
+            if not backend.is_available():
+                raise ValueError(f"JSON backend {name!r} is not installed.")
+            return backend()
+    raise ValueError(f"Invalid JSON backend {name!r}.")
+
+
+def _has_long_integer(data: JSONBytes) -> bool:
+    """
+    Check if 'data' holds a run of digits long enough to be an integer 
+    beyond 64 bits.
+
+    Scans in chunks, so no more than one chunk is copied at a time.
+    """
+    overlap = _LONG_INTEGER_DIGITS - 1
+    for start in range(0, len(data), _SCAN_CHUNK_SIZE):
+        chunk = bytes(data[start:start + _SCAN_CHUNK_SIZE + overlap])
+        if _LONG_INTEGER in chunk.translate(_DIGITS_TABLE):
+            return True
+    return False
+
+
+def _has_float(obj: JSONObject) -> bool:
+    """
+    Check if 'obj' holds any float, walking it with an explicit stack.
+    """
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            return True
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return False
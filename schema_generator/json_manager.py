@@ -1,9 +1,9 @@
-import json
-import os
-from typing import Tuple, List, Dict, Union
-
+from .json_backend import JSONBackend, JSONObject, get_json_backend
+from .schema_writer import SchemaWriter
 
-JSONObject = Union[int, float, bool, str, List, Dict, None]
+import mmap
+import os
+from typing import Iterable, Iterator, Tuple, List, Optional
 
 
 class JSONObjectsManager:
@@ -13,16 +13,39 @@ class JSONObjectsManager:
     :param: folder_path: str: folder that contains json files.
     :param: dump_path: str: optional: default folder to dump json files in 
         when .dump_all_json method is called.
+    :param: json_backend: str: optional: name of json backend to read and 
+        write files with. Defaults to the fastest one installed.
 
     Provides all_json property that returns list of json objects from files.
+    The files are read once and cached until .refresh is called.
+    Provides iter_json_plus_filename method that reads json files lazily,
+    one at a time.
     Provides dump_all_json method to dump json objects into files.
+    Provides json_file_names property that lists json files in folder.
+    Provides stream_file_names property that lists json and 
+    newline-delimited json files to be read without loading them.
+    Files are read as bytes and parsed with .json_backend. Files of 
+    at least _mmap_threshold bytes are memory-mapped instead, if the 
+    backend can parse straight from the mapping. Files are written 
+    with .writer.
     """
 
+    _json_extensions: Tuple = ("json",)
+
+    _ndjson_extensions: Tuple = ("ndjson", "jsonl")
+
+    _mmap_threshold: int = 64 * 1024 * 1024
+
     def __init__(
-            self, folder_path: str, dump_path: str = "") -> None:
+            self, folder_path: str, dump_path: str = "",
+            json_backend: Optional[str] = None) -> None:
         
         self._folder_path = folder_path
         self._dump_path = dump_path
+        self.json_backend: JSONBackend = get_json_backend(json_backend)
+        self.writer = SchemaWriter(self.json_backend)
+        self._all_json_plus_filename: \
+            Optional[List[Tuple[JSONObject, str]]] = None
         
     @property
     def all_json(self):
@@ -30,12 +53,70 @@ class JSONObjectsManager:
     
     @property
     def all_json_plus_filename(self):
-        return self._load_all_json()
+        if self._all_json_plus_filename is None:
+            self._all_json_plus_filename = self._load_all_json()
+        return self._all_json_plus_filename
+
+    def refresh(self) -> None:
+        """
+        Drop cached json objects so the folder is read again on next access.
+        """
+        self._all_json_plus_filename = None
+
+    def iter_json_plus_filename(
+            self, file_names: Optional[Iterable[str]] = None) \
+                -> Iterator[Tuple[JSONObject, str]]:
+        """
+        Lazily read json files in folder, yielding two-tuples of JSONObject 
+        and the origin file's name one file at a time.
+
+        Reads only 'file_names' if given, and all json files otherwise.
+        """
+        if file_names is None:
+            file_names = self.json_file_names
+        for file_name in file_names:
+            yield self.load_json_file(self.get_file_path(file_name)), file_name
+
+    def iter_records(self, filename: str) -> Iterator[JSONObject]:
+        """
+        Lazily read the json documents of file named 'filename' in 
+        folder: the one document of a json file, or one per line of a 
+        newline-delimited json file.
+        """
+        file_path = self.get_file_path(filename)
+        if not self.is_ndjson_file(filename):
+            yield self.load_json_file(file_path)
+            return
+        with open(file_path, "rb") as file:
+            for line in file:
+                if line.strip():
+                    yield self.json_backend.loads(line)
+
+    @property
+    def json_file_names(self) -> List[str]:
+        return self._list_files(self._json_extensions)
+
+    @property
+    def stream_file_names(self) -> List[str]:
+        return self._list_files(self._json_extensions + self._ndjson_extensions)
+
+    def get_file_path(self, filename: str) -> str:
+        """
+        Get path of file named 'filename' in folder.
+        """
+        return os.path.join(self._folder_path, filename)
+
+    @classmethod
+    def is_ndjson_file(cls, filename: str) -> bool:
+        """
+        Check if file holds newline-delimited json, judging by its extension.
+        """
+        return filename.split(".")[-1].lower() in cls._ndjson_extensions
         
     def dump_all_json(self, 
-                json_objs: List[Tuple[JSONObject, str]], dump_path: str = ""):
+                json_objs: Iterable[Tuple[JSONObject, str]], dump_path: str = ""):
         """
-        Write list of JSONObject objects to files.
+        Write JSONObject objects to files, one at a time.
 
         dump_path defaults to dump_path passed during object 
         instantiation if not provided.
@@ -51,28 +132,57 @@ class JSONObjectsManager:
                 self._get_dump_path(json_plus_filename[1], dump_path)
             )
 
-    @staticmethod
     def dump_json_to_file(
-            data: JSONObject, file_path: str) -> JSONObject:
+            self, data: JSONObject, file_path: str) -> bool:
         """
         Write specific JSONObject object to file.
+
+        Return whether the file was written, rather than left as it was 
+        because its content would not change.
         """ 
-        with open(os.path.abspath(file_path), "w") as file:
-            json.dump(data, file, indent=2)
+        return self.writer.write(data, os.path.abspath(file_path))
+
+    def dump_ndjson_to_file(
+            self, data: Iterable[JSONObject], file_path: str) -> bool:
+        """
+        Write JSONObject objects to file, one per line.
 
-    @staticmethod
-    def load_json_file(file_path) -> JSONObject:
+        Return whether the file was written, rather than left as it was 
+        because its content would not change.
+        """
+        return self.writer.write_lines(data, os.path.abspath(file_path))
+
+    def load_json_file(self, file_path) -> JSONObject:
         """
         Read json file into JSONObject.
+
+        Large files are parsed from a read-only memory map, so their 
+        content is never copied into a bytes or str object that would 
+        sit beside the parsed objects.
         """
-        with open(file_path, "r") as file:
-            return json.load(file)
+        with open(file_path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if self.json_backend.parses_buffers and size \
+                and size >= self._mmap_threshold:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) \
+                    as mapped, memoryview(mapped) as view:
+                    return self.json_backend.loads(view)
+            return self.json_backend.load(file)
 
-    def _get_dump_path(self, filename: str, dump_path: str) -> str:
+    def get_output_path(self, filename: str, dump_path: str) -> str:
+        """
+        Get path of file the schema of file named 'filename' is written to.
+        """
+        extension = "ndjson" if self.is_ndjson_file(filename) else "json"
+        return self._get_dump_path(filename, dump_path, extension)
+
+    def _get_dump_path(
+            self, filename: str, dump_path: str, extension: str = "json") \
+                -> str:
         """
         Get path of file to dump json data into.
         """
-        dump_filename = f"{filename.split('.')[:-1][0]}_schema.json"
+        dump_filename = f"{filename.split('.')[:-1][0]}_schema.{extension}"
         dump_path = os.path.join(dump_path, dump_filename)
         return dump_path
 
@@ -81,8 +191,7 @@ class JSONObjectsManager:
         Read all json files in folder into list of two-tuples of JSONObject 
         and the origin file's name.
         """
-        self._files = [file for file in os.listdir(self._folder_path) 
-                 if file.split(".")[-1].lower()=="json"]
+        self._files = self._list_files(self._json_extensions)
         
         all_json_plus_filename = [
             (self.load_json_file(os.path.join(self._folder_path, file_name)),
@@ -90,4 +199,10 @@ class JSONObjectsManager:
             for file_name in self._files
         ]
         return all_json_plus_filename
-            
+
+    def _list_files(self, extensions: Tuple) -> List[str]:
+        """
+        List names of files in folder with any of 'extensions'.
+        """
+        return [file for file in os.listdir(self._folder_path) 
+                if file.split(".")[-1].lower() in extensions]
@@ -0,0 +1,238 @@
+from .json_manager import JSONObject
+from .schema_node import ITEMS_PATH, format_path
+
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import cProfile
+import heapq
+import io
+import json
+import pstats
+import time
+import tracemalloc
+
+
+# Json kind of every python type a parsed document holds.
+_KIND_OF_TYPE: Dict[type, str] = {
+    dict: "object", list: "array", str: "string", int: "integer",
+    float: "number", bool: "boolean", type(None): "null",
+}
+
+
+class RunStats:
+    """
+    Timings and shape statistics of a run, collected only when asked for.
+
+    :param: top: int: optional: number of largest arrays and deepest
+        paths kept.
+
+    - phases: wall and CPU seconds spent in each phase, over all files.
+    - files: wall seconds spent in each phase, per file.
+    - node_counts: number of json values of each kind, over all files.
+    - largest arrays and deepest paths, with the files holding them.
+
+    Nothing here is called unless a run is instrumented, so runs
+    without stats pay nothing for it. Shapes are counted in a walk of
+    their own, outside the timed phases.
+    """
+
+    def __init__(self, top: int = 10) -> None:
+        self.top = top
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.files: Dict[str, Dict[str, float]] = {}
+        self.node_counts: Dict[str, int] = dict.fromkeys(
+            _KIND_OF_TYPE.values(), 0)
+        # Min-heaps of (size, sequence number, file name, path), so the
+        # smallest kept entry is dropped first and paths never compare.
+        self._largest_arrays: List[tuple] = []
+        self._deepest_paths: List[tuple] = []
+        self._sequence = 0
+
+    @contextmanager
+    def timer(self, phase: str, file_name: Optional[str] = None) \
+        -> Iterator[None]:
+        """
+        Time the block as part of 'phase', and of file 'file_name' if
+        given.
+        """
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            timing = self.phases.setdefault(phase, {"wall": 0.0, "cpu": 0.0})
+            timing["wall"] += wall
+            timing["cpu"] += cpu
+            if file_name is not None:
+                file_timing = self.files.setdefault(file_name, {})
+                file_timing[phase] = file_timing.get(phase, 0.0) + wall
+
+    def count_nodes(self, obj: JSONObject, file_name: str = "") -> None:
+        """
+        Add the json values of obj to the node counts, and its arrays
+        and leaf paths to the largest and deepest seen.
+        """
+        node_counts = self.node_counts
+        # Items of an array share a path, so each path is kept once,
+        # with the longest array and greatest depth seen at it.
+        lengths = {}
+        depths = {}
+        stack = [(obj, None, 0)]
+        while stack:
+            value, path, depth = stack.pop()
+            kind = _KIND_OF_TYPE.get(type(value))
+            if kind is None:
+                raise ValueError("Invalid object schema.")
+            node_counts[kind] += 1
+
+            if kind=="object" and value:
+                stack.extend(
+                    (item, (path, key), depth + 1)
+                    for key, item in value.items()
+                )
+                continue
+            if kind=="array":
+                if lengths.get(path, -1) < len(value):
+                    lengths[path] = len(value)
+                if value:
+                    items_path = (path, ITEMS_PATH)
+                    stack.extend(
+                        (item, items_path, depth + 1) for item in value)
+                    continue
+            if depths.get(path, -1) < depth:
+                depths[path] = depth
+
+        for path, length in lengths.items():
+            self._keep(self._largest_arrays, length, file_name, path)
+        for path, depth in depths.items():
+            self._keep(self._deepest_paths, depth, file_name, path)
+
+    def _keep(
+            self, heap: List[tuple], size: int, file_name: str,
+            path: Optional[tuple]) -> None:
+        if len(heap) >= self.top and size <= heap[0][0]:
+            return
+        self._sequence += 1
+        entry = (size, -self._sequence, file_name, path)
+        if len(heap) < self.top:
+            heapq.heappush(heap, entry)
+        else:
+            heapq.heapreplace(heap, entry)
+
+    @property
+    def largest_arrays(self) -> List[Tuple[str, str, int]]:
+        """
+        Three-tuples of file name, path and length of the largest
+        arrays, largest first.
+        """
+        return self._format_entries(self._largest_arrays)
+
+    @property
+    def deepest_paths(self) -> List[Tuple[str, str, int]]:
+        """
+        Three-tuples of file name, path and depth of the deepest
+        leaves, deepest first.
+        """
+        return self._format_entries(self._deepest_paths)
+
+    @staticmethod
+    def _format_entries(heap: List[tuple]) -> List[Tuple[str, str, int]]:
+        return [
+            (file_name, format_path(path), size)
+            for size, _, file_name, path in sorted(heap, reverse=True)
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            "phases": self.phases,
+            "files": self.files,
+            "node_counts": self.node_counts,
+            "largest_arrays": [
+                {"file": file_name, "path": path, "length": length}
+                for file_name, path, length in self.largest_arrays
+            ],
+            "deepest_paths": [
+                {"file": file_name, "path": path, "depth": depth}
+                for file_name, path, depth in self.deepest_paths
+            ],
+        }
+
+    def save(self, file_path: str) -> None:
+        with open(file_path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def report(self) -> str:
+        """
+        Summary of the stats for people to read.
+        """
+        lines = ["Phases:"]
+        for phase, timing in self.phases.items():
+            lines.append(f"  {phase}: {timing['wall']:.3f} s wall, "
+                         f"{timing['cpu']:.3f} s CPU")
+
+        lines.append("Nodes:")
+        for kind, count in self.node_counts.items():
+            if count:
+                lines.append(f"  {kind}: {count}")
+
+        slowest = sorted(
+            self.files.items(), key=lambda item: -sum(item[1].values())
+        )[:self.top]
+        lines.append("Slowest files:")
+        for file_name, timing in slowest:
+            phases = ", ".join(
+                f"{phase} {seconds:.3f} s" for phase, seconds in timing.items()
+            )
+            lines.append(f"  {file_name}: {phases}")
+
+        lines.append("Largest arrays:")
+        for file_name, path, length in self.largest_arrays:
+            lines.append(f"  {file_name}: {path or '(root)'}: {length} items")
+        lines.append("Deepest paths:")
+        for file_name, path, depth in self.deepest_paths:
+            lines.append(f"  {file_name}: {path or '(root)'}: depth {depth}")
+        return "\n".join(lines)
+
+
+def profile_call(
+        function: Callable, *args, limit: int = 25) -> Tuple[object, str]:
+    """
+    Call 'function' with 'args' under cProfile.
+
+    Return two-tuple of its result and the 'limit' costliest functions
+    by cumulative time.
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function, *args)
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output) \
+        .sort_stats("cumulative").print_stats(limit)
+    return result, output.getvalue()
+
+
+def trace_call(
+        function: Callable, *args, limit: int = 10) -> Tuple[object, str]:
+    """
+    Call 'function' with 'args' under tracemalloc.
+
+    Return two-tuple of its result and a report of peak python heap
+    and the 'limit' lines holding the most memory when it returned.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        result = function(*args)
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    lines = [f"Python heap: {current / 1e3:.1f} kB held, "
+             f"{peak / 1e3:.1f} kB at peak"]
+    for stat in snapshot.statistics("lineno")[:limit]:
+        lines.append(f"  {stat}")
+    return result, "\n".join(lines)
@@ -0,0 +1,164 @@
+from .enum_values import EnumValues
+from .json_manager import JSONObject
+from .schema_node import (
+    ITEMS_PATH, SchemaNode, diff_nodes, merge_nodes, node_from_schema,
+    serialize_node
+)
+from .schema_reader import SchemaReader
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class SchemaAccumulator:
+    """
+    Incrementally infers one schema from many json records.
+
+    :param: max_enum_values: int: optional: record the values of enums 
+        under "enum", unless there are more than this many distinct 
+        ones. Values are not recorded by default.
+
+    Records are added one at a time with .add, already inferred schemas
+    with .add_schema, and other accumulators are folded in with .merge.
+    Merging is associative and commutative, so shards of records can be
+    accumulated separately and reduced in any order.
+
+    Widening rules:
+    - integer and number widen to number.
+    - a key missing from some records is tracked as optional.
+    - enum value sets are unioned, and dropped once they grow beyond 
+        max_enum_values. Counts of the values of records added with 
+        .add, or given to .add_schema, are kept per path in .enum_values, 
+        in bounded memory.
+    - otherwise conflicting types are kept as "anyOf" alternatives.
+
+    Work per record is proportional to the size of the record's schema.
+    """
+
+    _default_object_schema: dict = SchemaReader._default_object_schema
+
+    def __init__(self, max_enum_values: Optional[int] = None) -> None:
+        self.max_enum_values = max_enum_values
+        self.enum_values: Dict[str, EnumValues] = {}
+        self._root = SchemaNode()
+        self._count = 0
+
+    @property
+    def count(self) -> int:
+        """
+        Number of records (or schemas) accumulated.
+        """
+        return self._count
+
+    @property
+    def schema(self) -> JSONObject:
+        """
+        Merged schema, in the same format SchemaReader emits.
+        """
+        return serialize_node(self._root, self._default_object_schema)
+
+    @property
+    def optional_paths(self) -> List[str]:
+        """
+        Dotted paths of keys that are absent from some of the objects
+        holding them. Array items are marked with "[]".
+        """
+        return self._collect_optional_paths(self._root)
+
+    def add(self, record: JSONObject) -> None:
+        """
+        Accumulate the schema of json record.
+        """
+        reader = SchemaReader(record, max_enum_values=self.max_enum_values)
+        merge_nodes(
+            self._root, node_from_schema(reader.schema), adopt=True,
+            max_enum_values=self.max_enum_values
+        )
+        self._merge_enum_values(reader.enum_values)
+        self._count += 1
+
+    def add_schema(
+            self, schema: JSONObject, stored: bool = False,
+            enum_values: Optional[Dict[str, EnumValues]] = None) -> None:
+        """
+        Accumulate an already inferred schema as a single record.
+
+        :param: stored: bool: 'schema' was loaded back from a file, see 
+            node_from_schema.
+        :param: enum_values: dict: optional: counts of the enum values 
+            of the record, as in SchemaReader.enum_values, merged into 
+            .enum_values.
+        """
+        merge_nodes(
+            self._root, node_from_schema(schema, stored), adopt=True,
+            max_enum_values=self.max_enum_values
+        )
+        if enum_values:
+            self._merge_enum_values(enum_values)
+        self._count += 1
+
+    def merge(self, other: "SchemaAccumulator") -> "SchemaAccumulator":
+        """
+        Fold 'other' into this accumulator and return this accumulator.
+
+        'other' is left untouched.
+        """
+        merge_nodes(
+            self._root, other._root, adopt=False,
+            max_enum_values=self.max_enum_values
+        )
+        self._merge_enum_values(other.enum_values)
+        self._count += other._count
+        return self
+
+    def _merge_enum_values(self, enum_values: Dict[str, EnumValues]) -> None:
+        for path, values in enum_values.items():
+            if path in self.enum_values:
+                self.enum_values[path].merge(values)
+            else:
+                self.enum_values[path] = EnumValues(
+                    values.max_values, values.top).merge(values)
+
+    def diff(self, other: "SchemaAccumulator") -> List[Tuple[str, str]]:
+        """
+        Describe how this accumulator widened the schema of 'other', as
+        two-tuples of dotted path and change. See diff_nodes.
+
+        Take a copy with SchemaAccumulator().merge(accumulator) before 
+        adding to it, to diff against later.
+        """
+        return diff_nodes(other._root, self._root)
+
+    @classmethod
+    def from_schemas(
+            cls, schemas: Iterable[JSONObject]) -> "SchemaAccumulator":
+        """
+        Build an accumulator out of already inferred schemas.
+        """
+        accumulator = cls()
+        for schema in schemas:
+            accumulator.add_schema(schema)
+        return accumulator
+
+    @classmethod
+    def _collect_optional_paths(cls, root: SchemaNode) -> List[str]:
+        # Walked depth first off an explicit stack of (node, path, 
+        # optional), children pushed in reverse so paths come out in 
+        # order: array items first, then keys as they were seen.
+        paths = []
+        stack = [(root, "", False)]
+        while stack:
+            node, path, optional = stack.pop()
+            if optional:
+                paths.append(path)
+
+            children = []
+            if node.has("array"):
+                children.append((node.items, path + ITEMS_PATH, False))
+            if node.has("object"):
+                for key, value in node.properties.items():
+                    children.append((
+                        value, f"{path}.{key}" if path else key, 
+                        node.counts[key] < node.total
+                    ))
+            stack.extend(reversed(children))
+        return paths
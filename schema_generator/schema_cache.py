@@ -0,0 +1,162 @@
+from typing import Dict, Optional
+import hashlib
+import json
+import os
+import time
+
+
+class SchemaCache:
+    """
+    Persistent record of input files whose schema is already written
+    and up to date, so unchanged files can be skipped entirely.
+
+    :param: cache_path: str: json file the cache is kept in.
+    :param: config: dict: optional: settings that affect the generated
+        schemas. Entries recorded under other settings are misses.
+    :param: use_hash: bool: optional: when size or mtime of a file
+        changed, compare a hash of its content before calling it a miss.
+    :param: max_entries: int: optional: least recently used entries
+        beyond this number are evicted on .save.
+
+    Files are identified by path, size and mtime, as they were before
+    the file was read, so a file changed while it is processed is a
+    miss afterwards. Entries are kept per input and output path, so a 
+    file written to several schema files, e.g. its own and a refreshed 
+    one, has an entry for each. An entry is only a hit if the schema 
+    file it was written to still exists.
+    Entries of files that no longer exist are dropped on .save.
+    """
+
+    _version: int = 2
+
+    _hash_chunk_size: int = 1 << 20
+
+    def __init__(
+            self, cache_path: str, config: Optional[dict] = None,
+            use_hash: bool = False, max_entries: int = 100_000) -> None:
+        self.cache_path = cache_path
+        self.use_hash = use_hash
+        self.max_entries = max_entries
+        self._config_key = self.get_config_key(config or {})
+        self._entries = self._load_entries()
+
+    def __len__(self) -> int:
+        return sum(map(len, self._entries.values()))
+
+    @classmethod
+    def get_config_key(cls, config: dict) -> str:
+        """
+        Fingerprint of the cache format version and generator settings.
+        """
+        fingerprint = json.dumps(
+            {"version": cls._version, "config": config}, sort_keys=True)
+        return hashlib.blake2b(
+            fingerprint.encode(), digest_size=16).hexdigest()
+
+    def is_fresh(self, file_path: str, output_path: str) -> bool:
+        """
+        Check if schema of file at 'file_path' is already up to date in
+        'output_path'.
+        """
+        entry = self._entries.get(os.path.abspath(file_path), {}).get(
+            os.path.abspath(output_path))
+        if entry is None or entry["config"]!=self._config_key \
+            or not os.path.exists(output_path):
+            return False
+
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+
+        if (stat.st_size, stat.st_mtime_ns)!=(entry["size"], entry["mtime"]):
+            if not self.use_hash or entry.get("hash") is None \
+                or entry["hash"]!=self._hash_file(file_path):
+                return False
+            entry["size"] = stat.st_size
+            entry["mtime"] = stat.st_mtime_ns
+
+        entry["last_used"] = time.time()
+        return True
+
+    def get_signature(self, file_path: str) -> Dict[str, object]:
+        """
+        Size, mtime and, with use_hash, hash of the content of file at
+        'file_path', to be taken before the file is read and passed to
+        .update once its schema is written.
+        """
+        stat = os.stat(file_path)
+        return {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": self._hash_file(file_path) if self.use_hash else None,
+        }
+
+    def update(
+            self, file_path: str, output_path: str,
+            signature: Dict[str, object]) -> None:
+        """
+        Record that schema of file at 'file_path', as it was when
+        'signature' was taken with .get_signature, was written to
+        'output_path'.
+        """
+        outputs = self._entries.setdefault(os.path.abspath(file_path), {})
+        outputs[os.path.abspath(output_path)] = {
+            "size": signature["size"],
+            "mtime": signature["mtime"],
+            "hash": signature["hash"],
+            "config": self._config_key,
+            "last_used": time.time(),
+        }
+
+    def save(self) -> None:
+        """
+        Evict stale entries and write the cache to cache_path.
+
+        Writes to a temporary file first and renames it over cache_path,
+        so a crash never leaves a corrupt cache behind.
+        """
+        entries = {
+            file_path: outputs for file_path, outputs in self._entries.items()
+            if os.path.exists(file_path)
+        }
+        if sum(map(len, entries.values())) > self.max_entries:
+            most_recent = sorted(
+                (
+                    (file_path, output_path, entry)
+                    for file_path, outputs in entries.items()
+                    for output_path, entry in outputs.items()
+                ),
+                key=lambda item: item[2]["last_used"], reverse=True
+            )[:self.max_entries]
+            entries = {}
+            for file_path, output_path, entry in most_recent:
+                entries.setdefault(file_path, {})[output_path] = entry
+        self._entries = entries
+
+        temp_path = f"{self.cache_path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump({"version": self._version, "entries": entries}, file)
+        os.replace(temp_path, self.cache_path)
+
+    def _load_entries(self) -> dict:
+        """
+        Read entries from cache_path. A missing, corrupt or outdated
+        cache reads as empty.
+        """
+        try:
+            with open(self.cache_path, "r") as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(cache, dict) or cache.get("version")!=self._version:
+            return {}
+        return cache.get("entries", {})
+
+    def _hash_file(self, file_path: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(self._hash_chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
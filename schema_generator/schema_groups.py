@@ -0,0 +1,256 @@
+from .json_manager import JSONObject, JSONObjectsManager
+from .schema_accumulator import SchemaAccumulator
+from .schema_memo import SchemaMemo
+from .schema_reader import SchemaReader
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+import hashlib
+import json
+import re
+
+
+GroupKey = Tuple[Optional[str], Optional[str]]
+
+
+def get_group_key(record: JSONObject) -> GroupKey:
+    """
+    Group of json record: two-tuple of its attributes.eventType and
+    attributes.subEventType, as strings, None where missing or null.
+    """
+    attributes = record.get("attributes") if isinstance(record, dict) \
+        else None
+    if not isinstance(attributes, dict):
+        return None, None
+    return (
+        _get_group_part(attributes.get("eventType")),
+        _get_group_part(attributes.get("subEventType"))
+    )
+
+
+def _get_group_part(value: JSONObject) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True)
+
+
+def get_group_file_name(key: GroupKey) -> str:
+    """
+    Name of the file the schema of group 'key' is written to.
+
+    Parts made of letters, digits and "-" are joined with "_" as they
+    are. Otherwise characters other than those are replaced with "_", 
+    missing parts read as "unknown", and a short hash of the key is 
+    appended, so that keys do not share files.
+    """
+    parts = [
+        re.sub(r"[^A-Za-z0-9-]", "_", part) if part is not None 
+        else "unknown"
+        for part in key
+    ]
+    if any(
+            part is None or re.fullmatch(r"[A-Za-z0-9-]+", part) is None 
+            for part in key):
+        digest = hashlib.sha1(
+            json.dumps(key).encode("utf-8")).hexdigest()[:8]
+        parts.append(digest)
+    return f"{'_'.join(parts)}_schema.json"
+
+
+def get_group_file_names(keys: List[GroupKey]) -> Dict[GroupKey, str]:
+    """
+    Map of groups 'keys' to the names of the files their schemas are 
+    written to.
+
+    Raises ValueError if two groups map to the same file.
+    """
+    file_names = {}
+    keys_by_file_name = {}
+    for key in keys:
+        file_name = file_names[key] = get_group_file_name(key)
+        other_key = keys_by_file_name.setdefault(file_name, key)
+        if other_key!=key:
+            raise ValueError(
+                f"Groups {other_key!r} and {key!r} would both be written "
+                f"to {file_name}.")
+    return file_names
+
+
+class SchemaGroups:
+    """
+    One SchemaAccumulator per group of records, grouped by event type.
+
+    :param: reader_options: dict: optional: passed on to SchemaReader.
+    :param: memo: SchemaMemo: optional: memo of object schemas, shared
+        with other groups if given.
+
+    Records are routed by get_group_key. Groups are folded together
+    with .merge, so records can be grouped in shards, e.g. one per
+    process, and reduced afterwards. Arrays sampled and paths truncated
+    while reading records are kept in .sampled_arrays and .truncated.
+    """
+
+    def __init__(
+            self, reader_options: Optional[dict] = None,
+            memo: Optional[SchemaMemo] = None) -> None:
+        self.reader_options = reader_options or {}
+        self.groups: Dict[GroupKey, SchemaAccumulator] = {}
+        self._memo = memo if memo is not None else SchemaMemo()
+        # Longest array sampled at each (file name, path), and budgets
+        # exceeded at each (file name, path), over all records.
+        self._sampled_arrays: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._truncated: Dict[Tuple[str, str, str], None] = {}
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def __getstate__(self) -> dict:
+        # The memo only speeds up reading, and is not worth shipping
+        # between processes.
+        state = self.__dict__.copy()
+        state["_memo"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._memo = SchemaMemo()
+
+    @property
+    def count(self) -> int:
+        """
+        Number of records grouped.
+        """
+        return sum(
+            accumulator.count for accumulator in self.groups.values())
+
+    @property
+    def sampled_arrays(self) -> List[Tuple[str, str, int, int]]:
+        """
+        Four-tuples of the file name, dotted path, length and sample 
+        size of the longest array sampled at each path of each file.
+        """
+        return [
+            (file_name, path, length, sample_size)
+            for (file_name, path), (length, sample_size)
+            in self._sampled_arrays.items()
+        ]
+
+    @property
+    def truncated(self) -> List[Tuple[str, str, str]]:
+        """
+        Three-tuples of the file name, dotted path and exceeded budget 
+        of the objects and arrays that were not read.
+        """
+        return list(self._truncated)
+
+    def add(self, record: JSONObject, file_name: str = "") -> None:
+        """
+        Accumulate the schema of json record, read from file 
+        'file_name', into its group.
+        """
+        key = get_group_key(record)
+        accumulator = self.groups.get(key)
+        if accumulator is None:
+            accumulator = self.groups[key] = SchemaAccumulator(
+                self.reader_options.get("max_enum_values"))
+        reader = SchemaReader(record, memo=self._memo, **self.reader_options)
+        accumulator.add_schema(reader.schema, enum_values=reader.enum_values)
+        for path, length, sample_size in reader.sampled_arrays:
+            self._add_sampled_array(file_name, path, length, sample_size)
+        for path, budget in reader.truncated:
+            self._truncated[(file_name, path, budget)] = None
+
+    def _add_sampled_array(
+            self, file_name: str, path: str, length: int, 
+            sample_size: int) -> None:
+        key = (file_name, path)
+        if length > self._sampled_arrays.get(key, (0, 0))[0]:
+            self._sampled_arrays[key] = (length, sample_size)
+
+    def merge(self, other: "SchemaGroups") -> "SchemaGroups":
+        """
+        Fold the groups of 'other' into these groups and return them.
+
+        'other' is left untouched.
+        """
+        for key, accumulator in other.groups.items():
+            if key in self.groups:
+                self.groups[key].merge(accumulator)
+            else:
+                self.groups[key] = SchemaAccumulator(
+                    accumulator.max_enum_values).merge(accumulator)
+        for file_name, path, length, sample_size in other.sampled_arrays:
+            self._add_sampled_array(file_name, path, length, sample_size)
+        self._truncated.update(other._truncated)
+        return self
+
+    def iter_schemas(self) -> Iterator[Tuple[GroupKey, JSONObject]]:
+        """
+        Yield two-tuples of group and its schema, ordered by group.
+        """
+        for key in sorted(self.groups, key=_sort_key):
+            yield key, self.groups[key].schema
+
+
+def _sort_key(key: GroupKey) -> tuple:
+    return tuple((part is not None, str(part)) for part in key)
+
+
+def group_json_files(
+        folder_path: str, file_names: List[str],
+        reader_options: Optional[dict] = None,
+        json_backend: Optional[str] = None) \
+            -> Tuple[SchemaGroups, List[Tuple[str, str]]]:
+    """
+    Group the records of json and newline-delimited json files
+    'file_names' in 'folder_path'.
+
+    Return two-tuple of the groups and a list of two-tuples of the 
+    names of files that failed and their error messages. A failing 
+    file does not abort the others, and none of its records are 
+    grouped.
+
+    Runs in worker processes, so only names cross process boundaries
+    on the way in.
+    """
+    json_manager = JSONObjectsManager(folder_path, json_backend=json_backend)
+    groups = SchemaGroups(reader_options)
+    failures = []
+    for file_name in file_names:
+        file_groups = SchemaGroups(reader_options, memo=groups._memo)
+        try:
+            for record in json_manager.iter_records(file_name):
+                file_groups.add(record, file_name)
+        except Exception as error:
+            failures.append((file_name, f"{type(error).__name__}: {error}"))
+            continue
+        groups.merge(file_groups)
+    return groups, failures
+
+
+def group_json_files_parallel(
+        workers: int, folder_path: str, file_names: List[str],
+        reader_options: Optional[dict] = None,
+        json_backend: Optional[str] = None) \
+            -> Tuple[SchemaGroups, List[Tuple[str, str]]]:
+    """
+    Group the records of 'file_names' as group_json_files does, with
+    files split into one shard per worker process.
+
+    Each worker reduces its shard into per-group accumulators, which
+    are then folded together in shard order, so the result does not
+    depend on which worker finishes first. Failures of all shards are
+    returned along with the groups.
+    """
+    shards = [file_names[index::workers] for index in range(workers)]
+    shards = [shard for shard in shards if shard]
+    groups = SchemaGroups(reader_options)
+    failures = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard_groups, shard_failures in executor.map(
+                group_json_files, [folder_path] * len(shards), shards,
+                [reader_options] * len(shards),
+                [json_backend] * len(shards)):
+            groups.merge(shard_groups)
+            failures.extend(shard_failures)
+    return groups, failures
@@ -0,0 +1,90 @@
+from .json_manager import JSONObject
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class SchemaMemo:
+    """
+    Bounded least recently used table of the schemas of flat json 
+    objects, i.e. objects whose values are all leaves.
+
+    :param: max_size: int: optional: number of schemas kept. The least 
+        recently used schema is evicted when a new one does not fit.
+
+    A flat object's structural fingerprint is its keys, in order, and 
+    the types of its values. Schemas are looked up by keys first, so 
+    the types are only computed for objects that may be a hit. The 
+    memo is bounded by number of schemas, whatever their keys: the 
+    schemas of the least recently used keys are evicted first, and the
+    oldest schemas of keys once no other keys are left.
+
+    Lookups that found a schema are counted in .hits, schemas added 
+    after a failed lookup in .misses. One memo can be shared by many 
+    SchemaReader objects, so shapes repeated across files are reused 
+    as well.
+    """
+
+    def __init__(self, max_size: int = 1024) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._schemas = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, obj: dict, keys: Tuple[str, ...]) -> Optional[JSONObject]:
+        """
+        Return memoized schema of flat object 'obj' with keys 'keys', 
+        or None.
+        """
+        schemas = self._schemas.get(keys)
+        if schemas is None:
+            return None
+        schema = schemas.get(tuple(map(type, obj.values())))
+        if schema is None:
+            return None
+
+        self._schemas.move_to_end(keys)
+        self.hits += 1
+        return schema
+
+    def put(self, obj: dict, keys: Tuple[str, ...], schema: JSONObject) \
+        -> None:
+        """
+        Memoize 'schema' of flat object 'obj' with keys 'keys'.
+        """
+        self.misses += 1
+        if self.max_size <= 0:
+            return
+
+        schemas = self._schemas.get(keys)
+        if schemas is None:
+            schemas = self._schemas[keys] = {}
+        else:
+            self._schemas.move_to_end(keys)
+        types = tuple(map(type, obj.values()))
+        if types not in schemas:
+            self._size += 1
+        schemas[types] = schema
+
+        while self._size > self.max_size:
+            oldest_keys = next(iter(self._schemas))
+            if oldest_keys==keys:
+                del schemas[next(iter(schemas))]
+                self._size -= 1
+            else:
+                self._size -= len(self._schemas.pop(oldest_keys))
+
+    def clear(self) -> None:
+        self._schemas.clear()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,440 @@
+from .json_manager import JSONObject
+
+from typing import Dict, List, Optional, Tuple
+import sys
+
+
+# Fixed order in which the alternatives of a widened schema are emitted,
+# so merged output does not depend on the order of the inputs.
+KIND_ORDER: tuple = (
+    "object", "array", "enum", "string", "integer", "number", "boolean", "null"
+)
+
+ITEMS_PATH: str = "[]"
+
+# "items" of arrays whose items are unknown, e.g. empty arrays. Told 
+# apart from the {} of an array of empty objects by identity, so it is
+# shared and never mutated.
+UNKNOWN_ITEMS: dict = {}
+
+# Kinds of a node are kept as bits of one int, so sets of kinds are
+# merged with | and compared with ==.
+_KIND_BITS: Dict[str, int] = {
+    kind: 1 << index for index, kind in enumerate(KIND_ORDER)
+}
+
+# Kinds of every combination of bits, in KIND_ORDER.
+_KINDS_OF_BITS: tuple = tuple(
+    tuple(kind for kind in KIND_ORDER if bits & _KIND_BITS[kind])
+    for bits in range(1 << len(KIND_ORDER))
+)
+
+_OBJECT: int = _KIND_BITS["object"]
+_ARRAY: int = _KIND_BITS["array"]
+_ENUM: int = _KIND_BITS["enum"]
+_INTEGER: int = _KIND_BITS["integer"]
+_NUMBER: int = _KIND_BITS["number"]
+
+
+class SchemaNode:
+    """
+    What is known about the json values seen at one position.
+
+    - kinds: bits of the json kinds seen, in KIND_ORDER.
+    - properties, counts, total: for "object", nodes of the keys,
+        number of objects holding each key and number of objects.
+    - items: for "array", node of the items.
+    - enum: for "enum", set of known values. An empty set stands for
+        values that were not recorded, or too many to keep.
+    - truncated: "object" and "array" kinds seen without their keys or
+        items, e.g. over a budget, mapped to their "description". 
+        These stay open, whatever keys or items are merged in.
+
+    Attributes of kinds not seen are None. Slots keep a node about a
+    third the size of the dict it replaces, and property keys are
+    interned, so many schemas held at once share their key strings.
+    """
+
+    __slots__ = (
+        "kinds", "properties", "counts", "total", "items", "enum", "truncated"
+    )
+
+    def __init__(self, kinds: int = 0) -> None:
+        self.kinds = kinds
+        self.properties: Optional[Dict[str, "SchemaNode"]] = None
+        self.counts: Optional[Dict[str, int]] = None
+        self.total = 0
+        self.items: Optional["SchemaNode"] = None
+        self.enum: Optional[set] = None
+        self.truncated: Optional[Dict[str, str]] = None
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not SchemaNode:
+            return NotImplemented
+        # Compared pair by pair off an explicit stack, so there is no 
+        # limit on nesting depth.
+        stack = [(self, other)]
+        while stack:
+            node, other = stack.pop()
+            if node.kinds!=other.kinds or node.total!=other.total \
+                or node.enum!=other.enum or node.counts!=other.counts \
+                    or node.truncated!=other.truncated:
+                return False
+
+            if (node.items is None)!=(other.items is None):
+                return False
+            if node.items is not None:
+                stack.append((node.items, other.items))
+
+            properties = node.properties
+            other_properties = other.properties
+            if properties is None or other_properties is None:
+                if properties is not other_properties:
+                    return False
+            elif properties.keys()!=other_properties.keys():
+                return False
+            else:
+                stack.extend(
+                    (value, other_properties[key])
+                    for key, value in properties.items()
+                )
+        return True
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"SchemaNode({', '.join(_KINDS_OF_BITS[self.kinds])})"
+
+    def has(self, kind: str) -> bool:
+        """
+        Check if values of json kind 'kind' were seen.
+        """
+        return bool(self.kinds & _KIND_BITS[kind])
+
+
+def format_path(path: Optional[tuple]) -> str:
+    """
+    Format a path kept as nested (parent_path, key) two-tuples, with
+    None for the root, as a dotted string. Array items are marked "[]".
+    """
+    keys = []
+    while path is not None:
+        path, key = path
+        keys.append(key)
+
+    formatted = ""
+    for key in reversed(keys):
+        if key==ITEMS_PATH or not formatted:
+            formatted += key
+        else:
+            formatted += f".{key}"
+    return formatted
+
+
+def get_path_depth(path: Optional[tuple], limit: Optional[int] = None) \
+    -> int:
+    """
+    Number of keys of a path kept as nested (parent_path, key) 
+    two-tuples, counting no further than 'limit' if given.
+    """
+    depth = 0
+    while path is not None and depth!=limit:
+        path = path[0]
+        depth += 1
+    return depth
+
+
+class _Alternatives:
+    """
+    Nodes of the alternatives of an "anyOf", to be merged into one node
+    once all of them have been built.
+    """
+
+    __slots__ = ("nodes",)
+
+    def __init__(self, nodes: List[SchemaNode]) -> None:
+        self.nodes = nodes
+
+
+def node_from_schema(schema: JSONObject, stored: bool = False) \
+        -> SchemaNode:
+    """
+    Convert 'schema', in the format SchemaReader emits, into a node.
+
+    With 'stored', 'schema' was loaded back from a file, where 
+    UNKNOWN_ITEMS is a {} like any other, so every "items": {} reads as
+    unknown items.
+
+    Walks 'schema' with an explicit stack of (schema, node) pairs, 
+    filling in each node once it is popped, so there is no limit on 
+    nesting depth.
+    """
+    root = SchemaNode()
+    stack = [(schema, root)]
+    while stack:
+        schema, node = stack.pop()
+        if schema.__class__ is _Alternatives:
+            # Sits below its alternatives on the stack, so runs once all 
+            # of them are built.
+            for alternative in schema.nodes:
+                merge_nodes(node, alternative, adopt=True)
+            continue
+
+        if not isinstance(schema, dict):
+            raise ValueError("Invalid schema.")
+
+        schema_type = schema.get("type")
+        if isinstance(schema_type, str):
+            kind = _KIND_BITS.get(schema_type)
+            if kind is None:
+                raise ValueError(f"Invalid schema type {schema_type!r}.")
+            node.kinds = kind
+            if kind==_ARRAY:
+                # Items are unknown if missing or UNKNOWN_ITEMS, any 
+                # other {} is an array of empty objects.
+                node.items = SchemaNode()
+                items = schema.get("items", UNKNOWN_ITEMS)
+                if items is not UNKNOWN_ITEMS and (items or not stored):
+                    stack.append((items, node.items))
+                elif schema.get("description"):
+                    # Items were not read, e.g. over a budget.
+                    node.truncated = {"array": schema["description"]}
+            elif kind==_ENUM:
+                node.enum = set(schema.get("enum", ()))
+            elif kind==_OBJECT:
+                # An object whose keys were not read, e.g. over a budget.
+                node.properties = {}
+                node.counts = {}
+                node.total = 1
+                node.truncated = {"object": schema.get("description", "")}
+            continue
+
+        alternatives = schema.get("anyOf")
+        if isinstance(alternatives, list):
+            nodes = [SchemaNode() for _ in alternatives]
+            stack.append((_Alternatives(nodes), node))
+            stack.extend(zip(alternatives, nodes))
+            continue
+
+        node.kinds = _OBJECT
+        properties = node.properties = {}
+        for key, value in schema.items():
+            property_node = properties[sys.intern(key)] = SchemaNode()
+            stack.append((value, property_node))
+        node.counts = dict.fromkeys(properties, 1)
+        node.total = 1
+    return root
+
+
+def merge_nodes(
+        target: SchemaNode, source: SchemaNode, adopt: bool,
+        max_enum_values: Optional[int] = None) -> None:
+    """
+    Merge node 'source' into node 'target' in place.
+
+    Parts of 'source' missing from 'target' are moved over as they
+    are if 'adopt' is set, and copied otherwise. integer widens to
+    number, enum values are unioned and object key counts are summed.
+
+    Enum values unknown on either side, or more than 'max_enum_values'
+    if given, leave the values of the merged enum unknown.
+
+    Nodes held by both are merged with an explicit stack, so there is 
+    no limit on nesting depth.
+    """
+    stack = [(target, source)]
+    while stack:
+        target, source = stack.pop()
+        kinds = source.kinds
+
+        if kinds & _OBJECT:
+            if target.kinds & _OBJECT:
+                properties = target.properties
+                counts = target.counts
+                for key, node in source.properties.items():
+                    if key in properties:
+                        stack.append((properties[key], node))
+                        counts[key] += source.counts[key]
+                    else:
+                        properties[key] = node if adopt else copy_node(node)
+                        counts[key] = source.counts[key]
+                target.total += source.total
+            elif adopt:
+                target.properties = source.properties
+                target.counts = source.counts
+                target.total = source.total
+            else:
+                _copy_object(target, source)
+
+        if kinds & _ARRAY:
+            if target.kinds & _ARRAY:
+                stack.append((target.items, source.items))
+            else:
+                target.items = source.items if adopt \
+                    else copy_node(source.items)
+
+        if kinds & _ENUM:
+            if target.kinds & _ENUM:
+                if target.enum and source.enum:
+                    target.enum |= source.enum
+                    if max_enum_values is not None \
+                        and len(target.enum) > max_enum_values:
+                        target.enum = set()
+                else:
+                    target.enum = set()
+            else:
+                target.enum = source.enum if adopt else set(source.enum)
+
+        if source.truncated is not None:
+            if target.truncated is None:
+                target.truncated = dict(source.truncated)
+            else:
+                for kind, description in source.truncated.items():
+                    target.truncated.setdefault(kind, description)
+
+        target.kinds |= kinds
+        if target.kinds & _NUMBER:
+            target.kinds &= ~_INTEGER
+
+
+def copy_node(node: SchemaNode) -> SchemaNode:
+    """
+    Deep copy of 'node', made with an explicit stack.
+    """
+    root = SchemaNode()
+    stack = [(node, root)]
+    while stack:
+        node, copy = stack.pop()
+        copy.kinds = node.kinds
+        if node.kinds & _OBJECT:
+            properties = copy.properties = {}
+            for key, value in node.properties.items():
+                property_copy = properties[key] = SchemaNode()
+                stack.append((value, property_copy))
+            copy.counts = dict(node.counts)
+            copy.total = node.total
+        if node.kinds & _ARRAY:
+            copy.items = SchemaNode()
+            stack.append((node.items, copy.items))
+        if node.kinds & _ENUM:
+            copy.enum = set(node.enum)
+        if node.truncated is not None:
+            copy.truncated = dict(node.truncated)
+    return root
+
+
+def _copy_object(target: SchemaNode, source: SchemaNode) -> None:
+    target.properties = {
+        key: copy_node(node) for key, node in source.properties.items()
+    }
+    target.counts = dict(source.counts)
+    target.total = source.total
+
+
+def serialize_node(
+        node: SchemaNode, default_object_schema: dict) -> JSONObject:
+    """
+    Convert node back into the schema format SchemaReader emits,
+    padding leaves with 'default_object_schema'.
+
+    Nested nodes get a placeholder and are queued on an explicit stack 
+    as (node, parent_schema, key) to fill it in, so there is no limit 
+    on nesting depth.
+    """
+    root = [None]
+    stack = [(node, root, 0)]
+    while stack:
+        node, parent_schema, key = stack.pop()
+        kinds = _KINDS_OF_BITS[node.kinds]
+        if not kinds:
+            parent_schema[key] = {}
+        elif len(kinds)==1:
+            parent_schema[key] = _serialize_kind(
+                node, kinds[0], default_object_schema, stack)
+        else:
+            parent_schema[key] = {"anyOf": [
+                _serialize_kind(node, kind, default_object_schema, stack)
+                for kind in kinds
+            ]}
+    return root[0]
+
+
+def _serialize_kind(
+        node: SchemaNode, kind: str, default_object_schema: dict,
+        stack: list) -> JSONObject:
+    if node.truncated is not None and kind in node.truncated:
+        # Keys or items merged in from elsewhere do not close it.
+        schema = default_object_schema.copy()
+        schema["description"] = node.truncated[kind]
+        schema["type"] = kind
+        if kind=="array":
+            schema["items"] = UNKNOWN_ITEMS
+        return schema
+
+    if kind=="object":
+        # Keys are placed up front, so they keep their order.
+        schema = dict.fromkeys(node.properties)
+        stack.extend(
+            (value, schema, key) for key, value in node.properties.items()
+        )
+        return schema
+
+    schema = default_object_schema.copy()
+    schema["type"] = kind
+    if kind=="array":
+        if node.items.kinds:
+            schema["items"] = None
+            stack.append((node.items, schema, "items"))
+        else:
+            schema["items"] = UNKNOWN_ITEMS
+    elif kind=="enum" and node.enum:
+        schema["enum"] = sorted(node.enum)
+    return schema
+
+
+def diff_nodes(old: SchemaNode, new: SchemaNode) -> List[Tuple[str, str]]:
+    """
+    Describe how node 'new' widened node 'old', as two-tuples of dotted 
+    path and change, sorted by path:
+
+    - "added": a key not held by the object at path before.
+    - "type OLD -> NEW": kinds seen at path, before and after.
+    - "enum +N values": values added to the enum at path.
+
+    Keys of an object that was not an object before are not listed, 
+    as its type change already covers them.
+    """
+    changes = []
+    stack = [(old, new, None)]
+    while stack:
+        old, new, path = stack.pop()
+        if new.kinds!=old.kinds:
+            changes.append((
+                format_path(path),
+                f"type {_format_kinds(old.kinds)} -> "
+                f"{_format_kinds(new.kinds)}"
+            ))
+
+        if new.kinds & old.kinds & _OBJECT:
+            for key, node in new.properties.items():
+                key_path = (path, key)
+                if key in old.properties:
+                    stack.append((old.properties[key], node, key_path))
+                else:
+                    changes.append((format_path(key_path), "added"))
+
+        if new.kinds & old.kinds & _ARRAY:
+            stack.append((old.items, new.items, (path, ITEMS_PATH)))
+
+        if new.kinds & old.kinds & _ENUM:
+            values = new.enum - old.enum
+            if values:
+                changes.append(
+                    (format_path(path), f"enum +{len(values)} values"))
+
+    changes.sort()
+    return changes
+
+
+def _format_kinds(kinds: int) -> str:
+    return ", ".join(_KINDS_OF_BITS[kinds]) or "none"
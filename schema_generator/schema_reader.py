@@ -1,7 +1,38 @@
+from .enum_values import EnumValues
 from .json_manager import JSONObject
+from .schema_memo import SchemaMemo
+from .schema_node import (
+    ITEMS_PATH, UNKNOWN_ITEMS, SchemaNode, format_path, get_path_depth, 
+    merge_nodes, node_from_schema, serialize_node
+)
 
-from typing import Tuple
-import copy
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import itertools
+import random
+import time
+
+
+class _ArrayItems:
+    """
+    Schemas of the items of one array, to be merged into its 'items'
+    once all of them have been built.
+    """
+
+    __slots__ = ("schemas",)
+
+    def __init__(self, schemas: list) -> None:
+        self.schemas = schemas
+
+
+class _OverBudget(Exception):
+    """
+    Raised by the items of an array read past the time budget, with the 
+    budget exceeded.
+    """
+
+
+# Items of an array read between checks of the time budget.
+_ITEMS_PER_TIME_CHECK = 4096
 
 
 class SchemaReader:
@@ -9,11 +40,45 @@ class SchemaReader:
     Reads schema of native python object that would qualify as valid json.
 
     :param: python object that qualifies as valid json.
+    :param: array_sample_size: int: optional: infer the schema of arrays 
+        longer than this from a sample of this many items only.
+    :param: array_sampling: str: optional: "first" to sample the first 
+        items of arrays, "reservoir" to sample items uniformly at random.
+    :param: seed: optional: seed for "reservoir" sampling.
+    :param: memo: SchemaMemo: optional: memo of object schemas to reuse, 
+        e.g. one shared with other readers. Defaults to a new memo.
+    :param: max_enum_values: int: optional: record the values of enums 
+        under "enum", unless there are more than this many distinct 
+        ones. Values are not recorded by default.
+    :param: max_nodes: int: optional: read no more than this many values.
+    :param: max_depth: int: optional: read no objects or arrays nested 
+        deeper than this, "message" being at depth 1.
+    :param: max_seconds: float: optional: read no more objects or arrays 
+        once building the schema took this long.
 
     Does not check that passed object is actually valid json.
     That is the responsibility of the caller.
+
+    The schema is built on first access of .schema and reused afterwards.
+    The items of an array are merged into one deduplicated schema, with 
+    integer widened to number and other conflicting types listed under 
+    "anyOf". Arrays that were sampled are listed in .sampled_arrays.
+    If max_enum_values is given, counts of the values of the enums at 
+    each path are kept in .enum_values, in bounded memory.
+
+    Objects and arrays over a budget are not read: their schema is 
+    {"type": "object"} or an array of unknown items, with the budget 
+    they exceeded in "description", and they are listed in .truncated. 
+    The budgets bound the work of pathological documents, so that one 
+    of them cannot hold up a whole run.
+
+    Objects whose values are all leaves are memoized by their keys and 
+    the types of their values, so repeated shapes share one schema. 
+    The returned schema must therefore be treated as read-only.
     """
 
+    _array_samplings: Tuple = ("first", "reservoir")
+
     _default_object_schema: dict = {
         "type": "",
         "tag": "",
@@ -23,10 +88,44 @@ class SchemaReader:
 
     _keys_of_interest: Tuple = ("message",)
 
+    # Json type of each leaf class, looked up by exact class. Parsers 
+    # only produce these classes, so subclasses, and bool apart from 
+    # int, need no isinstance chain on the hot path.
+    _leaf_types: dict = {
+        str: "string",
+        int: "integer",
+        float: "number",
+        bool: "boolean",
+        type(None): "null",
+    }
+
     schema: JSONObject = {}
 
-    def __init__(self, obj: JSONObject) -> None:
+    def __init__(
+            self, obj: JSONObject, array_sample_size: Optional[int] = None,
+            array_sampling: str = "first", seed=None,
+            memo: Optional[SchemaMemo] = None,
+            max_enum_values: Optional[int] = None,
+            max_nodes: Optional[int] = None,
+            max_depth: Optional[int] = None,
+            max_seconds: Optional[float] = None) -> None:
+        if array_sampling not in self._array_samplings:
+            raise ValueError(f"Invalid array sampling {array_sampling!r}.")
+
         self.obj = obj
+        self.array_sample_size = array_sample_size
+        self.array_sampling = array_sampling
+        self.sampled_arrays: List[Tuple[str, int, int]] = []
+        self._random = random.Random(seed)
+        self.memo = memo if memo is not None else SchemaMemo()
+        self.max_enum_values = max_enum_values
+        self._enum_values: Dict[Optional[tuple], EnumValues] = {}
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.max_seconds = max_seconds
+        self._truncated_schemas: Dict[Tuple[str, str, bool], dict] = {}
+        self._deadline: Optional[float] = None
+        self._schema: Optional[JSONObject] = None
 
     @property
     def obj_subset_to_read(self):
@@ -34,9 +133,32 @@ class SchemaReader:
             key: self.obj.get(key) for key in self._keys_of_interest
         }
 
+    @property
+    def enum_values(self) -> Dict[str, EnumValues]:
+        """
+        Values of the enums read, by dotted path. Array items are 
+        marked with "[]".
+        """
+        return {
+            format_path(path): values 
+            for path, values in self._enum_values.items()
+        }
+
+    @property
+    def truncated(self) -> List[Tuple[str, str]]:
+        """
+        Two-tuples of the dotted path and the exceeded budget of the 
+        objects and arrays that were not read.
+        """
+        return list(dict.fromkeys(
+            (path, budget) for path, budget, _ in self._truncated_schemas
+        ))
+
     @property
     def schema(self):
-        return self._build_schema()
+        if self._schema is None:
+            self._schema = self._build_schema()
+        return self._schema
 
     def _build_schema(self) -> JSONObject:
         """
@@ -53,73 +175,351 @@ class SchemaReader:
     def _get_object_schema(self, obj: JSONObject) \
         -> JSONObject:
         """
-        Recursively build up schema of 'obj'.
+        Build up schema of 'obj'.
+
+        Walks 'obj' with an explicit stack rather than recursion, so there
+        is no limit on nesting depth. Leaves are resolved on the spot, 
+        while nested containers get a placeholder and are queued on the 
+        stack as (container, parent_schema, key, path) to fill it in.
+
+        Each node is handed to the handler of its exact class, looked up 
+        in a table, falling back to isinstance checks for subclasses.
         """
+        handlers = self._get_handlers()
+        check_budgets = self._get_budget_check()
+        root = [None]
+        pending = [(obj, root, 0, None)]
 
-        schema = copy.deepcopy(self._default_object_schema)
+        while pending:
+            obj, parent_schema, key, path = pending.pop()
+            handler = handlers.get(obj.__class__)
+            if handler is None:
+                handler = handlers[
+                    dict if isinstance(obj, dict) 
+                    else list if isinstance(obj, list) else str
+                ]
 
-        if isinstance(obj, int) and not isinstance(obj, bool):
-            schema["type"] = "integer"
+            # The keys of interest themselves are always read.
+            if check_budgets is not None and path is not None \
+                and isinstance(obj, (dict, list)):
+                budget = check_budgets(obj, path)
+                if budget is not None:
+                    parent_schema[key] = self._get_truncated_schema(
+                        obj, path, budget)
+                    continue
 
-        elif isinstance(obj, float):
-            schema["type"] = "number"
+            parent_schema[key] = handler(obj, pending, path)
 
-        elif isinstance(obj, bool):
-            schema["type"] = "boolean"
+        return root[0]
 
-        elif isinstance(obj, str):
-            schema["type"] = "string"
+    def _get_budget_check(self) \
+        -> Optional[Callable[[JSONObject, Optional[tuple]], Optional[str]]]:
+        """
+        Build the check of objects and arrays against the budgets of the 
+        reader, None if there are none. The check counts the values of 
+        each object or array that fits, and returns the budget exceeded 
+        by one that does not, None if it fits.
+        """
+        max_nodes = self.max_nodes
+        max_depth = self.max_depth
+        max_seconds = self.max_seconds
+        if max_nodes is None and max_depth is None and max_seconds is None:
+            return None
 
-        elif obj is None:
-            schema["type"] = "null"
+        sample_size = self.array_sample_size
+        deadline = self._deadline = None if max_seconds is None \
+            else time.perf_counter() + max_seconds
+        nodes = 1
+
+        def check_budgets(
+                obj: JSONObject, path: Optional[tuple]) -> Optional[str]:
+            nonlocal nodes
+            if max_depth is not None \
+                and get_path_depth(path, max_depth + 1) > max_depth:
+                return f"deeper than {max_depth}"
+            if deadline is not None and time.perf_counter() > deadline:
+                return f"over {max_seconds} s"
+            if max_nodes is not None:
+                size = len(obj)
+                if sample_size is not None and obj.__class__ is list:
+                    size = min(size, sample_size)
+                if nodes + size > max_nodes:
+                    return f"over {max_nodes} nodes"
+                nodes += size
+            return None
+        return check_budgets
+
+    def _get_truncated_schema(
+            self, obj: JSONObject, path: Optional[tuple], budget: str) \
+                -> dict:
+        """
+        Build schema of object or array 'obj' that is over 'budget', 
+        without reading it, and record it in self.truncated.
+
+        Schemas are shared by path, so the items of an array that are 
+        all over budget are reported once and keep their schema.
+        """
+        is_object = isinstance(obj, dict)
+        key = (format_path(path), budget, is_object)
+        schema = self._truncated_schemas.get(key)
+        if schema is not None:
+            return schema
+
+        schema = self._truncated_schemas[key] = \
+            self._default_object_schema.copy()
+        schema["description"] = f"truncated: {budget}"
+        if is_object:
+            schema["type"] = "object"
+        else:
+            schema["type"] = "array"
+            schema["items"] = UNKNOWN_ITEMS
+        return schema
+
+    def _get_handlers(self) -> Dict[type, Callable]:
+        """
+        Table of the handlers of nodes by class. Handlers take a node, 
+        the stack of pending nodes and the path of the node, and return 
+        the schema of the node.
+        """
+        get_leaf_schema = self._get_leaf_schema
+        merge_array_items = self._merge_array_items
+
+        def handle_leaf(
+                obj: JSONObject, pending: list, path: Optional[tuple]) \
+                    -> dict:
+            return get_leaf_schema(obj)
 
-        elif isinstance(obj, dict):
-            schema = self._build_object_schema_properties(obj)
+        def handle_array_items(
+                obj: _ArrayItems, pending: list, path: Optional[tuple]) \
+                    -> JSONObject:
+            return merge_array_items(obj.schemas)
 
-        elif isinstance(obj, list):
+        handlers = dict.fromkeys(self._leaf_types, handle_leaf)
+        handlers[dict] = self._build_object_schema_properties
+        handlers[list] = self._get_array_schema
+        handlers[_ArrayItems] = handle_array_items
+        return handlers
+
+    def _get_array_schema(
+            self, obj: list, pending: list, path: Optional[tuple] = None) \
+                -> dict:
+        """
+        Build schema of list 'obj', an enum if it holds only strings, 
+        else an array whose nested items are queued on 'pending'.
+        """
+        obj = self._sample_array(obj, path)
+        # All default values are immutable, so a shallow copy suffices.
+        schema = self._default_object_schema.copy()
+        try:
             list_item_types = self._get_list_item_types(obj)
 
-            if len(list_item_types)==1 and \
-                issubclass(list_item_types[0], str):
+            if len(list_item_types)==1 \
+                and issubclass(list_item_types[0], str):
                 schema["type"] = "enum"
+                if self.max_enum_values is not None:
+                    self._add_enum_values(schema, obj, path)
 
             else:
                 schema["type"] = "array"
-                schema["items"] = self._build_array_schema_items(
-                    obj, list_item_types)
+                self._build_array_schema_items(
+                    schema, obj, list_item_types, pending, path)
+
+        # Huge arrays would run past the time budget before the next
+        # node is checked against it.
+        except _OverBudget as error:
+            return self._get_truncated_schema(obj, path, str(error))
+        return schema
+
+    def _get_leaf_schema(self, obj: JSONObject) -> dict:
+        """
+        Build schema of 'obj' that is neither a dict nor a list.
+        """
+        schema = self._default_object_schema.copy()
+        leaf_type = self._leaf_types.get(obj.__class__)
+        if leaf_type is not None:
+            schema["type"] = leaf_type
+
+        # Subclasses of the leaf classes.
+        elif isinstance(obj, str):
+            schema["type"] = "string"
+
+        elif isinstance(obj, int) and not isinstance(obj, bool):
+            schema["type"] = "integer"
+
+        elif isinstance(obj, float):
+            schema["type"] = "number"
+
+        elif isinstance(obj, bool):
+            schema["type"] = "boolean"
+
+        elif obj is None:
+            schema["type"] = "null"
 
         else:
             raise ValueError("Invalid object schema.")
-        
+
         return schema
         
-    def _build_object_schema_properties(self, obj: dict) -> dict:
+    def _build_object_schema_properties(
+            self, obj: dict, pending: list, path: Optional[tuple] = None) \
+                -> dict:
         """
         Build up 'properties' of json objects of the 'object' type.
+
+        Nested containers are queued on 'pending' to be filled in later.
+        Objects without nested containers are looked up in and added to 
+        self.memo by their structural fingerprint.
         """
-        props = {key: self._get_object_schema(value) 
-                 for key, value in obj.items()}
+        keys = tuple(obj)
+        props = self.memo.get(obj, keys)
+        if props is not None:
+            return props
+
+        no_of_pending = len(pending)
+        default_object_schema = self._default_object_schema
+        leaf_types = self._leaf_types
+        get_leaf_schema = self._get_leaf_schema
+        props = {}
+        for key, value in obj.items():
+            # Inlined fast path for leaves of the exact leaf classes.
+            leaf_type = leaf_types.get(value.__class__)
+            if leaf_type is not None:
+                schema = props[key] = default_object_schema.copy()
+                schema["type"] = leaf_type
+            elif isinstance(value, (dict, list)):
+                props[key] = None
+                pending.append((value, props, key, (path, key)))
+            else:
+                props[key] = get_leaf_schema(value)
+
+        if len(pending)==no_of_pending:
+            self.memo.put(obj, keys, props)
         return props
     
     def _build_array_schema_items(
-            self, obj: list, list_item_types: list) -> list:
+            self, schema: dict, obj: list, list_item_types: list,
+            pending: list, path: Optional[tuple] = None) -> None:
         """
-        Build up 'items' of json objects of the 'array' type.
+        Build up 'items' of array 'schema' of json object 'obj'.
+
+        Leaf items contribute one schema per distinct type. Nested 
+        containers are queued on 'pending', under a final step that 
+        merges all item schemas once they are built.
         """
         no_of_types = len(list_item_types)
-        if no_of_types==1:
-            items = self._get_object_schema(obj[0])
+        if no_of_types==0:
+            schema["items"] = UNKNOWN_ITEMS
+            return
+        if no_of_types==1 and not issubclass(list_item_types[0], (dict, list)):
+            schema["items"] = self._get_leaf_schema(obj[0])
+            return
+
+        item_schemas = []
+        item_path = (path, ITEMS_PATH)
+        queued = []
+        leaf_types = self._leaf_types
+        seen_leaf_types = set()
+        for item in self._iter_items(obj):
+            item_type = item.__class__
+            if item_type in leaf_types or not isinstance(item, (dict, list)):
+                if item_type not in seen_leaf_types:
+                    seen_leaf_types.add(item_type)
+                    item_schemas.append(self._get_leaf_schema(item))
+            else:
+                queued.append((item, item_schemas, len(item_schemas), item_path))
+                item_schemas.append(None)
+
+        if not queued:
+            schema["items"] = self._merge_array_items(item_schemas)
+            return
+
+        # The merge step sits below the queued items on the stack, so it
+        # only runs once all of them are built.
+        pending.append((_ArrayItems(item_schemas), schema, "items", path))
+        pending.extend(queued)
+
+    def _merge_array_items(self, item_schemas: list) -> JSONObject:
+        """
+        Merge schemas of the items of an array into one deduplicated schema.
+        """
+        # Memoized item schemas are shared, so repeats are dropped by 
+        # identity before the costlier structural merge.
+        item_schemas = list(
+            {id(item_schema): item_schema 
+             for item_schema in item_schemas}.values()
+        )
+        if len(item_schemas)==1:
+            return item_schemas[0]
+
+        node = SchemaNode()
+        for item_schema in item_schemas:
+            merge_nodes(
+                node, node_from_schema(item_schema), adopt=True, 
+                max_enum_values=self.max_enum_values)
+        return serialize_node(node, self._default_object_schema)
+
+    def _add_enum_values(
+            self, schema: dict, obj: list, path: Optional[tuple]) -> None:
+        """
+        Record the values of enum 'obj' in 'schema', unless there are 
+        too many, and count them into self.enum_values.
+        """
+        values = self._enum_values.get(path)
+        if values is None:
+            values = self._enum_values[path] = EnumValues(
+                self.max_enum_values)
+        values.update(obj)
+
+        distinct = set(obj)
+        if len(distinct) <= self.max_enum_values:
+            schema["enum"] = sorted(distinct)
+
+    def _sample_array(self, obj: list, path: Optional[tuple]) -> list:
+        """
+        Return the items of 'obj' to infer its schema from, recording 
+        in self.sampled_arrays if only a sample of them was kept.
+        """
+        sample_size = self.array_sample_size
+        if sample_size is None or len(obj) <= sample_size:
+            return obj
+
+        if self.array_sampling=="first":
+            sample = obj[:sample_size]
         else:
-            items = {}
-            if no_of_types!=0:
-                items["anyOf"] = [self._get_object_schema(item) 
-                                  for item in obj]
-        return items
-    
+            indices = sorted(
+                self._random.sample(range(len(obj)), sample_size))
+            sample = [obj[index] for index in indices]
+
+        self.sampled_arrays.append(
+            (format_path(path), len(obj), sample_size))
+        return sample
+
+    def _iter_items(self, obj: list) -> Iterable[JSONObject]:
+        """
+        Iterate over the items of 'obj', raising _OverBudget once past 
+        the time budget, checked every _ITEMS_PER_TIME_CHECK items.
+        """
+        deadline = self._deadline
+        if deadline is None or len(obj) <= _ITEMS_PER_TIME_CHECK:
+            return obj
+        return itertools.chain.from_iterable(
+            self._iter_slices_before(obj, deadline))
+
+    def _iter_slices_before(
+            self, obj: list, deadline: float) -> Iterator[list]:
+        for start in range(0, len(obj), _ITEMS_PER_TIME_CHECK):
+            if time.perf_counter() > deadline:
+                raise _OverBudget(f"over {self.max_seconds} s")
+            yield obj[start:start + _ITEMS_PER_TIME_CHECK]
+
     def _get_list_item_types(self, obj: list) -> list:
         """
-        Get list of the unique data types of the items in the 'obj' list.
+        Get list of the unique data types of the items in the 'obj' list, 
+        in the order first seen.
         """
-        types = {type(item) for item in obj}
-        types = list(types)
+        types = []
+        for item in self._iter_items(obj):
+            item_type = item.__class__
+            if item_type not in types:
+                types.append(item_type)
         return types
@@ -0,0 +1,320 @@
+from .json_backend import JSONBackend, JSONObject, get_json_backend
+from .schema_reader import SchemaReader
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# Failure of a check: two-tuple of the keys and indices leading to the
+# failing value, and what is wrong with it. Checks return None on success.
+Failure = Tuple[tuple, str]
+Check = Callable[[JSONObject], Optional[Failure]]
+
+# Classes of the values each leaf type accepts. Parsed json holds no
+# subclasses, so classes are compared exactly, which also keeps bool
+# apart from int. integer widens to number, so number accepts int.
+_LEAF_CLASSES: Dict[str, frozenset] = {
+    "string": frozenset((str,)),
+    "integer": frozenset((int,)),
+    "number": frozenset((int, float)),
+    "boolean": frozenset((bool,)),
+    "null": frozenset((type(None),)),
+}
+
+
+class SchemaValidator:
+    """
+    Checks json documents against a schema SchemaReader generated.
+
+    :param: schema: schema in the format SchemaReader emits.
+
+    The schema is compiled once into nested closures, one per schema
+    node. Properties and array items of leaf types are checked inline
+    against precomputed sets of classes, without a call each, and
+    failure paths are only built when a check fails, so valid
+    documents cost little more than a walk over them.
+
+    Like SchemaReader, only the keys of interest of a document are
+    checked, a missing one reading as null. Objects may lack keys of
+    their schema, but not hold keys missing from it. Arrays without
+    known items ("items": {}) accept any items, and objects without
+    known keys ({"type": "object"}) any keys. Enums accept lists of
+    strings, of the recorded values only if any are.
+
+    Schemas are compiled off an explicit stack, so they may be nested
+    to any depth. Documents are checked recursively, and one nested 
+    deeper than the recursion limit fails with "nested too deep".
+    """
+
+    _keys_of_interest: Tuple = SchemaReader._keys_of_interest
+
+    def __init__(self, schema: JSONObject) -> None:
+        self.schema = schema
+        self._check = self._compile(schema)
+
+    def validate(self, document: JSONObject) -> Optional[Tuple[str, str]]:
+        """
+        Check 'document'.
+
+        Return None if it is valid, else two-tuple of the path of the
+        first failing value and what is wrong with it. Paths are dotted,
+        with array indices in brackets, e.g. "message.list[2].id".
+        """
+        if document.__class__ is not dict:
+            return "", "expected object"
+        subset = {key: document.get(key) for key in self._keys_of_interest}
+        try:
+            failure = self._check(subset)
+        except RecursionError:
+            return "", "nested too deep"
+        if failure is None:
+            return None
+        path, message = failure
+        return format_failure_path(path), message
+
+    def validate_all(self, documents: Iterable[JSONObject]) \
+        -> Iterator[Tuple[int, str, str]]:
+        """
+        Check 'documents', yielding three-tuples of the index, failing
+        path and message of every invalid one.
+        """
+        validate = self.validate
+        for index, document in enumerate(documents):
+            failure = validate(document)
+            if failure is not None:
+                yield (index,) + failure
+
+    def validate_file(
+            self, file_path: str,
+            json_backend: Optional[JSONBackend] = None) \
+                -> List[Tuple[int, str, str]]:
+        """
+        Check the documents of json or newline-delimited json file at
+        'file_path'.
+
+        Return list of three-tuples of the index, failing path and
+        message of every invalid document. The index of a document of a
+        newline-delimited json file is its line number, counted from 1,
+        that of the single document of a json file 0.
+        """
+        json_backend = json_backend or get_json_backend()
+        if file_path.split(".")[-1].lower() not in ("ndjson", "jsonl"):
+            with open(file_path, "rb") as file:
+                return list(self.validate_all([json_backend.load(file)]))
+
+        failures = []
+        with open(file_path, "rb") as file:
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                failure = self.validate(json_backend.loads(line))
+                if failure is not None:
+                    failures.append((line_number,) + failure)
+        return failures
+
+    def _compile(self, schema: JSONObject) -> Check:
+        """
+        Build the check of values of 'schema'.
+
+        Checks of nested schemas are queued on an explicit stack as 
+        (schema, checks, key), to be built into checks[key] before any 
+        check runs, so there is no limit on nesting depth.
+        """
+        root = [None]
+        pending = [(schema, root, 0)]
+        while pending:
+            schema, checks, key = pending.pop()
+            checks[key] = self._compile_node(schema, pending)
+        return root[0]
+
+    def _compile_node(self, schema: JSONObject, pending: list) -> Check:
+        """
+        Build the check of values of 'schema', queuing the checks of
+        nested schemas on 'pending'.
+        """
+        if not isinstance(schema, dict):
+            raise ValueError("Invalid schema.")
+
+        classes = self._get_leaf_classes(schema)
+        if classes is not None:
+            return self._compile_leaf(classes)
+
+        # Objects may have properties named "type", "anyOf" or "items",
+        # whose schemas are dicts rather than a string or a list.
+        schema_type = schema.get("type")
+        if isinstance(schema_type, str):
+            if schema_type=="array":
+                return self._compile_array(schema.get("items", {}), pending)
+            if schema_type=="enum":
+                return self._compile_enum(schema.get("enum"))
+            if schema_type=="object":
+                return self._compile_any_object()
+            raise ValueError(f"Invalid schema type {schema_type!r}.")
+        alternatives = schema.get("anyOf")
+        if isinstance(alternatives, list):
+            return self._compile_any_of(alternatives, pending)
+        return self._compile_object(schema, pending)
+
+    @staticmethod
+    def _get_leaf_classes(schema: JSONObject) -> Optional[frozenset]:
+        """
+        Classes of the values leaf 'schema', or "anyOf" of leaves,
+        accepts. None if 'schema' is not such a leaf.
+        """
+        schema_type = schema.get("type")
+        if isinstance(schema_type, str):
+            return _LEAF_CLASSES.get(schema_type)
+
+        alternatives = schema.get("anyOf")
+        if not isinstance(alternatives, list):
+            return None
+        classes = frozenset()
+        for alternative in alternatives:
+            alternative_type = alternative.get("type") \
+                if isinstance(alternative, dict) else None
+            if not isinstance(alternative_type, str):
+                return None
+            alternative_classes = _LEAF_CLASSES.get(alternative_type)
+            if alternative_classes is None:
+                return None
+            classes |= alternative_classes
+        return classes
+
+    @staticmethod
+    def _describe(classes: frozenset) -> str:
+        names = sorted(
+            name for name, leaf_classes in _LEAF_CLASSES.items()
+            if leaf_classes <= classes and not (
+                name=="integer" and float in classes)
+        )
+        return f"expected {' or '.join(names)}"
+
+    def _compile_leaf(self, classes: frozenset) -> Check:
+        message = self._describe(classes)
+
+        def check_leaf(value: JSONObject) -> Optional[Failure]:
+            if value.__class__ in classes:
+                return None
+            return (), message
+        return check_leaf
+
+    def _compile_object(self, schema: dict, pending: list) -> Check:
+        leaf_classes = {}
+        leaf_messages = {}
+        checks = {}
+        for key, value_schema in schema.items():
+            classes = self._get_leaf_classes(value_schema) \
+                if isinstance(value_schema, dict) else None
+            if classes is not None:
+                leaf_classes[key] = classes
+                leaf_messages[key] = self._describe(classes)
+            else:
+                checks[key] = None
+                pending.append((value_schema, checks, key))
+
+        def check_object(value: JSONObject) -> Optional[Failure]:
+            if value.__class__ is not dict:
+                return (), "expected object"
+            for key, item in value.items():
+                classes = leaf_classes.get(key)
+                if classes is not None:
+                    if item.__class__ not in classes:
+                        return (key,), leaf_messages[key]
+                    continue
+                check = checks.get(key)
+                if check is None:
+                    return (key,), "unexpected key"
+                failure = check(item)
+                if failure is not None:
+                    return (key,) + failure[0], failure[1]
+            return None
+        return check_object
+
+    def _compile_any_object(self) -> Check:
+        def check_any_object(value: JSONObject) -> Optional[Failure]:
+            if value.__class__ is not dict:
+                return (), "expected object"
+            return None
+        return check_any_object
+
+    def _compile_array(self, items: JSONObject, pending: list) -> Check:
+        if not items:
+            def check_array(value: JSONObject) -> Optional[Failure]:
+                if value.__class__ is not list:
+                    return (), "expected array"
+                return None
+            return check_array
+
+        classes = self._get_leaf_classes(items)
+        if classes is not None:
+            message = self._describe(classes)
+
+            def check_leaf_array(value: JSONObject) -> Optional[Failure]:
+                if value.__class__ is not list:
+                    return (), "expected array"
+                for index, item in enumerate(value):
+                    if item.__class__ not in classes:
+                        return (index,), message
+                return None
+            return check_leaf_array
+
+        item_checks = [None]
+        pending.append((items, item_checks, 0))
+
+        def check_nested_array(value: JSONObject) -> Optional[Failure]:
+            if value.__class__ is not list:
+                return (), "expected array"
+            check_item = item_checks[0]
+            for index, item in enumerate(value):
+                failure = check_item(item)
+                if failure is not None:
+                    return (index,) + failure[0], failure[1]
+            return None
+        return check_nested_array
+
+    def _compile_enum(self, values: Optional[list]) -> Check:
+        values = frozenset(values) if values else None
+
+        def check_enum(value: JSONObject) -> Optional[Failure]:
+            if value.__class__ is not list:
+                return (), "expected enum"
+            for index, item in enumerate(value):
+                if item.__class__ is not str:
+                    return (index,), "expected string"
+                if values is not None and item not in values:
+                    return (index,), f"unexpected enum value {item!r}"
+            return None
+        return check_enum
+
+    def _compile_any_of(self, alternatives: list, pending: list) -> Check:
+        checks = [None] * len(alternatives)
+        pending.extend(
+            (alternative, checks, index) 
+            for index, alternative in enumerate(alternatives)
+        )
+
+        def check_any_of(value: JSONObject) -> Optional[Failure]:
+            failures = []
+            for check in checks:
+                failure = check(value)
+                if failure is None:
+                    return None
+                failures.append(failure)
+            # Report the alternative that got furthest into the value.
+            return max(failures, key=lambda failure: len(failure[0]))
+        return check_any_of
+
+
+def format_failure_path(path: tuple) -> str:
+    """
+    Format keys and indices 'path' as a dotted string, with indices in
+    brackets.
+    """
+    formatted = ""
+    for key in path:
+        if key.__class__ is int:
+            formatted += f"[{key}]"
+        elif formatted:
+            formatted += f".{key}"
+        else:
+            formatted = key
+    return formatted
@@ -0,0 +1,188 @@
+from .json_backend import JSONBackend, JSONObject, get_json_backend
+
+from contextlib import contextmanager
+from typing import BinaryIO, Iterable, Iterator, Optional
+import json
+import os
+import uuid
+
+
+class SchemaWriter:
+    """
+    Writes schemas to files through large buffers, atomically.
+
+    :param: json_backend: JSONBackend: optional: backend to serialize
+        schemas with. Defaults to the fastest one installed.
+    :param: compact: bool: optional: write json without whitespace
+        instead of indented.
+    :param: buffer_size: int: optional: size of write buffers in bytes.
+    :param: bundle_path: str: optional: write all schemas as lines of
+        this one newline-delimited json file instead of one file each.
+        Each line holds the name of the file the schema would have been
+        written to under "file" and the schema under "schema".
+
+    Every file is written to a temporary file next to it first and
+    renamed over it once complete, so a crash never leaves a partly
+    written file behind. Files whose content would not change are
+    left untouched. The bundle is only put in place by .close.
+
+    Counts files written in .written and files left untouched in
+    .unchanged.
+    """
+
+    def __init__(
+            self, json_backend: Optional[JSONBackend] = None,
+            compact: bool = False, buffer_size: int = 1 << 20,
+            bundle_path: Optional[str] = None) -> None:
+        self.json_backend = json_backend or get_json_backend()
+        self.compact = compact
+        self.buffer_size = buffer_size
+        self.bundle_path = bundle_path
+        self.written = 0
+        self.unchanged = 0
+        self._bundle: Optional[BinaryIO] = None
+
+    def __enter__(self) -> "SchemaWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def write(self, data: JSONObject, file_path: str) -> bool:
+        """
+        Write 'data' to file at 'file_path', or add it to the bundle.
+
+        Return whether anything was written.
+        """
+        if self.bundle_path is not None:
+            self._write_bundle_line(data, file_path)
+            return True
+
+        content = self.json_backend.dumps(data, self.compact)
+        if self._has_content(file_path, content):
+            self.unchanged += 1
+            return False
+
+        with self._temp_file(file_path) as file:
+            file.write(content)
+        os.replace(file.name, file_path)
+        self.written += 1
+        return True
+
+    def write_lines(self, data: Iterable[JSONObject], file_path: str) -> bool:
+        """
+        Write 'data' to file at 'file_path', one json object per line,
+        or add them to the bundle.
+
+        Return whether anything was written.
+        """
+        if self.bundle_path is not None:
+            for item in data:
+                self._write_bundle_line(item, file_path)
+            return True
+
+        with self._temp_file(file_path) as file:
+            for item in data:
+                file.write(self._dumps_line(item))
+        return self._replace(file.name, file_path)
+
+    def close(self) -> None:
+        """
+        Put the bundle in place, if any was written.
+        """
+        if self._bundle is None:
+            return
+        self._bundle.close()
+        self._replace(self._bundle.name, self.bundle_path)
+        self._bundle = None
+
+    def discard(self) -> None:
+        """
+        Drop the bundle written so far, leaving any previous one in place.
+        """
+        if self._bundle is None:
+            return
+        self._bundle.close()
+        os.remove(self._bundle.name)
+        self._bundle = None
+
+    def _dumps_line(self, data: JSONObject) -> bytes:
+        if self.compact:
+            return self.json_backend.dumps(data, compact=True) + b"\n"
+        # No fast backend reproduces the stdlib's default separators.
+        return json.dumps(data).encode() + b"\n"
+
+    def _write_bundle_line(self, data: JSONObject, file_path: str) -> None:
+        if self._bundle is None:
+            self._bundle = self._open_temp(self.bundle_path)
+        line = {"file": os.path.basename(file_path), "schema": data}
+        self._bundle.write(self.json_backend.dumps(line, compact=True))
+        self._bundle.write(b"\n")
+
+    def _open_temp(self, file_path: str) -> BinaryIO:
+        """
+        Open a uniquely named temporary file next to 'file_path' for 
+        writing. Being in the same folder, it can be renamed over 
+        'file_path' atomically.
+        """
+        temp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+        return open(temp_path, "wb", buffering=self.buffer_size)
+
+    @contextmanager
+    def _temp_file(self, file_path: str) -> Iterator[BinaryIO]:
+        """
+        Open temporary file for 'file_path', closing it when done and 
+        removing it if writing fails.
+        """
+        file = self._open_temp(file_path)
+        try:
+            with file:
+                yield file
+        except BaseException:
+            os.remove(file.name)
+            raise
+
+    def _replace(self, temp_path: str, file_path: str) -> bool:
+        """
+        Rename file at 'temp_path' over 'file_path', unless their content
+        is the same. Return whether 'file_path' was replaced.
+        """
+        try:
+            unchanged = \
+                os.path.getsize(temp_path)==os.path.getsize(file_path) \
+                    and self._same_content(temp_path, file_path)
+        except OSError:
+            unchanged = False
+
+        if unchanged:
+            os.remove(temp_path)
+            self.unchanged += 1
+            return False
+        os.replace(temp_path, file_path)
+        self.written += 1
+        return True
+
+    def _same_content(self, file_path: str, other_path: str) -> bool:
+        with open(file_path, "rb") as file, open(other_path, "rb") as other:
+            while True:
+                chunk = file.read(self.buffer_size)
+                if chunk!=other.read(self.buffer_size):
+                    return False
+                if not chunk:
+                    return True
+
+    @staticmethod
+    def _has_content(file_path: str, content: bytes) -> bool:
+        """
+        Check if file at 'file_path' holds exactly 'content'.
+        """
+        try:
+            if os.path.getsize(file_path)!=len(content):
+                return False
+            with open(file_path, "rb") as file:
+                return file.read()==content
+        except OSError:
+            return False
@@ -0,0 +1,563 @@
+from .json_manager import JSONObject
+from .schema_node import (
+    ITEMS_PATH, UNKNOWN_ITEMS, SchemaNode, format_path, merge_nodes, 
+    node_from_schema, serialize_node
+)
+from .schema_memo import SchemaMemo
+from .schema_reader import SchemaReader
+
+from json.decoder import JSONDecoder, scanstring
+from json.scanner import make_scanner
+from typing import IO, Iterator, List, Optional, Tuple
+import random
+import re
+
+
+START_MAP = "start_map"
+MAP_KEY = "map_key"
+END_MAP = "end_map"
+START_ARRAY = "start_array"
+END_ARRAY = "end_array"
+VALUE = "value"
+
+JSONEvent = Tuple[str, JSONObject]
+
+_DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_TOKEN = re.compile(r"""
+    (?P<punct>[{}\[\]:,])
+  | (?P<string>"[^"\\]*(?:\\.[^"\\]*)*")
+  | (?P<number>-?(?:0|[1-9][0-9]*)(?P<float>(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?))
+  | (?P<literal>true|false|null)
+""", re.VERBOSE)
+_LITERALS = {"true": True, "false": False, "null": None}
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+# Characters a token may start with, and any that may not continue a 
+# number or literal.
+_TOKEN_STARTS = frozenset('{}[]:,"-0123456789tfn')
+_TOKEN_END = re.compile(r"[^0-9A-Za-z.+-]")
+# Body of a string up to its closing quote, or to a backslash the 
+# input ends with.
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*')
+
+
+
+def _reject_constant(name: str) -> None:
+    raise ValueError(f"Invalid json constant {name!r}.")
+
+
+# Decodes a whole json value at an offset of a string, in C.
+_scan_value = make_scanner(JSONDecoder(parse_constant=_reject_constant))
+
+# Parser states: what the next token is allowed to be.
+_EXPECT_VALUE = 0
+_EXPECT_KEY = 1
+_EXPECT_COLON = 2
+_EXPECT_SEPARATOR = 3
+
+
+def _iter_json_tokens(
+        file: IO[str], chunk_size: int = _DEFAULT_CHUNK_SIZE,
+        decode_containers: bool = False) \
+            -> Iterator[Tuple[str, JSONObject]]:
+    """
+    Split the text read from 'file' into json tokens.
+
+    Yields two-tuples of token kind and value. Kind is either the
+    punctuation character itself, "string" for strings or "scalar" for
+    numbers and literals. Only the unconsumed tail of the input is kept
+    in memory.
+
+    With 'decode_containers', objects and arrays that end within what 
+    was read so far are decoded whole by the json module, and yielded 
+    as "scalar", instead of token by token.
+    """
+    buffer = ""
+    pos = 0
+    eof = False
+    # Nesting level of the tokens yielded. Children of the first 
+    # container too deep to decode whole are tried on their own, but 
+    # nothing below a child too deep as well, so that a deep chain of 
+    # containers is not decoded over and over.
+    level = 0
+    too_deep = None
+    too_deep_child = None
+
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        match = _TOKEN.match(buffer, pos)
+
+        # A token touching the end of the buffer may be cut short
+        # (e.g. "12" of "123" or "-1" of "-1.5"), so read on before 
+        # trusting it.
+        if not eof and (
+                match is None and (
+                    pos==len(buffer) or buffer[pos] in _TOKEN_STARTS)
+                or match is not None and (
+                    match.end()==len(buffer) or (
+                        match.lastgroup=="number" and 
+                        buffer[match.end()] in _NUMBER_CHARS))):
+            buffer, eof = _read_token_tail(file, chunk_size, buffer[pos:])
+            pos = 0
+            continue
+
+        if match is None:
+            if pos==len(buffer):
+                return
+            raise ValueError(
+                f"Invalid json near: {buffer[pos:pos + 20]!r}.")
+
+        kind = match.lastgroup
+        start = pos
+        pos = match.end()
+
+        if kind=="punct":
+            token = match.group()
+            if token=="{" or token=="[":
+                if decode_containers and too_deep_child is None:
+                    try:
+                        value, pos = _scan_value(buffer, start)
+                    except RecursionError:
+                        if too_deep is None:
+                            too_deep = level
+                        else:
+                            too_deep_child = level
+                    except (ValueError, StopIteration):
+                        # Cut short by the end of the buffer, or 
+                        # invalid: read on or tokenize it.
+                        if not eof and len(buffer) - start < chunk_size:
+                            buffer, eof = _read_token_tail(
+                                file, chunk_size, buffer[start:])
+                            pos = 0
+                            continue
+                    else:
+                        yield "scalar", value
+                        continue
+                level += 1
+            elif token=="}" or token=="]":
+                level -= 1
+                if level==too_deep_child:
+                    too_deep_child = None
+                elif level==too_deep:
+                    too_deep = None
+            yield token, None
+        elif kind=="string":
+            yield "string", scanstring(match.group(), 1)[0]
+        elif kind=="literal":
+            yield "scalar", _LITERALS[match.group()]
+        elif match.group("float"):
+            yield "scalar", float(match.group())
+        else:
+            yield "scalar", int(match.group())
+
+
+def _read_token_tail(
+        file: IO[str], chunk_size: int, head: str) -> Tuple[str, bool]:
+    """
+    Read chunks of 'file' on from 'head', the start of a token, until 
+    one completes the token or the input ends.
+
+    Return two-tuple of 'head' and the chunks read, joined once, and 
+    whether the input ended. Each chunk is only scanned once, so 
+    tokens spanning many chunks, e.g. long strings, cost linear time.
+    """
+    pieces = [head]
+    is_string = head[:1]=='"'
+    is_open, escaped = _scan_string(head, 1, False) if is_string \
+        else (True, False)
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return "".join(pieces), True
+        pieces.append(chunk)
+        if is_string:
+            if is_open:
+                is_open, escaped = _scan_string(chunk, 0, escaped)
+            if not is_open:
+                break
+        elif _TOKEN_END.search(chunk) is not None:
+            break
+    return "".join(pieces), False
+
+
+def _scan_string(text: str, pos: int, escaped: bool) -> Tuple[bool, bool]:
+    """
+    Scan 'text' from 'pos' on as part of a string, after a backslash if
+    'escaped'. Return two-tuple of whether the string is still open 
+    and whether 'text' ends with a backslash.
+    """
+    if escaped:
+        pos += 1
+    end = _STRING_BODY.match(text, pos).end()
+    if end==len(text):
+        return True, False
+    if text[end]=='"':
+        return False, False
+    # Only a backslash at the end of 'text' stops the body short.
+    return True, True
+
+
+def iter_json_events(
+        file: IO[str], chunk_size: int = _DEFAULT_CHUNK_SIZE,
+        decode_containers: bool = False) -> Iterator[JSONEvent]:
+    """
+    Incrementally parse 'file' into a flat stream of json events.
+
+    Yields two-tuples of event name (START_MAP, MAP_KEY, END_MAP,
+    START_ARRAY, END_ARRAY, VALUE) and value. Several top-level values
+    may follow one another, so newline-delimited json is accepted as is.
+
+    With 'decode_containers', objects and arrays that fit in what was 
+    read at once come as a single VALUE event of the decoded dict or 
+    list, which saves parsing them event by event in Python.
+    """
+    stack = []
+    expect = _EXPECT_VALUE
+    just_opened = False
+
+    for kind, value in _iter_json_tokens(
+            file, chunk_size, decode_containers):
+        if expect==_EXPECT_VALUE:
+            if kind=="{":
+                stack.append(kind)
+                expect = _EXPECT_KEY
+                just_opened = True
+                yield START_MAP, None
+                continue
+            if kind=="[":
+                stack.append(kind)
+                just_opened = True
+                yield START_ARRAY, None
+                continue
+            if kind=="]" and just_opened:
+                stack.pop()
+                yield END_ARRAY, None
+            elif kind=="string" or kind=="scalar":
+                yield VALUE, value
+            else:
+                raise ValueError(f"Unexpected json token {kind!r}.")
+
+        elif expect==_EXPECT_KEY:
+            if kind=="string":
+                expect = _EXPECT_COLON
+                yield MAP_KEY, value
+                continue
+            if kind=="}" and just_opened:
+                stack.pop()
+                yield END_MAP, None
+            else:
+                raise ValueError(f"Expected json object key, got {kind!r}.")
+
+        elif expect==_EXPECT_COLON:
+            if kind!=":":
+                raise ValueError(f"Expected ':', got {kind!r}.")
+            expect = _EXPECT_VALUE
+            just_opened = False
+            continue
+
+        else:
+            if kind=="," and stack:
+                expect = _EXPECT_KEY if stack[-1]=="{" else _EXPECT_VALUE
+                just_opened = False
+                continue
+            if kind=="}" and stack and stack[-1]=="{":
+                stack.pop()
+                yield END_MAP, None
+            elif kind=="]" and stack and stack[-1]=="[":
+                stack.pop()
+                yield END_ARRAY, None
+            elif not stack and kind in ("{", "["):
+                stack.append(kind)
+                expect = _EXPECT_KEY if kind=="{" else _EXPECT_VALUE
+                just_opened = True
+                yield (START_MAP if kind=="{" else START_ARRAY), None
+                continue
+            elif not stack and (kind=="string" or kind=="scalar"):
+                yield VALUE, value
+            else:
+                raise ValueError(f"Unexpected json token {kind!r}.")
+
+        # A value has just been completed.
+        expect = _EXPECT_SEPARATOR
+        just_opened = False
+
+    if stack or expect not in (_EXPECT_VALUE, _EXPECT_SEPARATOR):
+        raise ValueError("Unexpected end of json input.")
+
+
+class _ArrayFrame:
+    """
+    Collects what is needed to build the schema of a json array
+    while its items stream past.
+
+    Items are merged into one node as they arrive, so memory stays
+    bounded by the size of the merged schema. Under reservoir sampling 
+    the sampled items are held in 'samples' until the array ends.
+    """
+
+    __slots__ = ("types", "node", "seen", "slot", "samples")
+
+    def __init__(self) -> None:
+        self.types = set()
+        self.node = SchemaNode()
+        self.seen = 0
+        self.slot = 0
+        self.samples = None
+
+
+class StreamSchemaReader:
+    """
+    Reads schemas of json documents from a file without ever
+    materializing the documents.
+
+    :param: file: text file object positioned at the start of the json.
+    :param: chunk_size: int: optional: number of characters read at once.
+    :param: array_sample_size, array_sampling, seed: optional: 
+        array sampling, as for SchemaReader.
+
+    Applies the same type rules as SchemaReader and produces identical
+    schemas, but peak memory is bounded by the size of the schema
+    rather than the size of the input. A file may hold one document or
+    several (newline-delimited json), one schema is produced per document.
+    Items skipped by sampling are parsed but not built.
+
+    Without sampling, objects and arrays that fit in a chunk or two 
+    are decoded whole by the json module and read as SchemaReader 
+    does, and only larger ones are parsed event by event, so that 
+    streaming costs about as much as loading the file.
+    """
+
+    _default_object_schema: dict = SchemaReader._default_object_schema
+
+    _keys_of_interest: Tuple = SchemaReader._keys_of_interest
+
+    _scalar_types: dict = {
+        int: "integer",
+        float: "number",
+        bool: "boolean",
+        str: "string",
+        type(None): "null",
+    }
+
+    def __init__(
+            self, file: IO[str], chunk_size: int = _DEFAULT_CHUNK_SIZE,
+            array_sample_size: Optional[int] = None,
+            array_sampling: str = "first", seed=None) -> None:
+        if array_sampling not in SchemaReader._array_samplings:
+            raise ValueError(f"Invalid array sampling {array_sampling!r}.")
+
+        self.file = file
+        self.chunk_size = chunk_size
+        self.array_sample_size = array_sample_size
+        self.array_sampling = array_sampling
+        self.sampled_arrays: List[Tuple[str, int, int]] = []
+        self._random = random.Random(seed)
+        # Reads the schemas of values decoded whole.
+        self._reader = SchemaReader({}, memo=SchemaMemo())
+
+    @property
+    def schema(self) -> JSONObject:
+        """
+        Schema of the first document in file.
+        """
+        for schema in self.iter_schemas():
+            return schema
+        raise ValueError("No json document found.")
+
+    def iter_schemas(self) -> Iterator[JSONObject]:
+        """
+        Yield the schema of each json document in file, in order.
+        """
+        # Items skipped by sampling are not to be built, so containers
+        # are only decoded whole without sampling.
+        events = iter_json_events(
+            self.file, self.chunk_size, 
+            decode_containers=self.array_sample_size is None)
+        for event, value in events:
+            if event==VALUE and value.__class__ is dict:
+                yield self._reader._get_object_schema({
+                    key: value.get(key) for key in self._keys_of_interest
+                })
+                continue
+            if event!=START_MAP:
+                raise ValueError("Top-level json value must be an object.")
+            yield self._read_document(events)
+
+    def _read_document(self, events: Iterator[JSONEvent]) -> JSONObject:
+        """
+        Build schema of the keys of interest of the document whose
+        START_MAP event was just consumed.
+        """
+        subset = {}
+        for event, key in events:
+            if event==END_MAP:
+                break
+            if key in self._keys_of_interest:
+                subset[key] = self._read_value(events, key)
+            else:
+                self._skip_value(events)
+
+        null_schema = self._get_leaf_schema(type(None))
+        return {
+            key: subset.get(key, null_schema)
+            for key in self._keys_of_interest
+        }
+
+    def _read_value(
+            self, events: Iterator[JSONEvent], root_key: str) -> JSONObject:
+        """
+        Build schema of the next json value in events, found under 
+        'root_key' of the document.
+
+        Uses an explicit stack of open containers so arbitrarily deep
+        documents are supported.
+        """
+        stack = []
+
+        for event, value in events:
+            if event==MAP_KEY:
+                stack[-1][1] = value
+                continue
+
+            if event!=END_MAP and event!=END_ARRAY and stack and \
+                stack[-1].__class__ is _ArrayFrame and \
+                    not self._admit_item(stack[-1]):
+                if event!=VALUE:
+                    self._skip_value(events, depth=1)
+                continue
+
+            if event==START_MAP:
+                stack.append([{}, None])
+                continue
+            if event==START_ARRAY:
+                stack.append(_ArrayFrame())
+                continue
+
+            if event==VALUE:
+                item_type = type(value)
+                if item_type is dict or item_type is list:
+                    schema = self._reader._get_object_schema(value)
+                else:
+                    schema = self._get_leaf_schema(item_type)
+            elif event==END_MAP:
+                item_type = dict
+                schema = stack.pop()[0]
+            else:
+                item_type = list
+                schema = self._get_array_schema(stack.pop(), stack, root_key)
+
+            if not stack:
+                return schema
+
+            parent = stack[-1]
+            if parent.__class__ is _ArrayFrame:
+                self._add_item(parent, item_type, schema)
+            else:
+                parent[0][parent[1]] = schema
+
+        raise ValueError("Unexpected end of json input.")
+
+    def _skip_value(
+            self, events: Iterator[JSONEvent], depth: int = 0) -> None:
+        """
+        Consume the next json value in events without building anything.
+
+        'depth' is the number of containers of the value already opened.
+        """
+        for event, _ in events:
+            if event==START_MAP or event==START_ARRAY:
+                depth += 1
+            elif event==END_MAP or event==END_ARRAY:
+                depth -= 1
+            if depth==0 and event!=MAP_KEY:
+                return
+
+    def _admit_item(self, frame: _ArrayFrame) -> bool:
+        """
+        Decide whether the array item that starts next is sampled, 
+        before any of it is built.
+        """
+        index = frame.seen
+        frame.seen += 1
+        sample_size = self.array_sample_size
+
+        if sample_size is None:
+            return True
+        if self.array_sampling=="first":
+            return index < sample_size
+
+        # Reservoir sampling (algorithm R): the item replaces a random 
+        # earlier sample with probability sample_size / (index + 1).
+        slot = index if index < sample_size \
+            else self._random.randrange(index + 1)
+        frame.slot = slot
+        return slot < sample_size
+
+    def _add_item(
+            self, frame: _ArrayFrame, item_type: type, schema: dict) -> None:
+        """
+        Add the schema of an array item to the frame of the array.
+        """
+        if self.array_sample_size is not None and \
+            self.array_sampling=="reservoir":
+            if frame.samples is None:
+                frame.samples = []
+            sample = (frame.seen, item_type, schema)
+            if frame.slot==len(frame.samples):
+                frame.samples.append(sample)
+            else:
+                frame.samples[frame.slot] = sample
+            return
+
+        # Leaves of a type already seen add nothing to the merged node.
+        if item_type in frame.types and item_type is not dict \
+            and item_type is not list:
+            return
+        frame.types.add(item_type)
+        merge_nodes(frame.node, node_from_schema(schema), adopt=True)
+
+    def _get_leaf_schema(self, item_type: type) -> dict:
+        """
+        Build schema of a scalar json value of type 'item_type'.
+        """
+        schema = dict(self._default_object_schema)
+        schema["type"] = self._scalar_types[item_type]
+        return schema
+
+    def _get_array_schema(
+            self, frame: _ArrayFrame, stack: list, root_key: str) -> dict:
+        """
+        Build schema of a json array from its collected frame. 'stack' 
+        holds the frames of the containers enclosing the array.
+        """
+        if frame.samples is not None:
+            for _, item_type, item_schema in sorted(
+                    frame.samples, key=lambda sample: sample[0]):
+                frame.types.add(item_type)
+                merge_nodes(
+                    frame.node, node_from_schema(item_schema), adopt=True)
+
+        if self.array_sample_size is not None and \
+            frame.seen > self.array_sample_size:
+            path = (None, root_key)
+            for parent in stack:
+                path = (path, ITEMS_PATH if parent.__class__ is _ArrayFrame
+                        else parent[1])
+            self.sampled_arrays.append(
+                (format_path(path), frame.seen, self.array_sample_size))
+
+        schema = dict(self._default_object_schema)
+        types = frame.types
+
+        if len(types)==1 and str in types:
+            schema["type"] = "enum"
+            return schema
+
+        schema["type"] = "array"
+        if frame.node.kinds:
+            schema["items"] = serialize_node(
+                frame.node, self._default_object_schema)
+        else:
+            schema["items"] = UNKNOWN_ITEMS
+        return schema
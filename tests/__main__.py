@@ -1,6 +1,23 @@
 import unittest
-from tests.json_manager import JSONObjectsManagerTest
+from tests.async_pipeline import GenerateSchemasTest
+from tests.benchmarks import BenchmarkSuiteTest, PayloadGeneratorTest
+from tests.enum_values import EnumValuesTest
+from tests.folder_watcher import SchemaWatcherTest
+from tests.json_backend import JSONBackendTest
+from tests.json_manager import (
+    JSONObjectsManagerTest, JSONObjectsManagerFileTest
+)
+from tests.main import MainTest
+from tests.run_stats import RunStatsTest
+from tests.schema_accumulator import SchemaAccumulatorTest
+from tests.schema_cache import SchemaCacheTest
+from tests.schema_groups import SchemaGroupsTest
+from tests.schema_memo import SchemaMemoTest
+from tests.schema_node import SchemaNodeTest
 from tests.schema_reader import SchemaReaderTest
+from tests.schema_validator import SchemaValidatorTest
+from tests.schema_writer import SchemaWriterTest
+from tests.stream_reader import IterJsonEventsTest, StreamSchemaReaderTest
 
 if __name__=="__main__":
     unittest.main()
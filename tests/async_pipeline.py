@@ -0,0 +1,99 @@
+from unittest import IsolatedAsyncioTestCase
+from schema_generator.async_pipeline import generate_schemas
+from schema_generator.schema_reader import SchemaReader
+from schema_generator.schema_writer import SchemaWriter
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+
+
+class GenerateSchemasTest(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp()
+        self.folder_path = os.path.join(self.tmp_dir, "data")
+        self.dump_path = os.path.join(self.tmp_dir, "schema")
+        os.mkdir(self.folder_path)
+        os.mkdir(self.dump_path)
+
+        self.file_names = []
+        for index in range(20):
+            file_name = f"data_{index}.json"
+            shutil.copy(
+                f"./data/data_{index % 2 + 1}.json", 
+                os.path.join(self.folder_path, file_name)
+            )
+            self.file_names.append(file_name)
+        with open(os.path.join(self.folder_path, "broken.json"), "w") as file:
+            file.write('{"message": ')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+
+    def assertSchemasWritten(self, file_names):
+        for file_name in file_names:
+            with open(os.path.join(self.folder_path, file_name)) as file:
+                expected_schema = SchemaReader(json.load(file)).schema
+            schema_path = os.path.join(
+                self.dump_path, file_name.replace(".json", "_schema.json"))
+            with open(schema_path) as file:
+                self.assertEqual(json.load(file), expected_schema)
+
+    async def test_generate_schemas(self):
+        for queue_size in (1, 8):
+            with self.subTest(queue_size=queue_size):
+                failures = await generate_schemas(
+                    self.folder_path, self.dump_path, queue_size=queue_size)
+                self.assertEqual(
+                    [file_name for file_name, _ in failures], ["broken.json"])
+                self.assertSchemasWritten(self.file_names)
+
+    async def test_on_read(self):
+        read = []
+        failures = await generate_schemas(
+            self.folder_path, self.dump_path, file_names=self.file_names[:2],
+            reader_options={"array_sample_size": 1},
+            on_read=lambda name, reader: read.append(
+                (name, reader.sampled_arrays)))
+        self.assertEqual(failures, [])
+        self.assertEqual(
+            sorted(name for name, _ in read), self.file_names[:2])
+        with open(os.path.join(self.folder_path, "data_0.json")) as file:
+            reader = SchemaReader(json.load(file), array_sample_size=1)
+        reader.schema
+        self.assertNotEqual(reader.sampled_arrays, [])
+        self.assertEqual(dict(read)["data_0.json"], reader.sampled_arrays)
+
+    async def test_file_names(self):
+        failures = await generate_schemas(
+            self.folder_path, self.dump_path, file_names=self.file_names[:2])
+        self.assertEqual(failures, [])
+        self.assertEqual(
+            sorted(os.listdir(self.dump_path)), 
+            ["data_0_schema.json", "data_1_schema.json"]
+        )
+
+    async def test_writer(self):
+        bundle_path = os.path.join(self.tmp_dir, "schemas.ndjson")
+        with SchemaWriter(bundle_path=bundle_path) as writer:
+            await generate_schemas(
+                self.folder_path, self.dump_path, self.file_names, 
+                writer=writer)
+        with open(bundle_path) as file:
+            self.assertEqual(len(file.readlines()), len(self.file_names))
+
+    async def test_event_loop_is_not_blocked(self):
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        ticker = asyncio.ensure_future(tick())
+        await generate_schemas(self.folder_path, self.dump_path)
+        ticker.cancel()
+        self.assertGreater(ticks, len(self.file_names))
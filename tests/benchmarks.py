@@ -0,0 +1,130 @@
+from unittest import TestCase
+from benchmarks.__main__ import (
+    PHASES, main, parse_args, print_results, run_benchmark, run_once
+)
+from benchmarks.payload import LEAF_TYPES, PayloadGenerator
+from schema_generator.schema_reader import SchemaReader
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+
+
+class PayloadGeneratorTest(TestCase):
+    def test_generate_event(self):
+        generator = PayloadGenerator(width=8, depth=2, array_length=3)
+        event = generator.generate_event()
+        self.assertEqual(
+            set(event["attributes"]),
+            {"appName", "eventType", "subEventType", "sensitive"})
+
+        message = event["message"]
+        self.assertEqual(len(message), 8)
+        self.assertIsInstance(message["field_0"], dict)
+        self.assertEqual(len(message["field_1"]), 3)
+        self.assertIsInstance(message["field_1"][0], dict)
+        self.assertTrue(
+            all(isinstance(item, str) for item in message["field_2"]))
+        self.assertIsInstance(message["field_3"], LEAF_TYPES[3])
+
+        # Objects stop nesting at 'depth'.
+        innermost = message["field_0"]["field_0"]
+        self.assertIsInstance(innermost["field_0"], LEAF_TYPES[0])
+        self.assertIsInstance(innermost["field_1"], LEAF_TYPES[1])
+
+    def test_seed(self):
+        events = [
+            PayloadGenerator(heterogeneity=0.5, seed=seed).generate_event()
+            for seed in (1, 1, 2)
+        ]
+        self.assertEqual(events[0], events[1])
+        self.assertNotEqual(events[0], events[2])
+
+    def test_heterogeneity(self):
+        schema = SchemaReader(
+            PayloadGenerator(width=4, depth=1).generate_event()).schema
+        self.assertEqual(
+            schema["message"]["field_3"]["type"], "boolean")
+
+        generator = PayloadGenerator(
+            width=16, depth=0, array_length=20, heterogeneity=1.0)
+        leaf_types = set()
+        for _ in range(20):
+            message = generator.generate_event()["message"]
+            leaf_types.update(type(value) for value in message.values())
+        self.assertIn(list, leaf_types)
+        self.assertTrue(set(LEAF_TYPES) <= leaf_types)
+
+    def test_write_files(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            file_names = PayloadGenerator(depth=1).write_files(tmp_dir, 3)
+            self.assertEqual(
+                file_names, ["event_0.json", "event_1.json", "event_2.json"])
+            for file_name in file_names:
+                with open(os.path.join(tmp_dir, file_name)) as file:
+                    self.assertIn("message", json.load(file))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+class BenchmarkSuiteTest(TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp()
+        self.argv = [
+            "--files", "2", "--width", "4", "--depth", "1",
+            "--array-length", "2", "--repeat", "2", "--json-backend", "json",
+        ]
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+
+    def test_run_once(self):
+        file_names = PayloadGenerator(depth=1).write_files(self.tmp_dir, 2)
+        timings = run_once(self.tmp_dir, file_names, "json")
+        self.assertEqual(tuple(timings), PHASES)
+        for timing in timings.values():
+            self.assertGreaterEqual(timing["wall"], 0)
+            self.assertGreaterEqual(timing["cpu"], 0)
+        # Schemas are dumped out of the folder read from.
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), file_names)
+
+    def test_run_benchmark(self):
+        results = run_benchmark(parse_args(self.argv))
+        self.assertEqual(results["json_backend"], "json")
+        self.assertEqual(results["payload"]["files"], 2)
+        self.assertGreater(results["payload"]["nodes"], 0)
+        self.assertGreater(results["payload"]["bytes"], 0)
+        self.assertEqual(set(results["phases"]), set(PHASES))
+        self.assertAlmostEqual(
+            results["seconds"],
+            sum(timing["wall"] for timing in results["phases"].values()))
+        self.assertAlmostEqual(
+            results["nodes_per_second"],
+            results["payload"]["nodes"] / results["seconds"])
+
+    def test_main_saves_and_compares_results(self):
+        output_path = os.path.join(self.tmp_dir, "results.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            main(self.argv + ["--output", output_path])
+        with open(output_path) as file:
+            baseline = json.load(file)
+        self.assertEqual(baseline["payload"]["files"], 2)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main(self.argv + [
+                "--output", os.path.join(self.tmp_dir, "other.json"),
+                "--compare", output_path
+            ])
+        self.assertIn("%)", output.getvalue())
+        self.assertNotIn("payloads differ", output.getvalue())
+
+        baseline["payload"]["files"] = 3
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            print_results(run_benchmark(parse_args(self.argv)), baseline)
+        self.assertIn("warning: the payloads differ", output.getvalue())
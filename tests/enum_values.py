@@ -0,0 +1,72 @@
+from unittest import TestCase
+from schema_generator.enum_values import (
+    CountMinSketch, EnumValues, HyperLogLog, _hash_value
+)
+
+
+class EnumValuesTest(TestCase):
+    def setUp(self) -> None:
+        self.values = [f"value_{index % 5000}" for index in range(20000)]
+        self.values += ["hot"] * 3000 + ["warm"] * 2000
+
+    def test_exact(self):
+        values = EnumValues(max_values=3)
+        values.update(["b", "a", "b"])
+        values.add("c")
+
+        self.assertTrue(values.exact)
+        self.assertEqual(values.values, {"a", "b", "c"})
+        self.assertEqual(values.distinct, 3)
+        self.assertEqual(values.count, 4)
+        self.assertEqual(values.heavy_hitters()[0], ("b", 2))
+
+    def test_sketches_beyond_max_values(self):
+        values = EnumValues(max_values=100, top=3)
+        for start in range(0, len(self.values), 100):
+            values.update(self.values[start:start + 100])
+
+        self.assertFalse(values.exact)
+        self.assertIsNone(values.values)
+        self.assertEqual(values.count, len(self.values))
+        self.assertAlmostEqual(values.distinct, 5002, delta=5002 * 0.05)
+        hot, warm, _ = values.heavy_hitters()
+        self.assertEqual((hot[0], warm[0]), ("hot", "warm"))
+        self.assertGreaterEqual(hot[1], 3000)
+        self.assertLess(hot[1], 3100)
+
+    def test_merge(self):
+        values = EnumValues(max_values=100, top=2)
+        values.update(self.values)
+        halves = EnumValues(max_values=100, top=2)
+        halves.update(self.values[::2])
+        other = EnumValues(max_values=100, top=2)
+        other.update(self.values[1::2])
+        halves.merge(other)
+
+        self.assertEqual(halves.count, values.count)
+        self.assertEqual(halves.distinct, values.distinct)
+        self.assertEqual(halves.heavy_hitters(), values.heavy_hitters())
+
+        exact = EnumValues()
+        exact.update(["a", "b"])
+        exact.merge(EnumValues().merge(exact))
+        self.assertEqual(exact.heavy_hitters(), [("a", 2), ("b", 2)])
+
+    def test_count_min_sketch_never_underestimates(self):
+        sketch = CountMinSketch(width=64, depth=3)
+        for index in range(1000):
+            sketch.add(_hash_value(str(index % 100))[1])
+        for index in range(100):
+            self.assertGreaterEqual(
+                sketch.estimate(_hash_value(str(index))[1]), 10)
+
+    def test_hyperloglog(self):
+        for no_of_values in (10, 1000, 50000):
+            with self.subTest(no_of_values=no_of_values):
+                distinct = HyperLogLog()
+                for index in range(no_of_values):
+                    distinct.add(_hash_value(str(index))[0])
+                self.assertAlmostEqual(
+                    distinct.count(), no_of_values, delta=no_of_values * 0.05)
+        with self.assertRaises(ValueError):
+            HyperLogLog(precision=20)
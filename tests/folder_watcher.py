@@ -0,0 +1,155 @@
+from unittest import TestCase
+from schema_generator.folder_watcher import FolderIndex, SchemaWatcher
+from schema_generator.json_manager import JSONObjectsManager
+from schema_generator.schema_cache import SchemaCache
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+
+class SchemaWatcherTest(TestCase):
+    def setUp(self) -> None:
+        self.folder_path = tempfile.mkdtemp()
+        self.dump_path = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.folder_path)
+        shutil.rmtree(self.dump_path)
+
+    def write(self, name: str, obj: dict, age: float = 10.0) -> None:
+        file_path = os.path.join(self.folder_path, name)
+        with open(file_path, "w") as file:
+            json.dump(obj, file)
+        mtime = time.time() - age
+        os.utime(file_path, (mtime, mtime))
+
+    def test_scan(self):
+        index = FolderIndex(self.folder_path, debounce=1.0)
+        self.write("a.json", {"message": {}}, age=20)
+        self.write("b.json", {"message": {}})
+        self.write("c.txt", {})
+        # Files still being written are left alone until settled.
+        self.write("d.json", {"message": {}}, age=0)
+        changed = index.scan()
+        self.assertEqual([name for name, _ in changed], ["a.json", "b.json"])
+
+        for name, signature in changed:
+            index.mark_seen(name, signature)
+        self.assertEqual(index.scan(), [])
+
+        self.write("b.json", {"message": {"a": 1}})
+        self.assertEqual([name for name, _ in index.scan()], ["b.json"])
+
+        # Deleted files are reported again once they reappear.
+        os.remove(os.path.join(self.folder_path, "a.json"))
+        index.scan()
+        self.write("a.json", {"message": {}}, age=20)
+        self.assertIn("a.json", [name for name, _ in index.scan()])
+
+    def test_poll_and_process(self):
+        manager = JSONObjectsManager(self.folder_path)
+        processed = []
+        watcher = SchemaWatcher(
+            manager, self.dump_path,
+            on_processed=lambda name, error: processed.append((name, error)))
+        self.write("a.json", {"message": {"a": 1}})
+        self.write("b.json", {"message": {"b": "x"}})
+        self.assertEqual(watcher.poll(), 2)
+        # Queued files are not queued twice.
+        self.assertEqual(watcher.poll(), 0)
+        self.assertEqual(watcher.process_queued(), 2)
+        self.assertEqual(processed, [("a.json", None), ("b.json", None)])
+        with open(os.path.join(self.dump_path, "a_schema.json")) as file:
+            self.assertEqual(
+                json.load(file)["message"]["a"]["type"], "integer")
+
+        self.write("a.json", {"message": {"a": 1.5}})
+        c_path = os.path.join(self.folder_path, "c.json")
+        with open(c_path, "w") as file:
+            file.write("{")
+        os.utime(c_path, (0, 0))
+        self.assertEqual(watcher.poll(), 2)
+        watcher.process_queued()
+        # Failing files are reported, oldest first, without stopping.
+        self.assertEqual(processed[2][0], "c.json")
+        self.assertIsNotNone(processed[2][1])
+        self.assertEqual(processed[3], ("a.json", None))
+        with open(os.path.join(self.dump_path, "a_schema.json")) as file:
+            self.assertEqual(
+                json.load(file)["message"]["a"]["type"], "number")
+        self.assertEqual(watcher.processed, 4)
+
+    def test_on_read(self):
+        manager = JSONObjectsManager(self.folder_path)
+        read = []
+        watcher = SchemaWatcher(
+            manager, self.dump_path, reader_options={"array_sample_size": 2},
+            on_read=lambda name, reader: read.append(
+                (name, reader.sampled_arrays)))
+        self.write("a.json", {"message": {"a": [1, 2, 3]}})
+        self.write("b.json", {"message": {"b": [1]}})
+        watcher.poll()
+        watcher.process_queued()
+        self.assertEqual(
+            read, [("a.json", [("message.a", 3, 2)]), ("b.json", [])])
+
+    def test_max_file_bytes(self):
+        manager = JSONObjectsManager(self.folder_path)
+        processed = []
+        skipped = []
+        watcher = SchemaWatcher(
+            manager, self.dump_path, max_file_bytes=30,
+            on_processed=lambda name, error: processed.append((name, error)),
+            on_skipped=lambda name, size: skipped.append((name, size)))
+        self.write("a.json", {"message": {"a": 1}})
+        self.write("b.json", {"message": {"b": "x" * 30}})
+        watcher.poll()
+        watcher.process_queued()
+        self.assertEqual(processed, [("a.json", None)])
+        self.assertEqual(skipped, [("b.json", 52)])
+        self.assertEqual((watcher.processed, watcher.skipped), (1, 1))
+        self.assertEqual(os.listdir(self.dump_path), ["a_schema.json"])
+
+        # Picked up once it changes to fit.
+        self.write("b.json", {"message": {"b": "x"}})
+        watcher.poll()
+        watcher.process_queued()
+        self.assertEqual(processed[-1], ("b.json", None))
+
+    def test_poll_skips_cached(self):
+        manager = JSONObjectsManager(self.folder_path)
+        cache_path = os.path.join(self.dump_path, ".schema_cache.json")
+        self.write("a.json", {"message": {"a": 1}})
+        watcher = SchemaWatcher(
+            manager, self.dump_path, cache=SchemaCache(cache_path))
+        watcher.poll()
+        watcher.process_queued()
+        self.assertTrue(os.path.exists(cache_path))
+
+        # A restarted watcher skips files whose schema is up to date.
+        watcher = SchemaWatcher(
+            manager, self.dump_path, cache=SchemaCache(cache_path))
+        self.assertEqual(watcher.poll(), 0)
+
+    def test_run(self):
+        manager = JSONObjectsManager(self.folder_path)
+        stop = threading.Event()
+
+        def on_processed(name, error):
+            stop.set()
+
+        watcher = SchemaWatcher(
+            manager, self.dump_path, poll_interval=0.01, debounce=0.0,
+            on_processed=on_processed)
+        self.write("a.json", {"message": {"a": 1}})
+        thread = threading.Thread(target=watcher.run, args=(stop,))
+        thread.start()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(watcher.processed, 1)
+        self.assertTrue(
+            os.path.exists(os.path.join(self.dump_path, "a_schema.json")))
@@ -0,0 +1,63 @@
+from unittest import TestCase
+from schema_generator.json_backend import (
+    JSON_BACKENDS, JSONBackend, get_json_backend
+)
+
+import json
+
+
+class JSONBackendTest(TestCase):
+    def setUp(self) -> None:
+        self.backends = [
+            backend() for backend in JSON_BACKENDS if backend.is_available()
+        ]
+        self.documents = [
+            {},
+            [],
+            {"a": {}, "b": [], "c": [1, {"d": None}], "e": True},
+            {"float": 1e16, "small": 1e-05, "nan": float("nan")},
+            {"non-ascii é": "ünïcode", "control": "\x1f\x7f", "slash": "/"},
+            {"big": 2**70, "negative": -2**70},
+        ]
+        for file_path in ("./data/data_1.json", "./data/data_2.json"):
+            with open(file_path) as file:
+                self.documents.append(json.load(file))
+
+    def test_loads(self):
+        for backend in self.backends:
+            for document in self.documents:
+                with self.subTest(backend=backend.name, document=document):
+                    data = json.dumps(document).encode()
+                    self.assertEqual(
+                        json.dumps(backend.loads(data)), json.dumps(document))
+                    self.assertEqual(
+                        json.dumps(backend.loads(memoryview(data))), 
+                        json.dumps(document)
+                    )
+
+    def test_loads_invalid_json(self):
+        for backend in self.backends:
+            with self.subTest(backend=backend.name):
+                with self.assertRaises(ValueError):
+                    backend.loads(b'{"a": ')
+
+    def test_dumps_matches_stdlib(self):
+        for backend in self.backends:
+            for document in self.documents:
+                with self.subTest(backend=backend.name, document=document):
+                    self.assertEqual(
+                        backend.dumps(document), 
+                        json.dumps(document, indent=2).encode()
+                    )
+
+    def test_get_json_backend(self):
+        self.assertIsInstance(get_json_backend(), type(self.backends[0]))
+        self.assertIsInstance(get_json_backend("auto"), type(self.backends[0]))
+        self.assertIs(type(get_json_backend("json")), JSONBackend)
+        with self.assertRaises(ValueError):
+            get_json_backend("yaml")
+
+        for backend in JSON_BACKENDS:
+            if not backend.is_available():
+                with self.assertRaises(ValueError):
+                    get_json_backend(backend.name)
@@ -1,7 +1,11 @@
 from unittest import TestCase, mock
+from schema_generator.json_backend import JSON_BACKENDS
 from schema_generator.json_manager import JSONObjectsManager
 
+import json
 import os
+import shutil
+import tempfile
 
 
 @mock.patch.object(JSONObjectsManager, "dump_json_to_file")
@@ -57,6 +61,40 @@ class JSONObjectsManagerTest(TestCase):
             self.manager.all_json_plus_filename, self.all_json_plus_filename
         )
 
+    @mock.patch.object(JSONObjectsManager, "_load_all_json")
+    def test_all_json_plus_filename_is_cached(
+        self, _load_all_json, load_json_file, dump_json_to_file
+    ):
+        _load_all_json.return_value = self.all_json_plus_filename
+        self.manager.all_json_plus_filename
+        self.manager.all_json
+        _load_all_json.assert_called_once_with()
+
+        self.manager.refresh()
+        self.manager.all_json_plus_filename
+        self.assertEqual(_load_all_json.call_count, 2)
+
+    @mock.patch("os.listdir")
+    def test_iter_json_plus_filename(
+        self, listdir, load_json_file, dump_json_to_file
+    ):
+        os.listdir.return_value = self.all_file_names
+
+        all_json_plus_file_name = self.manager.iter_json_plus_filename()
+        load_json_file.assert_not_called()
+
+        self.assertEqual(
+            next(all_json_plus_file_name),
+            (load_json_file.return_value, self.json_file_names[0])
+        )
+        load_json_file.assert_called_once_with(self.json_file_paths[0])
+
+        self.assertEqual(
+            list(all_json_plus_file_name),
+            [(load_json_file.return_value, self.json_file_names[1])]
+        )
+        self.assertEqual(load_json_file.call_count, 2)
+
     @mock.patch.object(JSONObjectsManager, "_load_all_json")
     def test_all_json(self, _load_all_json, load_json_file, dump_json_to_file):
         _load_all_json.return_value = self.all_json_plus_filename
@@ -95,3 +133,43 @@ class JSONObjectsManagerTest(TestCase):
                         for file_obj in self.all_json_objects
                     ]
                 )
+
+
+class JSONObjectsManagerFileTest(TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.tmp_dir, "data.json")
+        self.obj = {"message": {"a": [1, 2.5, "é"], "b": None}}
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            json.dump(self.obj, file, ensure_ascii=False)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+
+    def test_load_json_file(self):
+        for backend in JSON_BACKENDS:
+            if not backend.is_available():
+                continue
+            for mmap_threshold in (0, 1 << 30):
+                with self.subTest(
+                        backend=backend.name, mmap_threshold=mmap_threshold):
+                    manager = JSONObjectsManager(
+                        self.tmp_dir, json_backend=backend.name)
+                    manager._mmap_threshold = mmap_threshold
+                    self.assertEqual(
+                        manager.load_json_file(self.file_path), self.obj)
+
+    def test_iter_records(self):
+        with open(os.path.join(self.tmp_dir, "data.ndjson"), "w") as file:
+            file.write('{"a": 1}\n\n{"a": 2}\n')
+        manager = JSONObjectsManager(self.tmp_dir)
+        self.assertEqual(list(manager.iter_records("data.json")), [self.obj])
+        self.assertEqual(
+            list(manager.iter_records("data.ndjson")), [{"a": 1}, {"a": 2}])
+
+    def test_dump_json_to_file(self):
+        manager = JSONObjectsManager(self.tmp_dir)
+        dump_path = os.path.join(self.tmp_dir, "schema.json")
+        manager.dump_json_to_file(self.obj, dump_path)
+        with open(dump_path) as file:
+            self.assertEqual(file.read(), json.dumps(self.obj, indent=2))
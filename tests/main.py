@@ -0,0 +1,262 @@
+from unittest import TestCase, mock
+from schema_generator.json_manager import JSONObjectsManager
+from schema_generator.run_stats import RunStats
+from schema_generator.schema_accumulator import SchemaAccumulator
+from schema_generator.schema_cache import SchemaCache
+from schema_generator.schema_groups import SchemaGroups
+from schema_generator.schema_reader import SchemaReader
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+
+import main
+
+
+class MainTest(TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp()
+        self.folder_path = os.path.join(self.tmp_dir, "data")
+        self.dump_path = os.path.join(self.tmp_dir, "schema")
+        os.mkdir(self.folder_path)
+        os.mkdir(self.dump_path)
+
+        for file_name in ("data_1.json", "data_2.json"):
+            shutil.copy(os.path.join("./data", file_name), self.folder_path)
+        with open(os.path.join(self.folder_path, "broken.json"), "w") as file:
+            file.write('{"message": ')
+
+        self.json_manager = JSONObjectsManager(self.folder_path)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+
+    def run_main(self, argv: list) -> str:
+        """
+        Run main in the temporary folder, and return what it printed.
+        """
+        cwd = os.getcwd()
+        os.chdir(self.tmp_dir)
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output):
+                main.main(argv)
+        finally:
+            os.chdir(cwd)
+        return output.getvalue()
+
+    def assertSchemasWritten(self):
+        for name in ("data_1", "data_2"):
+            with open(os.path.join(self.folder_path, f"{name}.json")) as file:
+                expected_schema = SchemaReader(json.load(file)).schema
+            with open(os.path.join(self.dump_path, f"{name}_schema.json")) as file:
+                self.assertEqual(json.load(file), expected_schema)
+
+    def test_process_json_file(self):
+        for stream in (False, True):
+            with self.subTest(stream=stream):
+                self.assertEqual(
+                    main.process_json_file(
+                        "data_1.json", self.folder_path, self.dump_path, stream),
+                    ("data_1.json", None)
+                )
+                file_name, error = main.process_json_file(
+                    "broken.json", self.folder_path, self.dump_path, stream)
+                self.assertEqual(file_name, "broken.json")
+                self.assertIsNotNone(error)
+
+    def test_skip_large_files(self):
+        size = os.path.getsize(os.path.join(self.folder_path, "data_2.json"))
+        self.assertEqual(
+            main.skip_large_files(
+                ["data_1.json", "data_2.json", "broken.json"], size, 
+                self.json_manager),
+            ["data_2.json", "broken.json"]
+        )
+
+    def test_max_file_bytes_applies_to_every_mode(self):
+        size = os.path.getsize(os.path.join("./data", "data_2.json"))
+        for argv, patched in (
+            (["--validate", "schema.json"], "validate_json_files"),
+            (["--group-by-event-type", "--no-cache"], "group_json_files"),
+            (["--profile", "data_1.json"], "profile_json_file"),
+        ):
+            with self.subTest(argv=argv), \
+                    mock.patch.object(
+                        main, "skip_large_files", 
+                        wraps=main.skip_large_files) as skip_large_files, \
+                    mock.patch.object(main, patched) as process, \
+                    contextlib.redirect_stdout(io.StringIO()):
+                process.return_value = [] if patched=="validate_json_files" \
+                    else (SchemaGroups(), [])
+                main.main(argv + ["--max-file-bytes", str(size)])
+
+                self.assertEqual(skip_large_files.call_count, 1)
+                if patched=="profile_json_file":
+                    process.assert_not_called()
+                else:
+                    self.assertEqual(process.call_args[0][1], ["data_2.json"])
+
+        # The watcher skips files as they land.
+        with mock.patch.object(main, "SchemaWatcher") as watcher, \
+                contextlib.redirect_stdout(io.StringIO()):
+            main.main(["--watch", "--no-cache", "--max-file-bytes", "10"])
+        self.assertEqual(watcher.call_args[1]["max_file_bytes"], 10)
+
+    def test_get_chunksize(self):
+        self.assertEqual(main.get_chunksize(3, 4), 1)
+        self.assertEqual(main.get_chunksize(10000, 32), 78)
+
+    def test_process_all_json_parallel(self):
+        for stream in (False, True):
+            with self.subTest(stream=stream):
+                failures = main.process_all_json_parallel(
+                    2, self.json_manager, self.dump_path, stream)
+                self.assertEqual(
+                    [file_name for file_name, _ in failures], ["broken.json"])
+                self.assertSchemasWritten()
+
+    def test_stale_file_names(self):
+        cache = SchemaCache(os.path.join(self.tmp_dir, "cache.json"))
+        file_names = self.json_manager.json_file_names
+        self.assertEqual(
+            main.get_stale_file_names(
+                file_names, cache, self.json_manager, self.dump_path),
+            file_names
+        )
+
+        main.process_all_json_parallel(
+            2, self.json_manager, self.dump_path, file_names=["data_1.json"])
+        main.update_cache(
+            main.get_file_signatures(["data_1.json"], cache, self.json_manager),
+            cache, self.json_manager, self.dump_path)
+        self.assertEqual(
+            sorted(main.get_stale_file_names(
+                file_names, cache, self.json_manager, self.dump_path)),
+            ["broken.json", "data_2.json"]
+        )
+
+    def test_cache_config_depends_on_mode(self):
+        args = main.parse_args([])
+        self.assertNotEqual(
+            SchemaCache.get_config_key(
+                main.get_cache_config(args, {}, "per-file")),
+            SchemaCache.get_config_key(
+                main.get_cache_config(args, {}, "refresh"))
+        )
+
+    def test_process_json_files_with_stats(self):
+        stats = RunStats()
+        main.process_json_files_with_stats(
+            ["data_1.json", "data_2.json"], stats, self.json_manager,
+            self.dump_path)
+        self.assertSchemasWritten()
+
+        self.assertEqual(set(stats.phases), {"load", "infer", "dump"})
+        self.assertEqual(
+            set(stats.files["data_1.json"]), {"load", "infer", "dump"})
+        self.assertEqual(stats.node_counts["object"], 14)
+        self.assertEqual(
+            stats.largest_arrays[0],
+            ("data_2.json", "message.internationalCountries", 9)
+        )
+
+    def test_refresh_schema(self):
+        schema_path = os.path.join(self.dump_path, "schema.json")
+        cache = SchemaCache(os.path.join(self.tmp_dir, "cache.json"))
+        main.refresh_schema(
+            schema_path, ["data_1.json"], self.json_manager, cache=cache)
+        self.assertTrue(cache.is_fresh(
+            self.json_manager.get_file_path("data_1.json"), schema_path))
+
+        changes = main.refresh_schema(
+            schema_path, ["data_2.json"], self.json_manager)
+        self.assertIn(("message.user", "added"), changes)
+
+        with open(schema_path) as file:
+            schema = json.load(file)
+        expected_schema = SchemaAccumulator()
+        for name in ("data_1", "data_2"):
+            with open(os.path.join(self.folder_path, f"{name}.json")) as file:
+                expected_schema.add(json.load(file))
+        self.assertEqual(schema, expected_schema.schema)
+        self.assertEqual(
+            main.refresh_schema(schema_path, [], self.json_manager), [])
+
+    def test_per_file_and_refresh_runs_keep_their_cache(self):
+        os.remove(os.path.join(self.folder_path, "broken.json"))
+        outputs = [
+            self.run_main(argv) 
+            for argv in ([], ["--refresh", "schema/merged.json"]) * 2
+        ]
+
+        self.assertIn("Skipping 0 unchanged files", outputs[0])
+        self.assertIn("Merging 2 new files", outputs[1])
+        # Neither kind of run drops the cache entries of the other.
+        self.assertIn("Skipping 2 unchanged files", outputs[2])
+        self.assertIn("Merging 0 new files", outputs[3])
+
+    def test_group_schemas_do_not_overwrite_file_schemas(self):
+        os.remove(os.path.join(self.folder_path, "broken.json"))
+        with open(os.path.join(self.folder_path, "event.json"), "w") as file:
+            json.dump({
+                "attributes": {"eventType": "data", "subEventType": "1"},
+                "message": {"g": 1}
+            }, file)
+        self.run_main(["--no-cache"])
+        self.run_main(["--no-cache", "--group-by-event-type"])
+
+        self.assertSchemasWritten()
+        group_path = os.path.join(self.dump_path, "groups", "data_1_schema.json")
+        with open(group_path) as file:
+            self.assertEqual(list(json.load(file)["message"]), ["g"])
+
+    def test_sampled_arrays_are_reported(self):
+        os.remove(os.path.join(self.folder_path, "broken.json"))
+        argv = ["--no-cache", "--array-sample-size", "1"]
+        for mode in ([], ["--async"], ["--group-by-event-type"]):
+            with self.subTest(mode=mode):
+                output = self.run_main(argv + mode)
+                self.assertIn(
+                    "Sampled 1 of 2 items of message.participantIds in "
+                    "data_1.json", output)
+
+    def test_enum_values_are_written(self):
+        os.remove(os.path.join(self.folder_path, "broken.json"))
+        argv = ["--no-cache", "--max-enum-values", "5"]
+        self.run_main(argv + ["--refresh", "schema/merged.json"])
+        self.run_main(argv + ["--group-by-event-type"])
+
+        with open(os.path.join(self.dump_path, "merged.json")) as file:
+            self.assertIn("message", json.load(file))
+        path = os.path.join(self.dump_path, "merged.enum_values.json")
+        with open(path) as file:
+            enum_values = json.load(file)
+        countries = enum_values["message.internationalCountries"]
+        self.assertEqual(countries["count"], 9)
+        self.assertFalse(countries["exact"])
+        self.assertEqual(len(countries["heavy_hitters"]), 9)
+
+        # One file of counts next to each group schema.
+        file_names = sorted(
+            os.listdir(os.path.join(self.dump_path, "groups")))
+        group_file_names = [
+            file_name for file_name in file_names 
+            if file_name.endswith("_schema.json")
+        ]
+        self.assertEqual(len(group_file_names), 2)
+        for file_name in group_file_names:
+            self.assertIn(
+                file_name.replace(".json", ".enum_values.json"), file_names)
+
+    def test_validate_json_files(self):
+        schema_path = os.path.join(self.dump_path, "schema.json")
+        main.refresh_schema(schema_path, ["data_1.json"], self.json_manager)
+        self.assertEqual(
+            main.validate_json_files(
+                schema_path, ["data_1.json", "data_2.json"], self.json_manager),
+            [("data_2.json", 0, "message.user", "unexpected key")]
+        )
@@ -0,0 +1,61 @@
+from unittest import TestCase
+from schema_generator.run_stats import RunStats, profile_call, trace_call
+
+import json
+import os
+import tempfile
+
+
+class RunStatsTest(TestCase):
+    def test_timer(self):
+        stats = RunStats()
+        for _ in range(2):
+            with stats.timer("load", "a.json"):
+                pass
+        with stats.timer("infer"):
+            pass
+
+        self.assertEqual(set(stats.phases), {"load", "infer"})
+        self.assertEqual(set(stats.phases["load"]), {"wall", "cpu"})
+        self.assertEqual(set(stats.files), {"a.json"})
+        self.assertGreaterEqual(stats.files["a.json"]["load"], 0)
+
+    def test_count_nodes(self):
+        stats = RunStats(top=2)
+        stats.count_nodes(
+            {"a": [1, 2.5, {"b": [True, None]}], "c": "x", "d": []},
+            "a.json"
+        )
+        stats.count_nodes({"e": [[1, 2, 3, 4]]}, "b.json")
+
+        self.assertEqual(stats.node_counts, {
+            "object": 3, "array": 5, "string": 1, "integer": 5,
+            "number": 1, "boolean": 1, "null": 1,
+        })
+        self.assertEqual(
+            stats.largest_arrays, [("b.json", "e[]", 4), ("a.json", "a", 3)])
+        self.assertEqual(
+            stats.deepest_paths,
+            [("a.json", "a[].b[]", 4), ("b.json", "e[][]", 3)]
+        )
+
+    def test_save(self):
+        stats = RunStats()
+        stats.count_nodes({"a": [1]}, "a.json")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "stats.json")
+            stats.save(file_path)
+            with open(file_path) as file:
+                saved = json.load(file)
+        self.assertEqual(
+            saved["largest_arrays"],
+            [{"file": "a.json", "path": "a", "length": 1}]
+        )
+        self.assertIn("Largest arrays:", stats.report())
+
+    def test_profile_and_trace_call(self):
+        for capture in (profile_call, trace_call):
+            with self.subTest(capture=capture.__name__):
+                result, report = capture(sorted, [2, 1])
+                self.assertEqual(result, [1, 2])
+                self.assertTrue(report)
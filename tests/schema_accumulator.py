@@ -0,0 +1,223 @@
+from unittest import TestCase
+from schema_generator.schema_accumulator import SchemaAccumulator
+from schema_generator.schema_reader import SchemaReader
+from schema_generator.schema_validator import SchemaValidator
+
+import itertools
+import json
+import sys
+
+
+def leaf(schema_type: str) -> dict:
+    return {
+        "type": schema_type,
+        "tag": "",
+        "description": "",
+        "required": False
+    }
+
+
+class SchemaAccumulatorTest(TestCase):
+    def setUp(self) -> None:
+        self.records = [
+            {"message": {"a": 1, "b": "x", "c": ["x"]}},
+            {"message": {"a": 1.5, "c": ["y"], "d": {"e": None}}},
+            {"message": {"a": 2, "b": 3, "d": {"f": True}}},
+        ]
+
+    def test_single_record_matches_schema_reader(self):
+        with open("./data/data_1.json") as file:
+            record = json.load(file)
+        accumulator = SchemaAccumulator()
+        accumulator.add(record)
+        self.assertEqual(
+            json.dumps(accumulator.schema),
+            json.dumps(SchemaReader(record).schema)
+        )
+        self.assertEqual(accumulator.count, 1)
+        self.assertEqual(accumulator.optional_paths, [])
+
+    def test_widening(self):
+        accumulator = SchemaAccumulator()
+        for record in self.records:
+            accumulator.add(record)
+
+        message = accumulator.schema["message"]
+        self.assertEqual(message["a"], leaf("number"))
+        self.assertEqual(message["b"], {"anyOf": [leaf("string"), leaf("integer")]})
+        self.assertEqual(message["c"], leaf("enum"))
+        self.assertEqual(message["d"], {"e": leaf("null"), "f": leaf("boolean")})
+        self.assertEqual(
+            accumulator.optional_paths,
+            ["message.b", "message.c", "message.d", "message.d.e", "message.d.f"]
+        )
+        self.assertEqual(accumulator.count, 3)
+
+    def test_optional_paths_of_deep_records(self):
+        depth = 300
+        def nest(record: dict) -> dict:
+            for _ in range(depth):
+                record = {"a": [record]}
+            return record
+
+        accumulator = SchemaAccumulator()
+        accumulator.add({"message": nest({"b": 1})})
+        accumulator.add({"message": nest({})})
+        accumulator.add({"message": {"c": 1}})
+
+        # Lowered, so that the test stays fast.
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(200)
+        try:
+            paths = accumulator.optional_paths
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+        self.assertEqual(paths, [
+            "message.a", "message" + ".a[]" * depth + ".b", "message.c"
+        ])
+
+    def test_truncated_schemas_stay_open(self):
+        record = {"message": {
+            "a": {"b": {"c": {"d": 1}}}, "big": list(range(10))
+        }}
+        accumulator = SchemaAccumulator()
+        accumulator.add_schema(SchemaReader(record, max_depth=3).schema)
+        accumulator.add_schema(SchemaReader(record, max_nodes=5).schema)
+        accumulator.add({"message": {"a": {"b": {"c": {"e": 1}}}, "big": [1]}})
+
+        message = accumulator.schema["message"]
+        self.assertEqual(
+            message["a"]["b"]["c"], 
+            dict(leaf("object"), description="truncated: deeper than 3"))
+        self.assertEqual(
+            message["big"], 
+            dict(leaf("array"), items={}, 
+                 description="truncated: over 5 nodes"))
+
+        validator = SchemaValidator(accumulator.schema)
+        self.assertIsNone(validator.validate(record))
+        self.assertIsNone(validator.validate(
+            {"message": {"a": {"b": {"c": {"f": "x"}}}, "big": ["x"]}}))
+
+    def test_enum_values_are_unioned(self):
+        first = dict(leaf("enum"), enum=["b", "a"])
+        second = dict(leaf("enum"), enum=["c", "a"])
+        accumulator = SchemaAccumulator.from_schemas([first, second])
+        self.assertEqual(accumulator.schema["enum"], ["a", "b", "c"])
+
+    def test_max_enum_values(self):
+        accumulator = SchemaAccumulator(max_enum_values=2)
+        accumulator.add({"message": {"c": ["x", "y"]}})
+        self.assertEqual(accumulator.schema["message"]["c"]["enum"], ["x", "y"])
+        other = SchemaAccumulator(max_enum_values=2)
+        other.add({"message": {"c": ["y", "z"]}})
+        accumulator.merge(other)
+
+        self.assertEqual(accumulator.schema["message"]["c"], leaf("enum"))
+        values = accumulator.enum_values["message.c"]
+        self.assertFalse(values.exact)
+        self.assertEqual(values.count, 4)
+        self.assertEqual(values.heavy_hitters()[0], ("y", 2))
+        self.assertEqual(other.enum_values["message.c"].count, 2)
+
+    def test_array_items_are_merged(self):
+        accumulator = SchemaAccumulator()
+        accumulator.add({"message": {"l": [{"a": 1}]}})
+        accumulator.add({"message": {"l": [1, "x"]}})
+        accumulator.add({"message": {"l": []}})
+
+        items = accumulator.schema["message"]["l"]["items"]
+        self.assertEqual(
+            items,
+            {"anyOf": [{"a": leaf("integer")}, leaf("string"), leaf("integer")]}
+        )
+
+    def test_arrays_of_empty_objects_are_kept(self):
+        accumulator = SchemaAccumulator()
+        accumulator.add({"message": [{}]})
+        accumulator.add({"message": [1]})
+        accumulator.add({"message": []})
+
+        schema = accumulator.schema
+        self.assertEqual(
+            schema["message"]["items"], {"anyOf": [{}, leaf("integer")]})
+        validator = SchemaValidator(schema)
+        self.assertIsNone(validator.validate({"message": [{}]}))
+        self.assertIsNone(validator.validate({"message": [1]}))
+        self.assertEqual(
+            validator.validate({"message": [{"a": 1}]}),
+            ("message[0].a", "unexpected key"))
+
+        empty = SchemaAccumulator()
+        empty.add({"message": []})
+        self.assertEqual(empty.schema["message"]["items"], {})
+
+        # Loaded back from a file, {} can only be read as unknown items.
+        stored = SchemaAccumulator()
+        stored.add_schema(json.loads(json.dumps(empty.schema)), stored=True)
+        stored.add({"message": [1]})
+        self.assertEqual(stored.schema["message"]["items"], leaf("integer"))
+        self.assertIsNone(
+            SchemaValidator(empty.schema).validate({"message": [1, "x"]}))
+
+    def test_merge_is_associative_and_commutative(self):
+        shards = []
+        for record in self.records:
+            shard = SchemaAccumulator()
+            shard.add(record)
+            shards.append(shard)
+
+        expected = SchemaAccumulator()
+        for record in self.records:
+            expected.add(record)
+
+        for order in itertools.permutations(shards):
+            with self.subTest(order=order):
+                left = SchemaAccumulator().merge(order[0]).merge(order[1])
+                left.merge(order[2])
+                right = SchemaAccumulator().merge(order[1]).merge(order[2])
+                right = SchemaAccumulator().merge(order[0]).merge(right)
+
+                for accumulator in (left, right):
+                    self.assertEqual(accumulator.schema, expected.schema)
+                    self.assertEqual(
+                        sorted(accumulator.optional_paths),
+                        sorted(expected.optional_paths)
+                    )
+                    self.assertEqual(accumulator.count, expected.count)
+
+    def test_merge_leaves_other_untouched(self):
+        first = SchemaAccumulator()
+        first.add(self.records[0])
+        second = SchemaAccumulator()
+        second.add(self.records[1])
+        schema_before = second.schema
+
+        first.merge(second)
+        first.add(self.records[2])
+        self.assertEqual(second.schema, schema_before)
+
+    def test_add_schema_round_trip(self):
+        accumulator = SchemaAccumulator()
+        for record in self.records:
+            accumulator.add(record)
+        round_trip = SchemaAccumulator.from_schemas([accumulator.schema])
+        self.assertEqual(round_trip.schema, accumulator.schema)
+
+    def test_diff(self):
+        accumulator = SchemaAccumulator()
+        accumulator.add(self.records[0])
+        stored = SchemaAccumulator().merge(accumulator)
+        for record in self.records[1:]:
+            accumulator.add(record)
+
+        self.assertEqual(accumulator.diff(stored), [
+            ("message.a", "type integer -> number"),
+            ("message.b", "type string -> string, integer"),
+            ("message.d", "added"),
+        ])
+        self.assertEqual(stored.diff(stored), [])
+
+    def test_invalid_schema(self):
+        with self.assertRaises(ValueError):
+            SchemaAccumulator().add_schema({"a": leaf("date")})
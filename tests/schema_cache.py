@@ -0,0 +1,131 @@
+from unittest import TestCase
+from schema_generator.schema_cache import SchemaCache
+
+import json
+import os
+import shutil
+import tempfile
+
+
+class SchemaCacheTest(TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.tmp_dir, "cache.json")
+        self.file_path = self.write_file("data.json", '{"message": {}}')
+        self.output_path = self.write_file("data_schema.json", "{}")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+
+    def write_file(self, file_name: str, text: str) -> str:
+        file_path = os.path.join(self.tmp_dir, file_name)
+        with open(file_path, "w") as file:
+            file.write(text)
+        return file_path
+
+    def update(self, cache: SchemaCache, file_path: str) -> None:
+        cache.update(
+            file_path, self.output_path, cache.get_signature(file_path))
+
+    def test_hit_after_update(self):
+        cache = SchemaCache(self.cache_path)
+        self.assertFalse(cache.is_fresh(self.file_path, self.output_path))
+        self.update(cache, self.file_path)
+        cache.save()
+
+        cache = SchemaCache(self.cache_path)
+        self.assertTrue(cache.is_fresh(self.file_path, self.output_path))
+
+    def test_modified_file_is_miss(self):
+        cache = SchemaCache(self.cache_path)
+        self.update(cache, self.file_path)
+        self.write_file("data.json", '{"message": {"a": 1}}')
+        self.assertFalse(cache.is_fresh(self.file_path, self.output_path))
+
+    def test_touched_file_is_hit_with_hash(self):
+        for use_hash in (False, True):
+            with self.subTest(use_hash=use_hash):
+                cache = SchemaCache(self.cache_path, use_hash=use_hash)
+                self.update(cache, self.file_path)
+                stat = os.stat(self.file_path)
+                os.utime(
+                    self.file_path, 
+                    ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9)
+                )
+                self.assertEqual(
+                    cache.is_fresh(self.file_path, self.output_path), use_hash)
+
+    def test_file_changed_while_processed_is_miss(self):
+        for use_hash in (False, True):
+            with self.subTest(use_hash=use_hash):
+                cache = SchemaCache(self.cache_path, use_hash=use_hash)
+                signature = cache.get_signature(self.file_path)
+                stat = os.stat(self.file_path)
+                self.write_file(
+                    "data.json", json.dumps({"message": {"a": use_hash}}))
+                os.utime(
+                    self.file_path, 
+                    ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9)
+                )
+                cache.update(self.file_path, self.output_path, signature)
+                self.assertFalse(
+                    cache.is_fresh(self.file_path, self.output_path))
+
+    def test_config_change_is_miss(self):
+        cache = SchemaCache(self.cache_path, config={"array_sample_size": 10})
+        self.update(cache, self.file_path)
+        cache.save()
+
+        cache = SchemaCache(self.cache_path, config={"array_sample_size": 20})
+        self.assertFalse(cache.is_fresh(self.file_path, self.output_path))
+
+    def test_entries_per_output(self):
+        other_output_path = self.write_file("merged_schema.json", "{}")
+        cache = SchemaCache(self.cache_path, config={"mode": "per-file"})
+        self.update(cache, self.file_path)
+        cache.save()
+
+        # Written to another output, under other settings.
+        cache = SchemaCache(self.cache_path, config={"mode": "refresh"})
+        self.assertFalse(cache.is_fresh(self.file_path, other_output_path))
+        cache.update(
+            self.file_path, other_output_path, 
+            cache.get_signature(self.file_path))
+        cache.save()
+        self.assertEqual(len(cache), 2)
+
+        cache = SchemaCache(self.cache_path, config={"mode": "per-file"})
+        self.assertTrue(cache.is_fresh(self.file_path, self.output_path))
+        self.assertFalse(cache.is_fresh(self.file_path, other_output_path))
+        cache = SchemaCache(self.cache_path, config={"mode": "refresh"})
+        self.assertTrue(cache.is_fresh(self.file_path, other_output_path))
+
+    def test_missing_output_is_miss(self):
+        cache = SchemaCache(self.cache_path)
+        self.update(cache, self.file_path)
+        os.remove(self.output_path)
+        self.assertFalse(cache.is_fresh(self.file_path, self.output_path))
+
+    def test_save_evicts_entries(self):
+        cache = SchemaCache(self.cache_path, max_entries=2)
+        file_paths = [
+            self.write_file(f"data_{index}.json", "{}") for index in range(3)
+        ]
+        for file_path in file_paths:
+            self.update(cache, file_path)
+        os.remove(file_paths[2])
+        cache.save()
+        self.assertEqual(len(cache), 2)
+
+        self.update(cache, file_paths[1])
+        self.update(cache, self.file_path)
+        cache.save()
+        self.assertEqual(len(cache), 2)
+        self.assertFalse(cache.is_fresh(file_paths[0], self.output_path))
+        self.assertTrue(cache.is_fresh(file_paths[1], self.output_path))
+
+    def test_corrupt_cache_reads_empty(self):
+        self.write_file("cache.json", '{"version": ')
+        cache = SchemaCache(self.cache_path)
+        self.assertEqual(len(cache), 0)
+        self.assertFalse(cache.is_fresh(self.file_path, self.output_path))
@@ -0,0 +1,175 @@
+from unittest import TestCase, mock
+from schema_generator.schema_accumulator import SchemaAccumulator
+from schema_generator.schema_groups import (
+    SchemaGroups, get_group_file_name, get_group_file_names, get_group_key,
+    group_json_files, group_json_files_parallel
+)
+
+import json
+import os
+import pickle
+import shutil
+import tempfile
+
+
+def record(event_type, sub_event_type, message) -> dict:
+    return {
+        "attributes": {"eventType": event_type, "subEventType": sub_event_type},
+        "message": message,
+    }
+
+
+class SchemaGroupsTest(TestCase):
+    def setUp(self) -> None:
+        self.records = [
+            record("trade", "open", {"a": 1}),
+            record("trade", "close", {"b": "x"}),
+            record("trade", "open", {"a": 1.5, "c": None}),
+            {"message": {"d": True}},
+        ]
+
+    def test_get_group_key(self):
+        self.assertEqual(get_group_key(self.records[0]), ("trade", "open"))
+        self.assertEqual(get_group_key(self.records[3]), (None, None))
+        self.assertEqual(get_group_key({"attributes": []}), (None, None))
+        self.assertEqual(
+            get_group_key(record(["trade"], 1, {})), ('["trade"]', "1"))
+
+        groups = SchemaGroups()
+        groups.add(record({"a": 1}, None, {"a": 1}))
+        self.assertEqual(list(groups.groups), [('{"a": 1}', None)])
+
+    def test_get_group_file_name(self):
+        self.assertEqual(
+            get_group_file_name(("trade", "open")), "trade_open_schema.json")
+        self.assertRegex(
+            get_group_file_name(("a/b c", None)),
+            r"^a_b_c_unknown_[0-9a-f]{8}_schema\.json$")
+
+        keys = [
+            ("a_b", "c"), ("a", "b_c"), ("a", "b"), ("unknown", "x"), 
+            (None, "x"), ("a b", "c"), ("a-b", "c"),
+        ]
+        file_names = get_group_file_names(keys)
+        self.assertEqual(len(set(file_names.values())), len(keys))
+
+        with mock.patch(
+                "schema_generator.schema_groups.get_group_file_name",
+                return_value="same_schema.json"):
+            with self.assertRaises(ValueError):
+                get_group_file_names(keys[:2])
+
+    def test_add(self):
+        groups = SchemaGroups()
+        for item in self.records:
+            groups.add(item)
+
+        self.assertEqual(len(groups), 3)
+        self.assertEqual(groups.count, 4)
+        expected = SchemaAccumulator()
+        expected.add(self.records[0])
+        expected.add(self.records[2])
+        schemas = dict(groups.iter_schemas())
+        self.assertEqual(schemas[("trade", "open")], expected.schema)
+        self.assertEqual(
+            [key for key, _ in groups.iter_schemas()],
+            [(None, None), ("trade", "close"), ("trade", "open")]
+        )
+
+    def test_add_counts_enum_values(self):
+        groups = SchemaGroups({"max_enum_values": 2})
+        for values in (["x", "y"], ["x"]):
+            groups.add(record("trade", "open", {"e": values}))
+        enum_values = groups.groups[("trade", "open")].enum_values
+        self.assertEqual(list(enum_values), ["message.e"])
+        self.assertEqual(enum_values["message.e"].heavy_hitters(), 
+                         [("x", 2), ("y", 1)])
+
+    def test_sampled_arrays_and_truncated(self):
+        options = {"array_sample_size": 2, "max_depth": 2}
+        groups = SchemaGroups(options)
+        groups.add(record("trade", "open", {"a": [1, 2, 3]}), "x.json")
+        groups.add(record("trade", "open", {"a": [1] * 5}), "x.json")
+        other = SchemaGroups(options)
+        other.add(
+            record("trade", "close", {"a": [1] * 4, "b": {"c": {"d": 1}}}),
+            "y.json")
+
+        self.assertEqual(groups.sampled_arrays, [("x.json", "message.a", 5, 2)])
+        self.assertEqual(groups.truncated, [])
+        groups.merge(other)
+        self.assertEqual(groups.sampled_arrays, [
+            ("x.json", "message.a", 5, 2), ("y.json", "message.a", 4, 2)])
+        self.assertEqual(groups.truncated, [
+            ("y.json", "message.b.c", "deeper than 2")])
+        copy = pickle.loads(pickle.dumps(groups))
+        self.assertEqual(copy.sampled_arrays, groups.sampled_arrays)
+        self.assertEqual(copy.truncated, groups.truncated)
+
+    def test_merge(self):
+        groups = SchemaGroups()
+        other = SchemaGroups()
+        for index, item in enumerate(self.records):
+            (groups if index % 2 else other).add(item)
+        everything = SchemaGroups()
+        for item in self.records:
+            everything.add(item)
+
+        merged = SchemaGroups().merge(other).merge(groups)
+        self.assertEqual(
+            dict(merged.iter_schemas()), dict(everything.iter_schemas()))
+        self.assertEqual(other.count, 2)
+
+        copy = pickle.loads(pickle.dumps(merged))
+        self.assertEqual(
+            dict(copy.iter_schemas()), dict(merged.iter_schemas()))
+
+    def test_group_json_files(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(tmp_dir, "events.ndjson"), "w") as file:
+                for item in self.records[:3]:
+                    file.write(json.dumps(item) + "\n")
+            with open(os.path.join(tmp_dir, "event.json"), "w") as file:
+                json.dump(self.records[3], file)
+            file_names = ["events.ndjson", "event.json"]
+
+            groups, failures = group_json_files(tmp_dir, file_names)
+            self.assertEqual(groups.count, 4)
+            self.assertEqual(failures, [])
+            parallel_groups, failures = group_json_files_parallel(
+                2, tmp_dir, file_names)
+            self.assertEqual(
+                dict(parallel_groups.iter_schemas()),
+                dict(groups.iter_schemas())
+            )
+            self.assertEqual(failures, [])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_group_json_files_with_failing_file(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(tmp_dir, "events.ndjson"), "w") as file:
+                for item in self.records[:3]:
+                    file.write(json.dumps(item) + "\n")
+            with open(os.path.join(tmp_dir, "broken.ndjson"), "w") as file:
+                file.write(json.dumps(self.records[3]) + "\n{\n")
+            file_names = ["broken.ndjson", "events.ndjson"]
+
+            for workers in (0, 2):
+                with self.subTest(workers=workers):
+                    if workers:
+                        groups, failures = group_json_files_parallel(
+                            workers, tmp_dir, file_names)
+                    else:
+                        groups, failures = group_json_files(
+                            tmp_dir, file_names)
+                    self.assertEqual(groups.count, 3)
+                    self.assertNotIn((None, None), groups.groups)
+                    self.assertEqual(
+                        [file_name for file_name, _ in failures],
+                        ["broken.ndjson"]
+                    )
+        finally:
+            shutil.rmtree(tmp_dir)
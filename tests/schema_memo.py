@@ -0,0 +1,54 @@
+from unittest import TestCase
+from schema_generator.schema_memo import SchemaMemo
+
+
+class SchemaMemoTest(TestCase):
+    def test_get_and_put(self):
+        memo = SchemaMemo()
+        obj = {"a": "x", "b": 1}
+        keys = tuple(obj)
+        self.assertIsNone(memo.get(obj, keys))
+
+        schema = {"a": {"type": "string"}, "b": {"type": "integer"}}
+        memo.put(obj, keys, schema)
+        self.assertIs(memo.get({"a": "y", "b": 2}, keys), schema)
+        self.assertIsNone(memo.get({"a": "y", "b": 2.5}, keys))
+        self.assertEqual((memo.hits, memo.misses), (1, 1))
+        self.assertEqual(memo.hit_rate, 0.5)
+
+    def test_eviction(self):
+        memo = SchemaMemo(max_size=2)
+        objs = [{"a": 1}, {"b": 1}, {"c": 1}]
+        for obj in objs[:2]:
+            memo.put(obj, tuple(obj), {})
+        memo.get(objs[0], tuple(objs[0]))
+        memo.put(objs[2], tuple(objs[2]), {})
+
+        self.assertEqual(len(memo), 2)
+        self.assertIsNotNone(memo.get(objs[0], tuple(objs[0])))
+        self.assertIsNone(memo.get(objs[1], tuple(objs[1])))
+
+    def test_eviction_of_types(self):
+        memo = SchemaMemo(max_size=3)
+        memo.put({"z": 1}, ("z",), {})
+        types = (None, True, 1, 1.5, "x")
+        for value in types:
+            memo.put({"a": value}, ("a",), {})
+        # Other keys go first, then the oldest types of the same keys.
+        self.assertEqual(len(memo), 3)
+        self.assertIsNone(memo.get({"z": 1}, ("z",)))
+        self.assertIsNone(memo.get({"a": True}, ("a",)))
+        for value in types[2:]:
+            self.assertIsNotNone(memo.get({"a": value}, ("a",)))
+
+    def test_disabled(self):
+        memo = SchemaMemo(max_size=0)
+        memo.put({"a": 1}, ("a",), {})
+        self.assertEqual(len(memo), 0)
+        self.assertEqual(memo.misses, 1)
+
+    def test_clear(self):
+        memo = SchemaMemo()
+        memo.put({"a": 1}, ("a",), {})
+        memo.clear()
+        self.assertEqual((len(memo), memo.hits, memo.misses), (0, 0, 0))
@@ -0,0 +1,143 @@
+from unittest import TestCase
+from schema_generator.schema_node import (
+    SchemaNode, copy_node, diff_nodes, get_path_depth, merge_nodes, 
+    node_from_schema, serialize_node
+)
+from schema_generator.schema_reader import SchemaReader
+
+import json
+import sys
+
+
+class SchemaNodeTest(TestCase):
+    def setUp(self) -> None:
+        self.default_object_schema = SchemaReader._default_object_schema
+        with open("./data/data_1.json") as file:
+            self.schema = SchemaReader(json.load(file)).schema
+
+    def test_round_trip(self):
+        node = node_from_schema(self.schema)
+        self.assertEqual(
+            serialize_node(node, self.default_object_schema), self.schema)
+
+    def test_deep_nesting(self):
+        depth = 300
+        leaf = dict(self.default_object_schema)
+        schema = dict(leaf, type="integer")
+        for _ in range(depth):
+            schema = {"anyOf": [
+                dict(leaf, type="array", items={"a": schema}),
+                dict(leaf, type="null")
+            ]}
+        other = {"anyOf": [
+            dict(leaf, type="array", items={"b": dict(leaf, type="null")}),
+            dict(leaf, type="string")
+        ]}
+
+        # Lowered, so that the test stays fast.
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(200)
+        try:
+            node = node_from_schema(schema)
+            unmerged = copy_node(node)
+            merge_nodes(node, copy_node(node_from_schema(other)), adopt=False)
+            merged = serialize_node(copy_node(node), leaf)
+            self.assertEqual(copy_node(node), node)
+            self.assertNotEqual(unmerged, node)
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+
+        self.assertEqual(
+            [alternative["type"] for alternative in merged["anyOf"]],
+            ["array", "string", "null"]
+        )
+        self.assertEqual(
+            merged["anyOf"][0]["items"]["b"], dict(leaf, type="null"))
+        schema = merged["anyOf"][0]["items"]["a"]
+        for _ in range(depth - 1):
+            self.assertEqual(schema["anyOf"][1]["type"], "null")
+            schema = schema["anyOf"][0]["items"]["a"]
+        self.assertEqual(schema["type"], "integer")
+
+    def test_node_from_schema(self):
+        leaf = dict(self.default_object_schema)
+        node = node_from_schema({
+            "a": dict(leaf, type="array", items=dict(leaf, type="integer")),
+            "b": dict(leaf, type="enum", enum=["x", "y"]),
+        })
+        self.assertTrue(node.has("object"))
+        self.assertFalse(node.has("array"))
+        self.assertEqual(node.counts, {"a": 1, "b": 1})
+        self.assertTrue(node.properties["a"].items.has("integer"))
+        self.assertEqual(node.properties["b"].enum, {"x", "y"})
+
+        with self.assertRaises(ValueError):
+            node_from_schema(dict(leaf, type="date"))
+
+        # Objects whose keys were not read merge as objects without keys.
+        node = node_from_schema({"a": dict(leaf, type="object")})
+        merge_nodes(
+            node, node_from_schema({"a": {"b": dict(leaf, type="null")}}), 
+            adopt=True)
+        self.assertEqual(node.properties["a"].counts, {"b": 1})
+        self.assertEqual(node.properties["a"].total, 2)
+
+    def test_get_path_depth(self):
+        path = (((None, "message"), "a"), "[]")
+        self.assertEqual(get_path_depth(None), 0)
+        self.assertEqual(get_path_depth(path), 3)
+        self.assertEqual(get_path_depth(path, 2), 2)
+
+    def test_merge_nodes(self):
+        leaf = dict(self.default_object_schema)
+        target = node_from_schema({"a": dict(leaf, type="integer")})
+        source = node_from_schema({
+            "a": dict(leaf, type="number"), "b": dict(leaf, type="null")})
+        merge_nodes(target, source, adopt=False)
+
+        self.assertEqual(target.total, 2)
+        self.assertEqual(target.counts, {"a": 2, "b": 1})
+        self.assertEqual(
+            serialize_node(target.properties["a"], leaf), 
+            dict(leaf, type="number")
+        )
+        self.assertIsNot(target.properties["b"], source.properties["b"])
+
+        merge_nodes(target, source, adopt=True)
+        self.assertEqual(target.counts, {"a": 3, "b": 2})
+
+    def test_merge_enum_values(self):
+        def merge(*values_sets, max_enum_values=None):
+            node = SchemaNode()
+            for values in values_sets:
+                merge_nodes(
+                    node, node_from_schema({"type": "enum", "enum": values}), 
+                    adopt=True, max_enum_values=max_enum_values)
+            return node.enum
+
+        self.assertEqual(merge(["a"], ["b", "a"]), {"a", "b"})
+        self.assertEqual(merge(["a"], ["b"], max_enum_values=1), set())
+        # Values that are unknown on one side stay unknown.
+        self.assertEqual(merge(["a"], [], ["b"]), set())
+
+    def test_diff_nodes(self):
+        old = node_from_schema({"a": {"type": "enum", "enum": ["x"]}})
+        new = node_from_schema({"a": {"type": "enum", "enum": ["x", "y"]}})
+        self.assertEqual(diff_nodes(old, new), [("a", "enum +1 values")])
+        self.assertEqual(
+            diff_nodes(SchemaNode(), old), [("", "type none -> object")])
+
+    def test_eq(self):
+        node = node_from_schema(self.schema)
+        self.assertEqual(node, copy_node(node))
+        self.assertEqual(SchemaNode(), SchemaNode())
+
+        other = copy_node(node)
+        merge_nodes(other, node, adopt=False)
+        self.assertNotEqual(node, other)
+
+    def test_property_keys_are_interned(self):
+        first = node_from_schema(json.loads('{"some key": {}}'))
+        second = node_from_schema(json.loads('{"some key": {}}'))
+        self.assertIs(
+            next(iter(first.properties)), next(iter(second.properties)))
@@ -1,8 +1,11 @@
 from unittest import TestCase, mock
+from schema_generator.schema_memo import SchemaMemo
 from schema_generator.schema_reader import SchemaReader
 
-
 import copy
+import itertools
+import json
+import sys
 
 
 class SchemaReaderTest(TestCase):
@@ -27,6 +30,12 @@ class SchemaReaderTest(TestCase):
             {"message": self.test_data_obj.get("message")}
         )
 
+    @mock.patch.object(SchemaReader, "_build_schema")
+    def test_schema_is_memoized(self, _build_schema):
+        self.assertEqual(self.schema_reader.schema, _build_schema.return_value)
+        self.assertEqual(self.schema_reader.schema, _build_schema.return_value)
+        _build_schema.assert_called_once_with()
+
     def test__build_schema_on_empty_dict(self):
         """Test _build_schema for {"message": {}}."""
         test_obj = {"message": {}}
@@ -118,7 +127,6 @@ class SchemaReaderTest(TestCase):
                     schema = schema_reader._get_object_schema(test_obj)
 
                     expected_schema["type"] = "array"
-                    expected_schema["items"] = _build_array_schema_items.return_value
 
                     _get_list_item_types.assert_called_once_with(test_obj)
                     _get_list_item_types.reset_mock(
@@ -127,7 +135,8 @@ class SchemaReaderTest(TestCase):
                     )
                     
                     _build_array_schema_items.assert_called_once_with(
-                        test_obj, _get_list_item_types.return_value)
+                        schema, test_obj, _get_list_item_types.return_value, 
+                        mock.ANY, None)
                     _build_array_schema_items.reset_mock(
                         return_value=False,
                         side_effect=False
@@ -138,64 +147,393 @@ class SchemaReaderTest(TestCase):
                 elif test_obj is test_object:
                     schema = schema_reader._get_object_schema(test_obj)
 
-                    _build_object_schema_properties.assert_called_once_with(test_obj)
+                    _build_object_schema_properties.assert_called_once_with(
+                        test_obj, mock.ANY, None)
+                    self.assertEqual(
+                        schema, _build_object_schema_properties.return_value)
 
                 else:
                     with self.assertRaises(ValueError):
                         schema = schema_reader._get_object_schema(test_obj)
 
-    @mock.patch.object(SchemaReader, "_get_object_schema")
-    def test__build_object_schema_properties(self, _get_object_schema):
-        test_obj = {"test1": "test1", "test2": "test2"}
-        schema_reader = self.schema_reader
-        props = schema_reader._build_object_schema_properties(test_obj)
-
-        expected_props = {
-            "test1": schema_reader._get_object_schema.return_value,
-            "test2": schema_reader._get_object_schema.return_value
-        }
-
-        _get_object_schema.assert_has_calls(
-            [mock.call(value) for value in test_obj.values()]
+    @mock.patch.object(SchemaReader, "_get_leaf_schema")
+    def test__build_object_schema_properties(self, _get_leaf_schema):
+        class Integer(int):
+            pass
+
+        test_obj = {
+            "test1": Integer(1), "test2": {"test": 2}, "test3": [3], 
+            "test4": "test4", "test5": 5}
+        pending = []
+        props = self.schema_reader._build_object_schema_properties(
+            test_obj, pending)
+
+        # Only leaves of subclasses miss the inlined fast path.
+        _get_leaf_schema.assert_called_once_with(test_obj["test1"])
+        expected_string_schema = copy.deepcopy(
+            self.schema_reader._default_object_schema)
+        expected_string_schema["type"] = "string"
+        expected_integer_schema = dict(expected_string_schema, type="integer")
+        self.assertEqual(
+            props,
+            {
+                "test1": _get_leaf_schema.return_value, 
+                "test2": None, 
+                "test3": None, 
+                "test4": expected_string_schema,
+                "test5": expected_integer_schema
+            }
+        )
+        self.assertEqual(
+            pending,
+            [
+                ({"test": 2}, props, "test2", (None, "test2")), 
+                ([3], props, "test3", (None, "test3"))
+            ]
         )
 
-        self.assertEqual(props, expected_props)
-
-
-    @mock.patch.object(SchemaReader, "_get_object_schema")
-    def test__build_array_schema_items(self, _get_object_schema):
-        homo_test_obj = [3.3]
+    @mock.patch.object(SchemaReader, "_merge_array_items")
+    @mock.patch.object(SchemaReader, "_get_leaf_schema")
+    def test__build_array_schema_items(self, _get_leaf_schema, _merge_array_items):
+        homo_test_obj = [3.3, 4.4]
+        homo_dict_test_obj = [{"test": 1}, {"test": 2}]
         heter_test_obj = ["test1", "test2", 2.3, 2, 3.2, 59]
+        heter_nested_test_obj = ["test1", ["test"], 2]
+        empty_test_obj = []
         homo_list_item_types = [float]
+        homo_dict_list_item_types = [dict]
         heter_list_item_types = [str, float, int]
+        heter_nested_list_item_types = [str, list, int]
+        empty_list_item_types = []
 
         for test_obj, list_item_types in zip(
-            (homo_test_obj, heter_test_obj),
-            (homo_list_item_types, heter_list_item_types)
+            (homo_test_obj, homo_dict_test_obj, heter_test_obj, 
+             heter_nested_test_obj, empty_test_obj),
+            (homo_list_item_types, homo_dict_list_item_types, 
+             heter_list_item_types, heter_nested_list_item_types, 
+             empty_list_item_types)
         ):
-            schema_reader = self.schema_reader
-            items = schema_reader._build_array_schema_items(test_obj, list_item_types)
-            
-            if test_obj is homo_test_obj:
-                _get_object_schema.assert_called_once_with(3.3)
-                self.assertEqual(items, _get_object_schema.return_value)
-
-                _get_object_schema.reset_mock()
-
-            elif test_obj is heter_test_obj:
-                _get_object_schema.assert_has_calls(
-                    [mock.call(item) for item in heter_test_obj]
-                )
-                self.assertEqual(
-                    items,
-                    {"anyOf": 
-                     [_get_object_schema.return_value for item in heter_test_obj]}
-                )
-
-                _get_object_schema.reset_mock()
+            with self.subTest(test_obj=test_obj):
+                schema = {}
+                pending = []
+                path = (None, "test")
+                item_path = (path, "[]")
+                self.schema_reader._build_array_schema_items(
+                    schema, test_obj, list_item_types, pending, path)
+
+                if test_obj is homo_test_obj:
+                    _get_leaf_schema.assert_called_once_with(3.3)
+                    self.assertEqual(
+                        schema, {"items": _get_leaf_schema.return_value})
+                    self.assertEqual(pending, [])
+
+                elif test_obj is homo_dict_test_obj:
+                    self.assertEqual(schema, {})
+                    items, _, _, _ = pending[0]
+                    self.assertEqual(items.schemas, [None, None])
+                    self.assertEqual(
+                        pending, 
+                        [
+                            (items, schema, "items", path),
+                            ({"test": 1}, items.schemas, 0, item_path),
+                            ({"test": 2}, items.schemas, 1, item_path),
+                        ]
+                    )
+
+                elif test_obj is heter_test_obj:
+                    _get_leaf_schema.assert_has_calls(
+                        [mock.call("test1"), mock.call(2.3), mock.call(2)])
+                    _merge_array_items.assert_called_once_with(
+                        [_get_leaf_schema.return_value] * 3)
+                    self.assertEqual(
+                        schema, {"items": _merge_array_items.return_value})
+                    self.assertEqual(pending, [])
+
+                elif test_obj is heter_nested_test_obj:
+                    self.assertEqual(schema, {})
+                    items, _, _, _ = pending[0]
+                    self.assertEqual(
+                        items.schemas,
+                        [_get_leaf_schema.return_value, None, 
+                         _get_leaf_schema.return_value]
+                    )
+                    self.assertEqual(
+                        pending,
+                        [
+                            (items, schema, "items", path),
+                            (["test"], items.schemas, 1, item_path),
+                        ]
+                    )
+
+                else:
+                    self.assertEqual(schema, {"items": {}})
+                    self.assertEqual(pending, [])
+
+                _get_leaf_schema.reset_mock()
+                _merge_array_items.reset_mock()
+
+    def test__merge_array_items(self):
+        leaf = self.schema_reader._default_object_schema
+        self.assertEqual(
+            self.schema_reader._merge_array_items([{"a": dict(leaf, type="integer")}]),
+            {"a": dict(leaf, type="integer")}
+        )
+        self.assertEqual(
+            self.schema_reader._merge_array_items([
+                {"a": dict(leaf, type="integer")},
+                dict(leaf, type="string"),
+                {"a": dict(leaf, type="number"), "b": dict(leaf, type="null")},
+                dict(leaf, type="string"),
+            ]),
+            {"anyOf": [
+                {"a": dict(leaf, type="number"), "b": dict(leaf, type="null")},
+                dict(leaf, type="string"),
+            ]}
+        )
+
+    def test_array_sampling(self):
+        test_obj = {"message": {"list": [{"a": index} for index in range(10)]}}
+        test_obj["message"]["list"].append({"b": 1})
+
+        schema_reader = SchemaReader(test_obj)
+        self.assertIn("b", schema_reader.schema["message"]["list"]["items"])
+        self.assertEqual(schema_reader.sampled_arrays, [])
+
+        schema_reader = SchemaReader(test_obj, array_sample_size=5)
+        self.assertNotIn("b", schema_reader.schema["message"]["list"]["items"])
+        self.assertEqual(
+            schema_reader.sampled_arrays, [("message.list", 11, 5)])
+
+        for seed in range(3):
+            schema_reader = SchemaReader(
+                test_obj, array_sample_size=5, array_sampling="reservoir", 
+                seed=seed)
+            self.assertIn("a", schema_reader.schema["message"]["list"]["items"])
+            self.assertEqual(
+                schema_reader.sampled_arrays, [("message.list", 11, 5)])
+
+        with self.assertRaises(ValueError):
+            SchemaReader(test_obj, array_sampling="last")
+
+    def test_enum_values(self):
+        test_obj = {"message": {
+            "tags": ["b", "a", "b"],
+            "many": ["a", "b", "c", "d"],
+            "items": [{"tags": ["x"]}, {"tags": ["y", "x"]}],
+        }}
+        schema = SchemaReader(test_obj).schema["message"]
+        self.assertNotIn("enum", schema["tags"])
+
+        schema_reader = SchemaReader(test_obj, max_enum_values=3)
+        schema = schema_reader.schema["message"]
+        self.assertEqual(schema["tags"]["enum"], ["a", "b"])
+        self.assertNotIn("enum", schema["many"])
+        self.assertEqual(schema["items"]["items"]["tags"]["enum"], ["x", "y"])
+
+        enum_values = schema_reader.enum_values
+        self.assertEqual(
+            sorted(enum_values), ["message.items[].tags", "message.many", 
+                                  "message.tags"])
+        self.assertEqual(enum_values["message.tags"].heavy_hitters()[0], ("b", 2))
+        self.assertEqual(enum_values["message.items[].tags"].count, 3)
+
+    def test_flat_objects_are_memoized(self):
+        user = {"id": "a", "ranking": 1}
+        test_obj = {"message": {
+            "creator": user,
+            "joiner": dict(user, id="b"),
+            "participants": [{"user": dict(user, id="c")} for _ in range(3)],
+            "other": {"id": 1, "ranking": 1},
+        }}
+        memo = SchemaMemo()
+        schema = SchemaReader(test_obj, memo=memo).schema["message"]
+
+        self.assertIs(schema["joiner"], schema["creator"])
+        self.assertEqual(schema["other"]["id"]["type"], "integer")
+        self.assertEqual((memo.hits, memo.misses), (4, 2))
+        self.assertEqual(
+            json.dumps(schema), 
+            json.dumps(SchemaReader(
+                copy.deepcopy(test_obj), memo=SchemaMemo(0)).schema["message"])
+        )
+
+        SchemaReader(copy.deepcopy(test_obj), memo=memo).schema
+        self.assertEqual((memo.hits, memo.misses), (10, 2))
+
+    def test__get_object_schema_on_deep_nesting(self):
+        """Test that nesting is not limited by the recursion limit."""
+        depth = 100000
+        test_obj = 1
+        for index in range(depth):
+            test_obj = {"a": [test_obj]} if index % 2 else {"a": test_obj}
+
+        schema = self.schema_reader._get_object_schema(test_obj)
+        for index in reversed(range(depth)):
+            schema = schema["a"]["items"] if index % 2 else schema["a"]
+        self.assertEqual(schema["type"], "integer")
+
+    def test_mixed_arrays_on_deep_nesting(self):
+        """Test that merging array items is not limited by the recursion 
+        limit, lowered here so that the test stays fast."""
+        depth = 300
+        nested_lists = [1, 1]
+        nested_objects = 1
+        for _ in range(depth):
+            nested_lists = [nested_lists, 1]
+            nested_objects = [{"a": nested_objects}, {"b": 1}]
+
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(200)
+        try:
+            lists_schema = SchemaReader({"message": nested_lists}).schema
+            objects_schema = SchemaReader({"message": nested_objects}).schema
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+
+        schema = lists_schema["message"]
+        for _ in range(depth):
+            self.assertEqual(schema["items"]["anyOf"][1]["type"], "integer")
+            schema = schema["items"]["anyOf"][0]
+        self.assertEqual(schema["items"]["type"], "integer")
+
+        schema = objects_schema["message"]
+        for _ in range(depth):
+            self.assertEqual(schema["items"]["b"]["type"], "integer")
+            schema = schema["items"]["a"]
+        self.assertEqual(schema["type"], "integer")
+
+    def test__get_object_schema_matches_reference(self):
+        test_obj = {
+            "integer": 1,
+            "enum": ["a", "b"],
+            "empty": [],
+            "objects": [{"a": 1}, {"b": 2}],
+            "mixed": ["a", 1, {"x": [2.0]}],
+        }
+        leaf = self.schema_reader._default_object_schema
+        self.assertEqual(
+            self.schema_reader._get_object_schema(test_obj),
+            {
+                "integer": dict(leaf, type="integer"),
+                "enum": dict(leaf, type="enum"),
+                "empty": dict(leaf, type="array", items={}),
+                "objects": dict(
+                    leaf, type="array", 
+                    items={
+                        "a": dict(leaf, type="integer"), 
+                        "b": dict(leaf, type="integer")
+                    }
+                ),
+                "mixed": dict(leaf, type="array", items={"anyOf": [
+                    {"x": dict(leaf, type="array", items=dict(leaf, type="number"))},
+                    dict(leaf, type="string"),
+                    dict(leaf, type="integer"),
+                ]}),
+            }
+        )
 
     def test__get_list_item_types(self):
-        test_obj = ["test1", "test2", 2.3, 2, 3.2, 59]
-        expected_list_item_types = [str, float, int]
-        list_item_types = self.schema_reader._get_list_item_types(test_obj)
-        self.assertEqual(list_item_types, expected_list_item_types)
+        for test_obj, expected_list_item_types in (
+            ([], []),
+            (["test1", "test2"], [str]),
+            ([2.3, 2, None, 3.2, 59], [float, int, type(None)]),
+            (["test1", "test2", 2.3, 2, 3.2, 59], [str, float, int]),
+            ([2, {}, "test1", 2.3], [int, dict, str, float]),
+        ):
+            with self.subTest(test_obj=test_obj):
+                list_item_types = self.schema_reader._get_list_item_types(
+                    test_obj)
+                self.assertEqual(list_item_types, expected_list_item_types)
+
+    def test_budgets(self):
+        leaf = SchemaReader._default_object_schema
+        obj = {"message": {
+            "a": {"b": {"c": 1}},
+            "items": [{"d": {"e": 1}}, {"d": {"f": 2}}],
+            "big": list(range(100)),
+        }}
+
+        reader = SchemaReader(obj, max_depth=2)
+        truncated_object = dict(
+            leaf, type="object", description="truncated: deeper than 2")
+        self.assertEqual(reader.schema["message"]["a"], {"b": truncated_object})
+        # Items over budget share one schema, reported once.
+        self.assertEqual(
+            reader.schema["message"]["items"], 
+            dict(leaf, type="array", items=truncated_object)
+        )
+        self.assertEqual(reader.truncated, [
+            ("message.items[]", "deeper than 2"), 
+            ("message.a.b", "deeper than 2")
+        ])
+
+        # Merged with other items, a truncated object stays as it is.
+        reader = SchemaReader(
+            {"message": {"a": [{"x": {"deep": {"y": 1}}}, {"x": 1}]}}, 
+            max_depth=3)
+        self.assertEqual(
+            reader.schema["message"]["a"]["items"]["x"], 
+            {"anyOf": [
+                dict(leaf, type="object", 
+                     description="truncated: deeper than 3"), 
+                dict(leaf, type="integer")
+            ]}
+        )
+
+        reader = SchemaReader(obj, max_nodes=50)
+        self.assertEqual(
+            reader.schema["message"]["big"],
+            dict(leaf, type="array", items={}, 
+                 description="truncated: over 50 nodes")
+        )
+        self.assertEqual(reader.truncated, [("message.big", "over 50 nodes")])
+        self.assertEqual(
+            reader.schema["message"]["a"], {"b": {"c": dict(leaf, type="integer")}})
+
+        # Sampled arrays count as their sample.
+        reader = SchemaReader(obj, max_nodes=50, array_sample_size=10)
+        self.assertEqual(reader.truncated, [])
+
+        # The keys of interest themselves are always read.
+        reader = SchemaReader(obj, max_seconds=0)
+        self.assertEqual(
+            reader.schema, 
+            {"message": dict(
+                leaf, type="object", description="truncated: over 0 s")}
+        )
+        self.assertEqual(SchemaReader(obj).truncated, [])
+
+        # Huge arrays are checked against the time budget as they are 
+        # read, a second passing on every look at the clock here.
+        obj = {"message": {"huge": [1, "a"] * 5000, "small": [1, "a"]}}
+        with mock.patch(
+                "schema_generator.schema_reader.time.perf_counter", 
+                side_effect=itertools.count()):
+            reader = SchemaReader(obj, max_seconds=2)
+            schema = reader.schema
+        self.assertEqual(
+            schema["message"]["huge"], 
+            dict(leaf, type="array", items={}, 
+                 description="truncated: over 2 s")
+        )
+        self.assertEqual(reader.truncated, [("message.huge", "over 2 s")])
+
+    def test_leaf_subclasses(self):
+        class Integer(int):
+            pass
+
+        class Text(str):
+            pass
+
+        class Object(dict):
+            pass
+
+        obj = {"message": Object(
+            a=Integer(1), b=[Text("x")], c=[Integer(1), 2], d=True)}
+        leaf = SchemaReader._default_object_schema
+        self.assertEqual(SchemaReader(obj).schema, {"message": {
+            "a": dict(leaf, type="integer"),
+            "b": dict(leaf, type="enum"),
+            "c": dict(leaf, type="array", items=dict(leaf, type="integer")),
+            "d": dict(leaf, type="boolean"),
+        }})
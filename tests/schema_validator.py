@@ -0,0 +1,184 @@
+from unittest import TestCase
+from schema_generator.schema_accumulator import SchemaAccumulator
+from schema_generator.schema_reader import SchemaReader
+from schema_generator.schema_validator import SchemaValidator
+
+import copy
+import json
+import os
+import sys
+import tempfile
+
+
+class SchemaValidatorTest(TestCase):
+    def setUp(self) -> None:
+        self.documents = []
+        for file_name in ("data_1.json", "data_2.json"):
+            with open(os.path.join("./data", file_name)) as file:
+                self.documents.append(json.load(file))
+
+        self.document = {"message": {
+            "id": "a",
+            "score": 1.5,
+            "flag": True,
+            "tags": ["x", "y"],
+            "items": [{"n": 1}, {"n": 2, "s": None}],
+            "mixed": [1, "a"],
+            "empty": [],
+        }}
+        self.validator = SchemaValidator(SchemaReader(self.document).schema)
+
+    def test_generated_schemas_accept_their_documents(self):
+        for document in self.documents:
+            validator = SchemaValidator(SchemaReader(document).schema)
+            self.assertIsNone(validator.validate(document))
+
+        accumulator = SchemaAccumulator()
+        for document in self.documents:
+            accumulator.add(document)
+        validator = SchemaValidator(accumulator.schema)
+        self.assertEqual(
+            list(validator.validate_all(self.documents + [{}])),
+            [(2, "message", "expected object")]
+        )
+
+    def test_first_failing_path(self):
+        cases = (
+            (("id",), 1, ("message.id", "expected string")),
+            (("score",), 2, None),
+            (("score",), True, ("message.score", "expected number")),
+            (("tags",), ["x", 1], ("message.tags[1]", "expected string")),
+            (("items",), [{"n": 1}, {"n": "1"}],
+             ("message.items[1].n", "expected integer")),
+            (("items",), [{"n": 1, "t": 1}],
+             ("message.items[0].t", "unexpected key")),
+            (("mixed",), [None],
+             ("message.mixed[0]", "expected integer or string")),
+            (("empty",), [1, {}], None),
+            (("other",), 1, ("message.other", "unexpected key")),
+        )
+        for keys, value, expected in cases:
+            with self.subTest(keys=keys, value=value):
+                document = copy.deepcopy(self.document)
+                document["message"][keys[0]] = value
+                self.assertEqual(self.validator.validate(document), expected)
+
+        document = copy.deepcopy(self.document)
+        del document["message"]["id"]
+        self.assertIsNone(self.validator.validate(document))
+        self.assertEqual(
+            self.validator.validate({"attributes": {}}),
+            ("message", "expected object")
+        )
+        self.assertEqual(self.validator.validate([]), ("", "expected object"))
+
+    def test_enum_values(self):
+        schema = SchemaReader(self.document, max_enum_values=5).schema
+        validator = SchemaValidator(schema)
+        document = copy.deepcopy(self.document)
+        document["message"]["tags"] = ["y", "z"]
+        self.assertEqual(
+            validator.validate(document),
+            ("message.tags[1]", "unexpected enum value 'z'")
+        )
+
+    def test_any_of(self):
+        schema = {"message": {"anyOf": [
+            {"type": "array", "items": {"a": {"type": "string"}}},
+            {"type": "null"},
+        ]}}
+        validator = SchemaValidator(schema)
+        self.assertIsNone(validator.validate({"message": None}))
+        self.assertIsNone(validator.validate({"message": [{"a": "x"}]}))
+        self.assertEqual(
+            validator.validate({"message": [{"a": 1}]}),
+            ("message[0].a", "expected string")
+        )
+
+    def test_keywords_as_property_names(self):
+        accumulator = SchemaAccumulator()
+        accumulator.add({"message": {"type": "click"}})
+        accumulator.add({"message": None})
+        validator = SchemaValidator(accumulator.schema)
+        self.assertIsNone(validator.validate({"message": {"type": "tap"}}))
+        self.assertIsNone(validator.validate({"message": None}))
+        self.assertEqual(
+            validator.validate({"message": {"type": 1}}),
+            ("message.type", "expected string")
+        )
+
+        document = {"message": {
+            "type": {"type": "a"},
+            "anyOf": {"items": [1]},
+            "items": [{"type": 1, "anyOf": None}],
+        }}
+        accumulator = SchemaAccumulator()
+        accumulator.add(document)
+        accumulator.add({"message": {"type": None, "anyOf": 1}})
+        validator = SchemaValidator(accumulator.schema)
+        self.assertIsNone(validator.validate(document))
+        self.assertIsNone(
+            validator.validate({"message": {"type": None, "anyOf": 1}}))
+        self.assertEqual(
+            validator.validate({"message": {"items": [{"type": "1"}]}}),
+            ("message.items[0].type", "expected integer")
+        )
+        self.assertEqual(
+            validator.validate({"message": {"anyOf": {"items": ["1"]}}}),
+            ("message.anyOf.items[0]", "expected integer")
+        )
+
+    def test_validate_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "data.json")
+            with open(file_path, "w") as file:
+                json.dump(self.document, file)
+            self.assertEqual(self.validator.validate_file(file_path), [])
+
+            file_path = os.path.join(tmp_dir, "data.ndjson")
+            with open(file_path, "w") as file:
+                file.write(json.dumps(self.document) + "\n\n")
+                file.write(json.dumps({"message": {"id": 1}}) + "\n")
+            self.assertEqual(
+                self.validator.validate_file(file_path),
+                [(3, "message.id", "expected string")]
+            )
+
+    def test_object_without_keys(self):
+        validator = SchemaValidator({"message": {
+            "type": "object", "description": "truncated: deeper than 1"}})
+        self.assertIsNone(validator.validate({"message": {"a": [1]}}))
+        self.assertEqual(
+            validator.validate({"message": [1]}), 
+            ("message", "expected object")
+        )
+
+    def test_deep_nesting(self):
+        depth = 300
+        document = 1
+        for _ in range(depth):
+            document = {"a": [document, "x"]}
+        document = {"message": document}
+        schema = SchemaReader(document).schema
+
+        # Lowered, so that the test stays fast.
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(200)
+        try:
+            validator = SchemaValidator(schema)
+            failures = [
+                validator.validate(document), 
+                validator.validate({"message": {"a": [{"b": 1}]}})
+            ]
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+        self.assertEqual(failures, [
+            ("", "nested too deep"), ("message.a[0].b", "unexpected key")
+        ])
+        self.assertIsNone(validator.validate(document))
+
+    def test_invalid_schema(self):
+        with self.assertRaises(ValueError):
+            SchemaValidator({"message": {"type": "text"}})
+        with self.assertRaises(ValueError):
+            SchemaValidator({"message": []})
@@ -0,0 +1,98 @@
+from unittest import TestCase
+from schema_generator.json_backend import get_json_backend
+from schema_generator.schema_writer import SchemaWriter
+
+import json
+import os
+import shutil
+import tempfile
+
+
+class SchemaWriterTest(TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.tmp_dir, "data_schema.json")
+        self.schema = {"message": {"a": {"type": "string"}, "b": {}}}
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+
+    def read(self, file_path: str) -> str:
+        with open(file_path) as file:
+            return file.read()
+
+    def assertNoTempFiles(self):
+        self.assertEqual(
+            [name for name in os.listdir(self.tmp_dir) 
+             if name.endswith(".tmp")], 
+            []
+        )
+
+    def test_write(self):
+        for compact in (False, True):
+            with self.subTest(compact=compact):
+                writer = SchemaWriter(get_json_backend("json"), compact)
+                self.assertTrue(writer.write(self.schema, self.file_path))
+                expected = json.dumps(self.schema, indent=2) if not compact \
+                    else json.dumps(self.schema, separators=(",", ":"))
+                self.assertEqual(self.read(self.file_path), expected)
+                self.assertNoTempFiles()
+
+    def test_write_skips_unchanged_file(self):
+        writer = SchemaWriter()
+        self.assertTrue(writer.write(self.schema, self.file_path))
+        mtime = os.stat(self.file_path).st_mtime_ns
+
+        self.assertFalse(writer.write(self.schema, self.file_path))
+        self.assertEqual(os.stat(self.file_path).st_mtime_ns, mtime)
+        self.assertTrue(writer.write({"message": {}}, self.file_path))
+        self.assertEqual((writer.written, writer.unchanged), (2, 1))
+
+    def test_write_lines(self):
+        writer = SchemaWriter()
+        file_path = os.path.join(self.tmp_dir, "data_schema.ndjson")
+        self.assertTrue(writer.write_lines([self.schema] * 2, file_path))
+        self.assertEqual(
+            self.read(file_path), (json.dumps(self.schema) + "\n") * 2)
+        self.assertFalse(writer.write_lines([self.schema] * 2, file_path))
+        self.assertNoTempFiles()
+
+    def test_failed_write_keeps_previous_file(self):
+        writer = SchemaWriter()
+        writer.write_lines([self.schema], self.file_path)
+
+        def items():
+            yield self.schema
+            raise ValueError("Broken record.")
+
+        with self.assertRaises(ValueError):
+            writer.write_lines(items(), self.file_path)
+        self.assertEqual(
+            self.read(self.file_path), json.dumps(self.schema) + "\n")
+        self.assertNoTempFiles()
+
+    def test_bundle(self):
+        bundle_path = os.path.join(self.tmp_dir, "schemas.ndjson")
+        with SchemaWriter(bundle_path=bundle_path) as writer:
+            writer.write(self.schema, self.file_path)
+            writer.write_lines([self.schema], "records_schema.ndjson")
+            self.assertFalse(os.path.exists(bundle_path))
+            self.assertFalse(os.path.exists(self.file_path))
+
+        lines = [
+            json.loads(line) for line in self.read(bundle_path).splitlines()
+        ]
+        self.assertEqual(lines, [
+            {"file": "data_schema.json", "schema": self.schema},
+            {"file": "records_schema.ndjson", "schema": self.schema},
+        ])
+        self.assertNoTempFiles()
+
+    def test_bundle_is_discarded_on_error(self):
+        bundle_path = os.path.join(self.tmp_dir, "schemas.ndjson")
+        with self.assertRaises(ValueError):
+            with SchemaWriter(bundle_path=bundle_path) as writer:
+                writer.write(self.schema, self.file_path)
+                raise ValueError("Broken file.")
+        self.assertFalse(os.path.exists(bundle_path))
+        self.assertNoTempFiles()
@@ -0,0 +1,173 @@
+from unittest import TestCase
+from schema_generator.schema_reader import SchemaReader
+from schema_generator.stream_reader import (
+    StreamSchemaReader, iter_json_events,
+    START_MAP, MAP_KEY, END_MAP, START_ARRAY, END_ARRAY, VALUE
+)
+
+import io
+import json
+import sys
+
+
+class IterJsonEventsTest(TestCase):
+    def test_events(self):
+        text = '{"a": [1, 2.5, "x", true, null], "b": {}}'
+        events = list(iter_json_events(io.StringIO(text)))
+        self.assertEqual(events, [
+            (START_MAP, None),
+            (MAP_KEY, "a"),
+            (START_ARRAY, None),
+            (VALUE, 1),
+            (VALUE, 2.5),
+            (VALUE, "x"),
+            (VALUE, True),
+            (VALUE, None),
+            (END_ARRAY, None),
+            (MAP_KEY, "b"),
+            (START_MAP, None),
+            (END_MAP, None),
+            (END_MAP, None),
+        ])
+
+    def test_tokens_split_across_chunks(self):
+        text = '{"key\\"s": [12345, -1.5e3, "a\\u00e9b", false]}'
+        for chunk_size in (1, 2, 3, 7):
+            with self.subTest(chunk_size=chunk_size):
+                events = list(iter_json_events(io.StringIO(text), chunk_size))
+                self.assertIn((MAP_KEY, 'key"s'), events)
+                self.assertIn((VALUE, 12345), events)
+                self.assertIn((VALUE, -1500.0), events)
+                self.assertIn((VALUE, "aéb"), events)
+                self.assertIn((VALUE, False), events)
+
+    def test_long_string_split_across_chunks(self):
+        value = "a\\\"" * 20000
+        text = json.dumps({"key": value})
+        events = list(iter_json_events(io.StringIO(text), 3))
+        self.assertEqual(events[2], (VALUE, value))
+
+    def test_containers_decoded_whole(self):
+        text = '{"a": [1, {"b": "x"}], "c": ' + '[' * 5000 + ']' * 5000 + '}'
+        events = list(iter_json_events(io.StringIO(text), 
+                                       decode_containers=True))
+        self.assertEqual(events[:3], [
+            (START_MAP, None), (MAP_KEY, "a"), (VALUE, [1, {"b": "x"}])
+        ])
+        # Too deep for the json module, so read event by event.
+        self.assertEqual(events[4], (START_ARRAY, None))
+        self.assertEqual(events[-1], (END_MAP, None))
+
+    def test_invalid_json(self):
+        for text in ('{"a" 1}', '{"a": 1,}', '[1 2]', '{"a": [1}', '{"a": 1'):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    list(iter_json_events(io.StringIO(text)))
+
+
+class StreamSchemaReaderTest(TestCase):
+    def assertSameSchemaAsSchemaReader(self, obj):
+        text = json.dumps(obj)
+        expected_schema = json.dumps(SchemaReader(obj).schema)
+        for chunk_size in (5, 65536):
+            with self.subTest(chunk_size=chunk_size):
+                schema = StreamSchemaReader(
+                    io.StringIO(text), chunk_size=chunk_size).schema
+                self.assertEqual(json.dumps(schema), expected_schema)
+
+    def test_schema_matches_schema_reader(self):
+        for file_path in ("./data/data_1.json", "./data/data_2.json"):
+            with self.subTest(file_path=file_path):
+                with open(file_path) as file:
+                    self.assertSameSchemaAsSchemaReader(json.load(file))
+
+    def test_type_rules(self):
+        self.assertSameSchemaAsSchemaReader({
+            "attributes": {"skipped": [1, {"a": None}]},
+            "message": {
+                "integer": 1,
+                "number": 1.5,
+                "boolean": False,
+                "string": "s",
+                "null": None,
+                "enum": ["a", "b"],
+                "empty": [],
+                "empty_objects": [{}, {}],
+                "objects": [{"a": 1}, {"b": 2}],
+                "mixed": ["a", 1, 2.0, True, None, {"x": 1}, [1]],
+                "nested": [[["a"]]],
+            }
+        })
+
+    def test_array_sampling(self):
+        obj = {"message": {
+            "list": [{"a": index} for index in range(10)] + [{"b": 1}],
+            "nested": [[1, 2, 3, "x"], [{"c": None}]],
+        }}
+        text = json.dumps(obj)
+
+        schema_reader = StreamSchemaReader(
+            io.StringIO(text), array_sample_size=3)
+        self.assertEqual(
+            schema_reader.schema, 
+            SchemaReader(obj, array_sample_size=3).schema
+        )
+        self.assertEqual(
+            schema_reader.sampled_arrays, 
+            [("message.list", 11, 3), ("message.nested[]", 4, 3)]
+        )
+
+        for seed in range(3):
+            schema_reader = StreamSchemaReader(
+                io.StringIO(text), array_sample_size=3, 
+                array_sampling="reservoir", seed=seed)
+            items = schema_reader.schema["message"]["list"]["items"]
+            self.assertIn("a", items)
+            self.assertEqual(len(schema_reader.sampled_arrays), 2)
+
+    def test_large_mixed_array_is_deduplicated(self):
+        obj = {"message": {"list": [1, "a", 2.5, None, {"a": 1}] * 20000}}
+        schema = StreamSchemaReader(io.StringIO(json.dumps(obj))).schema
+        self.assertEqual(
+            len(schema["message"]["list"]["items"]["anyOf"]), 4)
+        self.assertEqual(schema, SchemaReader(obj).schema)
+
+    def test_missing_message(self):
+        self.assertSameSchemaAsSchemaReader({"attributes": {}})
+
+    def test_deep_nesting(self):
+        depth = 5000
+        text = '{"message": ' + '{"a": ' * depth + '1' + '}' * depth + '}'
+        schema = StreamSchemaReader(io.StringIO(text)).schema["message"]
+        for _ in range(depth):
+            schema = schema["a"]
+        self.assertEqual(schema["type"], "integer")
+
+    def test_deep_nesting_of_mixed_arrays(self):
+        depth = 300
+        text = '{"message": ' + '[{"a": ' * depth + '1' \
+            + '}, {"b": 1}]' * depth + '}'
+        expected_schema = SchemaReader(json.loads(text)).schema
+
+        # Lowered, so that the test stays fast.
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(200)
+        try:
+            schema = StreamSchemaReader(io.StringIO(text)).schema
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+        self.assertEqual(schema, expected_schema)
+
+    def test_ndjson(self):
+        records = [
+            {"attributes": {}, "message": {"a": 1}},
+            {"attributes": {}, "message": {"b": ["x"]}},
+        ]
+        text = "\n".join(json.dumps(record) for record in records) + "\n"
+        schemas = list(StreamSchemaReader(io.StringIO(text)).iter_schemas())
+        self.assertEqual(
+            schemas, [SchemaReader(record).schema for record in records])
+
+    def test_top_level_not_object(self):
+        with self.assertRaises(ValueError):
+            StreamSchemaReader(io.StringIO("[1, 2]")).schema